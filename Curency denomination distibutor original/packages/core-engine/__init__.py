@@ -17,9 +17,16 @@ from .fx_service import FXService
 from .models import (
     CalculationRequest,
     CalculationResult,
+    BatchCalculationResult,
+    AggregateResult,
+    CurrencyAggregate,
     DenominationBreakdown,
+    DenominationPlan,
+    CanonicalityReport,
     OptimizationMode,
-    Constraint
+    Constraint,
+    ConstraintProgram,
+    InfeasibleBreakdownError
 )
 
 __all__ = [
@@ -28,7 +35,14 @@ __all__ = [
     'FXService',
     'CalculationRequest',
     'CalculationResult',
+    'BatchCalculationResult',
+    'AggregateResult',
+    'CurrencyAggregate',
     'DenominationBreakdown',
+    'DenominationPlan',
+    'CanonicalityReport',
     'OptimizationMode',
-    'Constraint'
+    'Constraint',
+    'ConstraintProgram',
+    'InfeasibleBreakdownError'
 ]
@@ -0,0 +1,507 @@
+"""
+Benchmark script for the Core Denomination Engine
+
+Run this to compare the performance of engine code paths.
+Usage: python benchmark.py
+"""
+
+import itertools
+import json
+import random
+import tempfile
+import time
+import timeit
+import tracemalloc
+from pathlib import Path
+from decimal import Decimal
+from engine import DenominationEngine
+from lookup_table import build_lookup_table, table_filename
+from constraints import compile_constraints
+from models import (
+    BulkCalculationRequest,
+    CalculationRequest,
+    Constraint,
+    ConstraintType,
+    InfeasibleBreakdownError,
+    OptimizationMode
+)
+from optimizer import OptimizationEngine
+
+
+def _time_per_call(func, repeat: int = 5, number: int = 200) -> float:
+    """Best-of-N time per call in microseconds."""
+    best = min(timeit.repeat(func, repeat=repeat, number=number))
+    return best / number * 1_000_000
+
+
+def bench_minor_unit_greedy():
+    """
+    Compare the Decimal greedy loop with the integer minor-unit path.
+    
+    Up to 10^26 the two paths run within ~1.0-1.2x of each other; the int
+    path is there for exactness past the 28-digit Decimal context.
+    """
+    print("=" * 70)
+    print("BENCH 1: Greedy Breakdown - Decimal vs Integer Minor Units (INR)")
+    print("=" * 70)
+    
+    decimal_engine = DenominationEngine(use_minor_units=False)
+    minor_engine = DenominationEngine(use_minor_units=True)
+    config = minor_engine.get_currency_config("INR")
+    plan = minor_engine.get_plan("INR", OptimizationMode.GREEDY)
+    
+    print(f"\n{'Amount':>8} {'Decimal (us)':>14} {'Minor (us)':>12} {'Speedup':>9}  Exact")
+    for exponent in range(2, 41, 2):
+        # 10^n - 1 (all nines) exercises every denomination at every magnitude
+        amount = Decimal("9" * exponent)
+        
+        decimal_us = _time_per_call(
+            lambda: decimal_engine._greedy_breakdown(amount, plan, config)
+        )
+        minor_us = _time_per_call(
+            lambda: minor_engine._greedy_breakdown(amount, plan, config)
+        )
+        
+        # INR amounts are whole rupees, so compare exactly as ints
+        decimal_total = sum(
+            int(b.total_value)
+            for b in decimal_engine._greedy_breakdown(amount, plan, config)
+        )
+        minor_total = sum(
+            int(b.total_value)
+            for b in minor_engine._greedy_breakdown(amount, plan, config)
+        )
+        exact = "yes" if minor_total == int(amount) else "NO"
+        
+        # A speedup over a wrong answer is meaningless
+        if decimal_total == int(amount):
+            speedup = f"{decimal_us / minor_us:.2f}x"
+        else:
+            speedup = "n/a"
+            exact += " (Decimal path lost precision)"
+        
+        print(
+            f"{'10^' + str(exponent):>8} {decimal_us:>14.2f} {minor_us:>12.2f} "
+            f"{speedup:>9}  {exact}"
+        )
+    
+    print()
+
+
+def bench_batch_calculation(size: int = 100_000):
+    """Compare per-request calculate() with calculate_batch()."""
+    print("=" * 70)
+    print(f"BENCH 2: Batch Calculation - {size:,} USD Amounts")
+    print("=" * 70)
+    
+    engine = DenominationEngine()
+    rng = random.Random(42)
+    amounts = [rng.randint(1, 10_000_000) for _ in range(size)]
+    
+    start = time.perf_counter()
+    for cents in amounts:
+        engine.calculate(CalculationRequest(amount=Decimal(cents) / 100, currency="USD"))
+    per_request = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    batch = engine.calculate_batch(amounts, "USD")
+    batched = time.perf_counter() - start
+    
+    print(f"\n  calculate() loop:  {per_request:8.3f}s")
+    print(f"  calculate_batch(): {batched:8.3f}s (vectorized={batch.vectorized})")
+    print(f"  Speedup:           {per_request / batched:8.1f}x\n")
+
+
+def _synthetic_currency_config(path: Path, size: int = 40) -> None:
+    """Write a currencies.json with one synthetic currency of `size` denominations."""
+    values = sorted({round(1.37 ** i, 2) for i in range(size * 2)}, reverse=True)[:size]
+    half = size // 2
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "SYN": {
+                "name": "Synthetic", "symbol": "S", "code": "SYN",
+                "decimal_places": 2,
+                "notes": values[:half],
+                "coins": values[half:],
+                "smallest_unit": 0.01,
+                "active": True
+            }
+        }, f)
+
+
+def bench_denomination_plans():
+    """Per-call cost of sorting/scanning config lists vs precompiled plans."""
+    print("=" * 70)
+    print("BENCH 3: Denomination Lookup - Per-Call Sort/Scan vs Compiled Plan")
+    print("=" * 70)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        synthetic_path = Path(tmp) / "currencies.json"
+        _synthetic_currency_config(synthetic_path)
+        engines = [(DenominationEngine(), ["INR", "USD", "EUR", "GBP"]),
+                   (DenominationEngine(str(synthetic_path)), ["SYN"])]
+    
+    print(f"\n{'Currency':>8} {'Denoms':>7} {'Sort+scan (us)':>15} {'Plan (us)':>10} {'Saved (us)':>11}")
+    for engine, codes in engines:
+        for code in codes:
+            config = engine.get_currency_config(code)
+            
+            def legacy():
+                # What every calculate() used to do before plans
+                denoms = sorted(config.notes + config.coins, reverse=True)
+                return [config.is_note(d) for d in denoms]
+            
+            def compiled():
+                # What calculate() does now: one dict lookup, then bit tests
+                plan = engine._plans[(code, OptimizationMode.GREEDY)]
+                mask = plan.note_mask
+                return [bool(mask >> i & 1) for i in range(len(plan.values))]
+            
+            legacy_us = _time_per_call(legacy, number=2000)
+            plan_us = _time_per_call(compiled, number=2000)
+            count = len(config.notes) + len(config.coins)
+            print(f"{code:>8} {count:>7} {legacy_us:>15.2f} {plan_us:>10.2f} {legacy_us - plan_us:>11.2f}")
+    
+    print()
+
+
+def bench_lookup_tables(ceiling: int = 1_000_000, size: int = 100_000):
+    """Startup cost of memory-mapped lookup tables and batch latency below the ceiling."""
+    print("=" * 70)
+    print(f"BENCH 4: Lookup Tables - Startup and Amounts Below {ceiling:,} Minor Units")
+    print("=" * 70)
+    
+    engine = DenominationEngine()
+    rng = random.Random(42)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"\n{'Table':>16} {'Build (s)':>10} {'Size (KB)':>10}")
+        for code in ["INR", "USD"]:
+            path = Path(tmp) / table_filename(code, OptimizationMode.GREEDY)
+            start = time.perf_counter()
+            table = build_lookup_table(engine, code, OptimizationMode.GREEDY, ceiling, path)
+            build = time.perf_counter() - start
+            table.close()
+            print(f"{path.name:>16} {build:>10.3f} {path.stat().st_size / 1024:>10.0f}")
+        
+        # Startup: engine construction with and without opening the tables
+        plain_ms = _time_per_call(lambda: DenominationEngine(), number=5) / 1000
+        mapped_ms = _time_per_call(lambda: DenominationEngine(lookup_dir=tmp), number=5) / 1000
+        print(f"\n  Engine startup without tables: {plain_ms:8.2f} ms")
+        print(f"  Engine startup with tables:    {mapped_ms:8.2f} ms")
+        
+        # Single calculate() calls only read tables in place of the DP
+        # solver; batches and aggregates gather whole rows at once
+        fast = DenominationEngine(lookup_dir=tmp)
+        print(f"\n{size:,} amounts per call")
+        print(f"{'Currency':>8} {'Path':>10} {'Computed (ms)':>14} {'Table (ms)':>11} {'Speedup':>8}")
+        for code, decimal_places in [("INR", 2), ("USD", 2)]:
+            units = [rng.randint(1, ceiling) for _ in range(size)]
+            amounts = [Decimal(u).scaleb(-decimal_places) for u in units]
+            
+            for name, run in [
+                ("batch", lambda e: e.calculate_batch(units, code)),
+                ("aggregate", lambda e: e.aggregate(amounts, code))
+            ]:
+                computed_ms = _time_per_call(lambda: run(engine), repeat=3, number=1) / 1000
+                table_ms = _time_per_call(lambda: run(fast), repeat=3, number=1) / 1000
+                print(
+                    f"{code:>8} {name:>10} {computed_ms:>14.2f} {table_ms:>11.2f} "
+                    f"{computed_ms / table_ms:>7.2f}x"
+                )
+        
+        fast.close()
+    
+    print()
+
+
+def bench_streaming_aggregate(sizes=(50_000, 200_000)):
+    """Aggregate denomination demand: calculate() loop vs aggregate()."""
+    print("=" * 70)
+    print("BENCH 5: Streaming Aggregate - Time and Peak Memory")
+    print("=" * 70)
+    
+    engine = DenominationEngine()
+    
+    def stream(size):
+        rng = random.Random(42)
+        for _ in range(size):
+            yield Decimal(rng.randint(1, 10_000_000)).scaleb(-2), rng.choice(["INR", "USD"])
+    
+    print(f"\n{'Amounts':>9} {'Loop (s)':>9} {'Loop peak (KB)':>15} {'Aggregate (s)':>14} {'Agg peak (KB)':>14}")
+    for size in sizes:
+        tracemalloc.start()
+        start = time.perf_counter()
+        totals = {}
+        for amount, code in stream(size):
+            result = engine.calculate(CalculationRequest(amount=amount, currency=code))
+            for b in result.breakdowns:
+                key = (code, b.denomination)
+                totals[key] = totals.get(key, 0) + b.count
+        loop = time.perf_counter() - start
+        loop_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        
+        tracemalloc.start()
+        start = time.perf_counter()
+        engine.aggregate(stream(size))
+        aggregated = time.perf_counter() - start
+        aggregate_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        
+        print(
+            f"{size:>9,} {loop:>9.3f} {loop_peak / 1024:>15.0f} "
+            f"{aggregated:>14.3f} {aggregate_peak / 1024:>14.0f}"
+        )
+    
+    print()
+
+
+def bench_inventory_withdrawals(count: int = 5_000):
+    """Sequential withdrawals from one finite vault inventory."""
+    print("=" * 70)
+    print(f"BENCH 6: Inventory-Constrained Withdrawals - {count:,} Sequential (INR)")
+    print("=" * 70)
+    
+    engine = DenominationEngine()
+    optimizer = OptimizationEngine(engine)
+    config = engine.get_currency_config("INR")
+    vault = {d: 50_000 for d in config.notes + config.coins}
+    rng = random.Random(42)
+    
+    times = []
+    pieces = 0
+    refused = 0
+    for _ in range(count):
+        amount = Decimal(rng.randint(1, 1_000) * 10)
+        start = time.perf_counter()
+        try:
+            pieces += optimizer.withdraw(amount, "INR", vault).total_denominations
+        except InfeasibleBreakdownError:
+            refused += 1
+        times.append(time.perf_counter() - start)
+    
+    times.sort()
+    print(f"\n  Total:     {sum(times):8.3f}s")
+    print(f"  Median:    {times[len(times) // 2] * 1_000_000:8.1f} us")
+    print(f"  p99:       {times[int(len(times) * 0.99)] * 1_000_000:8.1f} us")
+    print(f"  Max:       {times[-1] * 1_000_000:8.1f} us")
+    print(f"  Dispensed: {pieces:,} pieces, {refused:,} withdrawals refused")
+    print(f"  Left:      {sum(vault.values()):,} pieces in the vault\n")
+
+
+def bench_constrained_calculation():
+    """Per-call cost of constrained requests vs plain greedy."""
+    print("=" * 70)
+    print("BENCH 7: Constrained Calculation - One Integer Program per Request")
+    print("=" * 70)
+    
+    engine = DenominationEngine()
+    cases = [
+        ("none (greedy)", OptimizationMode.GREEDY, []),
+        ("AVOID 500", OptimizationMode.CONSTRAINED,
+         [Constraint(type=ConstraintType.AVOID, denomination=Decimal("500"))]),
+        ("CAP 500 x3", OptimizationMode.CONSTRAINED,
+         [Constraint(type=ConstraintType.CAP, denomination=Decimal("500"), value=3)]),
+        ("REQUIRE 100 x5", OptimizationMode.CONSTRAINED,
+         [Constraint(type=ConstraintType.REQUIRE, denomination=Decimal("100"), value=5)]),
+        ("ONLY notes", OptimizationMode.CONSTRAINED,
+         [Constraint(type=ConstraintType.ONLY,
+                     denominations=engine.get_currency_config("INR").notes)]),
+        ("MINIMIZE 200", OptimizationMode.CONSTRAINED,
+         [Constraint(type=ConstraintType.MINIMIZE, denomination=Decimal("200"))])
+    ]
+    
+    print(f"\n{'Constraints':>16} {'Per call (us)':>14} {'Pieces':>7}")
+    for label, mode, constraints in cases:
+        request = CalculationRequest(
+            amount=Decimal("98760"),
+            currency="INR",
+            optimization_mode=mode,
+            constraints=constraints
+        )
+        per_call = _time_per_call(lambda: engine.calculate(request))
+        pieces = engine.calculate(request).total_denominations
+        print(f"{label:>16} {per_call:>14.2f} {pieces:>7}")
+    
+    print()
+
+
+def bench_constraint_compilation(size: int = 20_000):
+    """Compiling a constraint set per row vs once per batch."""
+    print("=" * 70)
+    print("BENCH 8: Constraint Compilation - Per Row vs Cached Program")
+    print("=" * 70)
+    
+    engine = DenominationEngine()
+    plan = engine.get_plan("INR", OptimizationMode.CONSTRAINED)
+    constraints = [
+        Constraint(type=ConstraintType.AVOID, denomination=Decimal("500")),
+        Constraint(type=ConstraintType.CAP, denomination=Decimal("200"), value=10),
+        Constraint(type=ConstraintType.REQUIRE, denomination=Decimal("100"), value=1)
+    ]
+    
+    uncached_us = _time_per_call(lambda: compile_constraints(plan, constraints), number=2000)
+    cached_us = _time_per_call(lambda: engine.compile_constraints("INR", constraints), number=2000)
+    print(f"\n  Compile per row:        {uncached_us:8.2f} us")
+    print(f"  Cached program lookup:  {cached_us:8.2f} us")
+    
+    rng = random.Random(42)
+    amounts = [rng.randint(1, 5_000) * 100 for _ in range(size)]
+    start = time.perf_counter()
+    batch = engine.calculate_batch(amounts, "INR", OptimizationMode.CONSTRAINED, constraints)
+    elapsed = time.perf_counter() - start
+    unpaid = sum(1 for r in batch.remainders if r)
+    print(f"  {size:,} constrained rows: {elapsed:8.3f}s ({unpaid:,} not payable)\n")
+
+
+def bench_alternatives(amounts=("1888", "1000000", "123456789.37")):
+    """Latency of alternative suggestions, as served by /alternatives."""
+    print("=" * 70)
+    print("BENCH 9: Alternatives - Pareto Frontier and k-Best (INR)")
+    print("=" * 70)
+    
+    engine = DenominationEngine()
+    optimizer = OptimizationEngine(engine)
+    
+    print(f"\n  {'Amount':>16} {'Pareto':>12} {'Points':>7} {'5-best':>12} {'Suggest':>12}")
+    for amount in amounts:
+        request = CalculationRequest(amount=Decimal(amount), currency="INR")
+        front = optimizer.pareto_alternatives(request)
+        pareto_us = _time_per_call(lambda: optimizer.pareto_alternatives(request), repeat=3, number=5)
+        k_best_us = _time_per_call(lambda: optimizer.k_best_alternatives(request, k=5), repeat=3, number=5)
+        suggest_us = _time_per_call(lambda: optimizer.suggest_alternatives(request), repeat=3, number=5)
+        print(
+            f"  {amount:>16} {pareto_us / 1000:9.2f} ms {len(front):>7} "
+            f"{k_best_us / 1000:9.2f} ms {suggest_us / 1000:9.2f} ms"
+        )
+    print()
+
+
+def bench_breakdown_counting(amounts=(1_000, 100_000, 1_000_000)):
+    """Counting breakdowns with the rolling DP, and streaming them."""
+    print("=" * 70)
+    print("BENCH 10: Breakdown Counting - Rolling DP and Lazy Enumeration (INR)")
+    print("=" * 70)
+    
+    engine = DenominationEngine()
+    
+    print(f"\n  {'Amount':>12} {'Breakdowns':>42} {'Count time':>12}")
+    for amount in amounts:
+        start = time.perf_counter()
+        count = engine.count_breakdowns(Decimal(amount), "INR")
+        elapsed = time.perf_counter() - start
+        print(f"  {amount:>12,} {count:>42,} {elapsed * 1000:9.2f} ms")
+    
+    limit = 100_000
+    start = time.perf_counter()
+    streamed = sum(1 for _ in itertools.islice(engine.iter_breakdowns(Decimal(1_000_000), "INR"), limit))
+    elapsed = time.perf_counter() - start
+    print(f"\n  First {streamed:,} breakdowns of ₹10,00,000 streamed in {elapsed:.3f}s\n")
+
+
+def bench_anytime_budgets(budgets=(10, 50, 250), size: int = 20):
+    """Tail latency and solution quality of EXACT under time budgets."""
+    print("=" * 70)
+    print("BENCH 11: Anytime EXACT Solving - Latency vs Budget (adversarial set)")
+    print("=" * 70)
+    
+    # lcm(9973, 9967) makes the exact DP table ~10^8 entries long
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "currencies.json"
+        path.write_text(json.dumps({
+            "ADV": {
+                "name": "Adversarial", "symbol": "A", "code": "ADV",
+                "decimal_places": 0, "notes": [9973, 9967, 7], "coins": [1],
+                "smallest_unit": 1, "active": True
+            }
+        }), encoding='utf-8')
+        
+        rng = random.Random(42)
+        amounts = [Decimal(rng.randint(10 ** 6, 10 ** 9)) for _ in range(size)]
+        
+        print(f"\n  {'Budget':>8} {'p50':>10} {'max':>10} {'Proven':>8} {'Mean gap':>10}")
+        for budget in budgets:
+            # Fresh engine per budget so DP progress is not shared
+            engine = DenominationEngine(str(path))
+            latencies, proven, gaps = [], 0, []
+            for amount in amounts:
+                start = time.perf_counter()
+                result = engine.calculate(CalculationRequest(
+                    amount=amount, currency="ADV",
+                    optimization_mode=OptimizationMode.EXACT,
+                    time_budget_ms=budget
+                ))
+                latencies.append((time.perf_counter() - start) * 1000)
+                proven += result.metadata['proven_optimal']
+                gaps.append(result.metadata['optimality_gap'])
+            latencies.sort()
+            print(
+                f"  {budget:>5} ms {latencies[len(latencies) // 2]:7.1f} ms "
+                f"{latencies[-1]:7.1f} ms {proven:>5}/{size} {sum(gaps) / size:10.1f}"
+            )
+    print()
+
+
+def bench_bulk_calculation(size: int = 50_000):
+    """
+    Mixed bulk requests: calculate() loop vs calculate_bulk().
+    
+    Both build one CalculationResult per request; the bulk path solves
+    each distinct amount once and shares breakdown objects between rows.
+    """
+    print("=" * 70)
+    print(f"BENCH 12: Bulk Calculation - {size:,} Mixed INR/USD Requests")
+    print("=" * 70)
+    
+    rng = random.Random(42)
+    modes = [OptimizationMode.GREEDY, OptimizationMode.BALANCED, OptimizationMode.EXACT]
+    # Payroll-like: a few thousand distinct amounts, many repeats
+    requests = [
+        CalculationRequest(
+            amount=Decimal(rng.randint(1, 5_000) * 100).scaleb(-2),
+            currency=rng.choice(["INR", "USD"]),
+            optimization_mode=rng.choice(modes)
+        )
+        for _ in range(size)
+    ]
+    
+    engine = DenominationEngine()
+    start = time.perf_counter()
+    for request in requests:
+        engine.calculate(request)
+    per_request = time.perf_counter() - start
+    
+    engine = DenominationEngine()
+    start = time.perf_counter()
+    bulk = engine.calculate_bulk(BulkCalculationRequest(calculations=requests))
+    bulk_time = time.perf_counter() - start
+    
+    print(f"\n  calculate() loop: {per_request:8.3f}s")
+    print(f"  calculate_bulk(): {bulk_time:8.3f}s "
+          f"({bulk.analytics['batched']:,} batched, summary and analytics included)")
+    print(f"  Speedup:          {per_request / bulk_time:8.1f}x\n")
+
+
+def main():
+    """Run all benchmarks."""
+    print("\n" + "=" * 70)
+    print("CURRENCY DENOMINATION ENGINE - BENCHMARKS")
+    print("=" * 70 + "\n")
+    
+    bench_minor_unit_greedy()
+    bench_batch_calculation()
+    bench_denomination_plans()
+    bench_lookup_tables()
+    bench_streaming_aggregate()
+    bench_inventory_withdrawals()
+    bench_constrained_calculation()
+    bench_constraint_compilation()
+    bench_alternatives()
+    bench_breakdown_counting()
+    bench_anytime_budgets()
+    bench_bulk_calculation()
+
+
+if __name__ == "__main__":
+    main()
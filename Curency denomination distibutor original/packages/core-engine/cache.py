@@ -0,0 +1,88 @@
+"""
+Result Cache
+
+Thread-safe, size-bounded LRU cache used by the engine for repeated
+calculations. Pure Python, no external dependencies.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Least-recently-used cache with a fixed maximum size.
+    
+    Safe to share between threads. Keeps hit, miss and eviction counters
+    so callers can tell whether the cache is earning its memory.
+    """
+    
+    def __init__(self, max_size: int):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_size: Maximum number of entries (must be positive)
+        
+        Raises:
+            ValueError: If max_size is not positive
+        """
+        if max_size <= 0:
+            raise ValueError("Cache size must be positive")
+        
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a key, marking it as most recently used.
+        
+        Returns:
+            Cached value, or None on a miss
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = value
+            
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        """Get size and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+    
+    def __len__(self) -> int:
+        """Number of cached entries."""
+        return len(self._entries)
@@ -0,0 +1,216 @@
+"""
+Constraint Programs
+
+Compiles a list of breakdown constraints into a single integer program over
+a denomination plan and solves it exactly on integer minor units.
+
+Replaces applying constraints one at a time on top of a greedy result:
+every constraint is a bound or an objective term, the program is solved
+once, and the answer is either an exact breakdown or an infeasibility error.
+
+Constraint lists are first normalized into a hashable signature, so a
+program can be compiled once and reused for every amount (see
+DenominationEngine.compile_constraints).
+"""
+
+import math
+from decimal import Decimal
+from typing import FrozenSet, Iterable, List, Optional, Tuple, Union
+from models import (
+    Constraint,
+    ConstraintProgram,
+    ConstraintType,
+    DenominationPlan,
+    InfeasibleBreakdownError
+)
+from solvers import solve_bounded
+
+
+# (type, denomination, value, allowed denominations) per constraint
+ConstraintSignature = FrozenSet[
+    Tuple[ConstraintType, Optional[Decimal], Optional[int], Optional[FrozenSet[Decimal]]]
+]
+
+
+def _as_decimal(value) -> Decimal:
+    """Denomination as Decimal (hashes by value, so 500 == 500.00)."""
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def constraint_signature(constraints: Iterable[Constraint]) -> ConstraintSignature:
+    """
+    Normalize constraints into a frozen, hashable signature.
+    
+    Order and duplicates do not change the compiled program, so they do not
+    change the signature either.
+    
+    Args:
+        constraints: Constraints to normalize
+    
+    Returns:
+        Frozen set of one tuple per distinct constraint
+    """
+    return frozenset(
+        (
+            ConstraintType(c.type),
+            _as_decimal(c.denomination) if c.denomination is not None else None,
+            c.value,
+            frozenset(_as_decimal(d) for d in c.denominations)
+            if c.denominations is not None else None
+        )
+        for c in constraints
+    )
+
+
+def _position(
+    plan: DenominationPlan,
+    denomination: Optional[Decimal],
+    constraint_type: ConstraintType
+) -> Optional[int]:
+    """Plan position of a constraint's denomination (None if not in the plan)."""
+    if denomination is None:
+        raise ValueError(f"{constraint_type.value} constraint requires a denomination")
+    return plan.index.get(denomination)
+
+
+def compile_constraints(
+    plan: DenominationPlan,
+    constraints: Union[List[Constraint], ConstraintSignature]
+) -> ConstraintProgram:
+    """
+    Compile constraints into per-position bounds and objective terms.
+    
+    Args:
+        plan: Denomination plan the constraints refer to
+        constraints: Constraints to combine (order does not matter), or
+                    their signature
+    
+    Returns:
+        ConstraintProgram
+    
+    Raises:
+        ValueError: If a constraint is malformed
+        InfeasibleBreakdownError: If the constraints contradict each other or
+                                  require a denomination the currency lacks
+    """
+    if not isinstance(constraints, frozenset):
+        constraints = constraint_signature(constraints)
+    
+    k = len(plan)
+    lower = [0] * k
+    upper: List[Optional[int]] = [None] * k
+    minimize_mask = 0
+    
+    def cap(position: int, value: int) -> None:
+        if upper[position] is None or value < upper[position]:
+            upper[position] = value
+    
+    for kind, denomination, value, denominations in constraints:
+        if kind == ConstraintType.ONLY:
+            if not denominations:
+                raise ValueError("ONLY constraint requires list of denominations")
+            allowed = {_position(plan, d, kind) for d in denominations}
+            for position in range(k):
+                if position not in allowed:
+                    cap(position, 0)
+            continue
+        
+        position = _position(plan, denomination, kind)
+        
+        if kind in (ConstraintType.CAP, ConstraintType.REQUIRE):
+            if value is None or value < 0:
+                raise ValueError(f"Invalid value for {kind.value} constraint")
+        
+        if position is None:
+            # Limits on a denomination the currency does not have always hold,
+            # except asking for some of it
+            if kind == ConstraintType.REQUIRE and value > 0:
+                raise InfeasibleBreakdownError(
+                    f"Denomination {denomination} not available in {plan.currency}"
+                )
+            continue
+        
+        if kind == ConstraintType.AVOID:
+            cap(position, 0)
+        elif kind == ConstraintType.CAP:
+            cap(position, value)
+        elif kind == ConstraintType.REQUIRE:
+            lower[position] = max(lower[position], value)
+        elif kind == ConstraintType.MINIMIZE:
+            minimize_mask |= 1 << position
+    
+    for position, (low, high) in enumerate(zip(lower, upper)):
+        if high is not None and low > high:
+            raise InfeasibleBreakdownError(
+                f"Constraints on {plan.denominations[position]} require at least "
+                f"{low} but allow at most {high}"
+            )
+    
+    # Amounts the program can possibly pay: at least the required minimum,
+    # at most the capped maximum, in steps of the gcd of what is still free
+    min_units = sum(low * value for low, value in zip(lower, plan.values))
+    if all(high is not None for high in upper):
+        max_units = sum(high * value for high, value in zip(upper, plan.values))
+    else:
+        max_units = None
+    step = math.gcd(*(
+        value for value, low, high in zip(plan.values, lower, upper)
+        if high is None or high > low
+    ), 0)
+    
+    return ConstraintProgram(
+        currency=plan.currency,
+        lower=tuple(lower),
+        upper=tuple(upper),
+        allowed_mask=sum(1 << i for i, high in enumerate(upper) if high != 0),
+        minimize_mask=minimize_mask,
+        min_units=min_units,
+        max_units=max_units,
+        step=step
+    )
+
+
+def solve_program(
+    program: ConstraintProgram,
+    plan: DenominationPlan,
+    units: int,
+    node_limit: int = 200_000,
+    deadline: Optional[float] = None
+) -> Tuple[Optional[List[int]], bool]:
+    """
+    Solve a compiled program for an amount.
+    
+    Minimized denominations are weighted above the largest possible piece
+    count, so their total count is minimized first and pieces second.
+    
+    Args:
+        program: Compiled constraints
+        plan: Plan the program was compiled against
+        units: Amount in minor units
+        node_limit: Search effort limit (see solvers.solve_bounded)
+        deadline: time.perf_counter() value after which the search stops
+    
+    Returns:
+        Tuple of (counts aligned with the plan or None, search finished flag)
+    """
+    if not program.may_pay(units):
+        return None, True
+    
+    weights = None
+    if program.minimize_mask:
+        # No breakdown has more pieces than units / smallest denomination
+        penalty = units // min(plan.values) + 1
+        weights = [
+            1 + penalty if program.minimize_mask >> i & 1 else 1
+            for i in range(len(plan))
+        ]
+    
+    return solve_bounded(
+        units,
+        plan.values,
+        program.upper,
+        node_limit,
+        lower=program.lower,
+        weights=weights,
+        deadline=deadline
+    )
@@ -10,19 +10,66 @@ Key Features:
 - Pure integer mathematics to avoid floating-point errors
 - Configurable currency denominations
 - Thread-safe and stateless design
+- Optional bounded LRU cache for repeated calculations
+- Optional memory-mapped lookup tables for batches of small amounts
+- Streaming aggregation of denomination demand over many amounts
+- Bulk calculation of mixed requests with summary and analytics
+- Counting and lazily listing every possible breakdown of an amount
 """
 
+import hashlib
 import json
+import operator
+import time
 from decimal import Decimal, ROUND_DOWN
 from pathlib import Path
-from typing import List, Dict, Optional
+from types import MappingProxyType
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Tuple, Union
 from models import (
     CalculationRequest,
     CalculationResult,
+    BatchCalculationResult,
+    BulkCalculationRequest,
+    BulkCalculationResult,
+    AggregateResult,
+    CurrencyAggregate,
     DenominationBreakdown,
+    DenominationPlan,
+    CanonicalityReport,
+    Constraint,
+    ConstraintProgram,
     CurrencyConfig,
+    InfeasibleBreakdownError,
     OptimizationMode
 )
+from solvers import (
+    to_minor_units,
+    denomination_to_minor_units,
+    from_minor_units,
+    exact_total,
+    EXACT_CONTEXT,
+    as_int64_array,
+    greedy_counts_batch,
+    greedy_counterexample,
+    count_combinations,
+    iter_combinations,
+    MinCountSolver,
+    cost_lower_bound,
+    solve_bounded,
+    INT64_MAX,
+    HAS_NUMPY
+)
+from cache import LRUCache
+from lookup_table import DenominationLookupTable, table_filename
+from constraints import (
+    ConstraintSignature,
+    compile_constraints,
+    constraint_signature,
+    solve_program
+)
+
+if HAS_NUMPY:
+    import numpy as np
 
 
 class DenominationEngine:
@@ -33,23 +80,112 @@ class DenominationEngine:
     Can be used across desktop, mobile backend, and cloud services.
     """
     
-    def __init__(self, config_path: Optional[str] = None):
+    # Compiled constraint programs kept per (currency, mode, constraints)
+    PROGRAM_CACHE_SIZE = 256
+    
+    # Search nodes for EXACT / CONSTRAINED solves without a node budget
+    DEFAULT_NODE_LIMIT = 200_000
+    
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        use_minor_units: bool = True,
+        cache_size: int = 0,
+        lookup_dir: Optional[str] = None
+    ):
         """
         Initialize the denomination engine.
         
         Args:
             config_path: Path to currencies.json config file.
                         If None, uses default config location.
+            use_minor_units: Run the greedy breakdown on integer minor units
+                        (exact for any amount). If False, uses the original
+                        Decimal division path.
+            cache_size: Maximum number of results kept in an LRU cache for
+                        repeated calculations. 0 disables the cache.
+            lookup_dir: Directory of precomputed lookup tables (see
+                        lookup_table.py). Tables built for a different
+                        currencies.json are ignored.
         """
         if config_path is None:
             config_path = Path(__file__).parent / "config" / "currencies.json"
         
-        self.currencies = self._load_currency_configs(config_path)
+        self.config_path = config_path
+        self.use_minor_units = use_minor_units
+        self.lookup_dir = lookup_dir
+        self._result_cache = LRUCache(cache_size) if cache_size > 0 else None
+        self._program_cache = LRUCache(self.PROGRAM_CACHE_SIZE)
+        self._load(config_path)
+    
+    def _load(self, config_path: str) -> None:
+        """Load currencies and build everything derived from them."""
+        currencies, config_hash = self._load_currency_configs(config_path)
+        plans = self._compile_plans(currencies)
+        
+        # Canonical currencies keep greedy for EXACT mode; the others, and
+        # those whose canonicality is unknown, get a DP solver (tables are
+        # built lazily, on first use)
+        canonicality = self._analyze_canonicality(plans)
+        exact_solvers = {
+            code: MinCountSolver(plan.values)
+            for (code, mode), plan in plans.items()
+            if mode == OptimizationMode.EXACT
+            and not canonicality[code].canonical
+        }
+        
+        self.currencies = currencies
+        self.config_hash = config_hash
+        self._plans = plans
+        self._canonicality = canonicality
+        self._exact_solvers = exact_solvers
+        
+        # Swap in the new tables first, then release the old mappings; a
+        # table's close() waits for lookups already reading it, and any
+        # later lookup on it returns None so the caller computes instead
+        stale = getattr(self, '_lookup_tables', {})
+        self._lookup_tables = self._open_lookup_tables(plans, config_hash)
+        for table in stale.values():
+            table.close()
     
-    def _load_currency_configs(self, config_path: str) -> Dict[str, CurrencyConfig]:
-        """Load currency configurations from JSON file."""
-        with open(config_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+    def close(self) -> None:
+        """
+        Release the memory-mapped lookup tables.
+        
+        The engine stays usable; calculations just stop reading from tables.
+        """
+        tables, self._lookup_tables = self._lookup_tables, {}
+        for table in tables.values():
+            table.close()
+    
+    def reload_currencies(self, config_path: Optional[str] = None) -> None:
+        """
+        Reload the currency config and drop every cached result.
+        
+        Args:
+            config_path: New config file. If None, re-reads the current one.
+        """
+        if config_path is not None:
+            self.config_path = config_path
+        
+        self._load(self.config_path)
+        self._program_cache.clear()
+        if self._result_cache is not None:
+            self._result_cache.clear()
+    
+    def _load_currency_configs(
+        self,
+        config_path: str
+    ) -> Tuple[Dict[str, CurrencyConfig], str]:
+        """
+        Load currency configurations from JSON file.
+        
+        Returns:
+            Tuple of (currency code -> CurrencyConfig, SHA-256 of the file)
+        """
+        with open(config_path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
         
         currencies = {}
         for code, config in data.items():
@@ -64,7 +200,124 @@ class DenominationEngine:
                 active=config.get('active', True)
             )
         
-        return currencies
+        return currencies, hashlib.sha256(raw).hexdigest()
+    
+    def _compile_plans(
+        self,
+        currencies: Dict[str, CurrencyConfig]
+    ) -> Dict[Tuple[str, OptimizationMode], DenominationPlan]:
+        """
+        Compile an immutable denomination plan per (currency, mode) at load time.
+        
+        Denominations are ordered once, converted to integer minor units once,
+        and classified as note/coin once, so no request has to sort or scan.
+        
+        Returns:
+            Mapping of (currency code, mode) -> DenominationPlan
+        
+        Raises:
+            ValueError: If a denomination is finer than the currency's minor unit
+        """
+        plans = {}
+        for config in currencies.values():
+            minor_units = {
+                denom: denomination_to_minor_units(denom, config.decimal_places)
+                for denom in config.notes + config.coins
+            }
+            notes = set(config.notes)
+            
+            for mode in OptimizationMode:
+                # Denominations listed as both note and coin appear once (as a note)
+                order = tuple(dict.fromkeys(
+                    self._get_denominations_for_mode(config, mode, [])
+                ))
+                plans[(config.code, mode)] = DenominationPlan(
+                    currency=config.code,
+                    mode=mode,
+                    decimal_places=config.decimal_places,
+                    denominations=order,
+                    values=tuple(minor_units[d] for d in order),
+                    note_mask=sum(1 << i for i, d in enumerate(order) if d in notes),
+                    index=MappingProxyType({d: i for i, d in enumerate(order)})
+                )
+        
+        return plans
+    
+    def _open_lookup_tables(
+        self,
+        plans: Dict[Tuple[str, OptimizationMode], DenominationPlan],
+        config_hash: str
+    ) -> Dict[Tuple[str, OptimizationMode], DenominationLookupTable]:
+        """
+        Open the memory-mapped lookup tables available for the loaded plans.
+        
+        A table is only used if its header matches the plan and the hash of
+        the currencies.json it was built from; anything else is skipped.
+        
+        Returns:
+            Mapping of (currency code, mode) -> DenominationLookupTable
+        """
+        tables = {}
+        if self.lookup_dir is None:
+            return tables
+        
+        for (code, mode), plan in plans.items():
+            path = Path(self.lookup_dir) / table_filename(code, mode)
+            if not path.is_file():
+                continue
+            
+            try:
+                table = DenominationLookupTable(path)
+            except ValueError:
+                continue
+            
+            if (table.config_hash, table.currency, table.mode, table.k) != (
+                config_hash, code, mode, len(plan)
+            ):
+                table.close()
+                continue
+            tables[(code, mode)] = table
+        
+        return tables
+    
+    def _analyze_canonicality(
+        self,
+        plans: Dict[Tuple[str, OptimizationMode], DenominationPlan]
+    ) -> Dict[str, CanonicalityReport]:
+        """
+        Check at load time whether greedy is optimal for each currency.
+        
+        Runs a polynomial canonical coin system test and records the smallest
+        counter-example, which decides the algorithm used for EXACT mode.
+        Systems without a unit coin are only scanned up to
+        COUNTEREXAMPLE_SCAN_LIMIT; if that does not settle it, canonical is
+        None (unknown) and EXACT mode uses the DP / branch-and-bound solver.
+        
+        Returns:
+            Mapping of currency code -> CanonicalityReport
+        """
+        reports = {}
+        for (code, mode), plan in plans.items():
+            if mode != OptimizationMode.EXACT:
+                continue
+            
+            try:
+                counterexample = greedy_counterexample(plan.values)
+                canonical = counterexample is None
+            except ValueError:
+                # Too large to decide at load time: EXACT uses the solver
+                counterexample, canonical = None, None
+            reports[code] = CanonicalityReport(
+                currency=code,
+                canonical=canonical,
+                counterexample=(
+                    from_minor_units(counterexample, plan.decimal_places)
+                    if counterexample is not None else None
+                ),
+                exact_solver='greedy' if canonical else 'dp'
+            )
+        
+        return reports
     
     def get_currency_config(self, currency_code: str) -> CurrencyConfig:
         """
@@ -92,10 +345,38 @@ class DenominationEngine:
         
         return config
     
+    def get_plan(
+        self,
+        currency_code: str,
+        mode: OptimizationMode = OptimizationMode.GREEDY
+    ) -> DenominationPlan:
+        """
+        Get the precompiled denomination plan for a currency and mode.
+        
+        Args:
+            currency_code: 3-letter ISO currency code
+            mode: Optimization mode
+        
+        Returns:
+            DenominationPlan (immutable, shared)
+        
+        Raises:
+            ValueError: If currency is not supported
+        """
+        config = self.get_currency_config(currency_code)
+        return self._plans[(config.code, OptimizationMode(mode))]
+    
     def calculate(self, request: CalculationRequest) -> CalculationResult:
         """
         Calculate denomination breakdown for given amount.
         
+        EXACT and CONSTRAINED results carry metadata['proven_optimal'] and
+        metadata['optimality_gap'] (an upper bound on how many more pieces
+        the breakdown uses than the fewest possible). With a time or node
+        budget on the request the search is anytime: when the budget runs
+        out it returns the best breakdown found so far, or the greedy
+        breakdown with metadata['fallback'] = 'greedy' if it found none.
+        
         Args:
             request: CalculationRequest with amount, currency, and options
         
@@ -104,6 +385,7 @@ class DenominationEngine:
         
         Raises:
             ValueError: If currency not supported or amount invalid
+            InfeasibleBreakdownError: If no breakdown satisfies the constraints
         """
         # Get currency configuration
         currency_config = self.get_currency_config(request.currency)
@@ -111,39 +393,668 @@ class DenominationEngine:
         # Use the amount (already validated in CalculationRequest.__post_init__)
         amount = request.amount
         
-        # Get denominations based on optimization mode
-        denominations = self._get_denominations_for_mode(
-            currency_config, 
-            request.optimization_mode,
-            request.constraints
-        )
+        deadline = None
+        if request.time_budget_ms is not None:
+            deadline = time.perf_counter() + request.time_budget_ms / 1000
+        budgeted = deadline is not None or request.node_budget is not None
+        node_limit = request.node_budget
+        if node_limit is None:
+            node_limit = self.DEFAULT_NODE_LIMIT
         
-        # Perform greedy breakdown
-        breakdowns = self._greedy_breakdown(
-            amount,
-            denominations,
-            currency_config
-        )
+        signature = constraint_signature(request.constraints)
+        
+        cache = self._result_cache
+        if cache is not None:
+            # Decimal hashes by value, so 100 and 100.00 share an entry; the
+            # config hash keeps results computed before a reload from matching
+            key = (
+                self.config_hash,
+                currency_config.code,
+                request.optimization_mode,
+                amount,
+                signature
+            )
+            cached = cache.get(key)
+        else:
+            cached = None
+        
+        if cached is None:
+            # Get precompiled denominations for the optimization mode
+            plan = self._plans[(currency_config.code, request.optimization_mode)]
+            
+            constrained = (
+                request.optimization_mode == OptimizationMode.CONSTRAINED
+                and bool(signature)
+            )
+            
+            # A table row is only cheaper than the minimum-count solver; a
+            # greedy divmod chain costs about as much as reading the row
+            table = None
+            if (
+                not constrained
+                and plan.mode == OptimizationMode.EXACT
+                and plan.currency in self._exact_solvers
+            ):
+                table = self._lookup_tables.get((plan.currency, plan.mode))
+            if table is not None:
+                counts = table.lookup(to_minor_units(amount, plan.decimal_places))
+            else:
+                counts = None
+            
+            solve_info = None
+            if counts is not None:
+                # Precomputed counts from the memory-mapped table
+                breakdowns = self.breakdowns_from_counts(plan, counts)
+                if plan.mode == OptimizationMode.EXACT:
+                    solve_info = {'proven_optimal': True, 'optimality_gap': 0}
+            elif constrained:
+                # All constraints solved together as one integer program
+                breakdowns, solve_info = self._constrained_breakdown(
+                    amount, plan, signature, node_limit, deadline, budgeted
+                )
+            elif request.optimization_mode == OptimizationMode.EXACT:
+                # Minimum-count DP (greedy is not optimal for every system)
+                breakdowns, solve_info = self._exact_breakdown(
+                    amount, plan, node_limit, deadline
+                )
+            else:
+                # Perform greedy breakdown
+                breakdowns = self._greedy_breakdown(
+                    amount,
+                    plan,
+                    currency_config
+                )
+            
+            # Calculate totals
+            total_notes = sum(b.count for b in breakdowns if b.is_note)
+            total_coins = sum(b.count for b in breakdowns if b.is_coin)
+            
+            cached = (tuple(breakdowns), total_notes, total_coins, solve_info)
+            
+            # Budget-limited answers are not cached, so a later request
+            # with more time can still get the optimum
+            if cache is not None and (solve_info is None or solve_info['proven_optimal']):
+                cache.put(key, cached)
+        
+        # Breakdowns are immutable and shared; the result shell is per request
+        breakdowns, total_notes, total_coins, solve_info = cached
         
-        # Calculate totals
-        total_notes = sum(b.count for b in breakdowns if b.is_note)
-        total_coins = sum(b.count for b in breakdowns if b.is_coin)
+        metadata = request.metadata.copy()
+        if solve_info is not None:
+            metadata.update(solve_info)
         
         # Create result
         result = CalculationResult(
             original_amount=request.amount,
             currency=request.currency,
-            breakdowns=breakdowns,
+            breakdowns=list(breakdowns),
             total_notes=total_notes,
             total_coins=total_coins,
             total_denominations=total_notes + total_coins,
             optimization_mode=request.optimization_mode,
             constraints_applied=request.constraints,
-            metadata=request.metadata.copy()
+            metadata=metadata
         )
         
         return result
     
+    def cache_stats(self) -> Optional[Dict[str, int]]:
+        """
+        Get result cache statistics.
+        
+        Returns:
+            Dictionary with size, max_size, hits, misses and evictions,
+            or None if the cache is disabled
+        """
+        if self._result_cache is None:
+            return None
+        return self._result_cache.stats()
+    
+    def compile_constraints(
+        self,
+        currency_code: str,
+        constraints: Union[List[Constraint], ConstraintSignature],
+        mode: OptimizationMode = OptimizationMode.CONSTRAINED
+    ) -> ConstraintProgram:
+        """
+        Validate and compile constraints for a currency, reusing earlier work.
+        
+        Compiled programs are kept in an LRU keyed by (currency, mode,
+        constraint signature), so a batch applying the same constraint set
+        to many amounts compiles it once.
+        
+        Args:
+            currency_code: 3-letter currency code
+            constraints: Constraints, or their signature
+            mode: Optimization mode whose plan the program refers to
+        
+        Returns:
+            ConstraintProgram (immutable, shared)
+        
+        Raises:
+            ValueError: If currency not supported or a constraint is malformed
+            InfeasibleBreakdownError: If the constraints contradict each other
+        """
+        plan = self.get_plan(currency_code, mode)
+        if not isinstance(constraints, frozenset):
+            constraints = constraint_signature(constraints)
+        return self._program_for(plan, constraints)
+    
+    def _program_for(
+        self,
+        plan: DenominationPlan,
+        signature: ConstraintSignature
+    ) -> ConstraintProgram:
+        """Compiled program for a plan and signature (cached)."""
+        key = (self.config_hash, plan.currency, plan.mode, signature)
+        program = self._program_cache.get(key)
+        if program is None:
+            program = compile_constraints(plan, signature)
+            self._program_cache.put(key, program)
+        return program
+    
+    def calculate_batch(
+        self,
+        amounts: Any,
+        currency: str,
+        mode: OptimizationMode = OptimizationMode.GREEDY,
+        constraints: Optional[List[Constraint]] = None
+    ) -> BatchCalculationResult:
+        """
+        Calculate denomination counts for many amounts in one call.
+        
+        Amounts are integers in minor units (e.g. paise, cents). The greedy
+        divmod runs column by column across all amounts with NumPy int64;
+        if NumPy is missing or an amount would overflow int64, the batch is
+        computed with Python ints instead. EXACT mode runs the minimum-count
+        solver per amount. If a lookup table is open for the plan and covers
+        every amount, GREEDY and EXACT counts are gathered from it in one
+        NumPy operation instead. CONSTRAINED mode compiles the constraints once and
+        solves the program per amount; amounts it cannot pay get a zero row
+        and their full amount as remainder.
+        
+        Args:
+            amounts: One-dimensional sequence or array of amounts in minor units
+            currency: 3-letter currency code
+            mode: Optimization mode (greedy ordering)
+            constraints: Constraints for CONSTRAINED mode
+        
+        Returns:
+            BatchCalculationResult with an (N x k) count matrix. When the
+            exact solver ran per amount, `solve_info` has its
+            proven_optimal / optimality_gap info for each amount
+        
+        Raises:
+            ValueError: If currency not supported, amounts or constraints invalid
+            InfeasibleBreakdownError: If the constraints contradict each other
+        """
+        plan = self.get_plan(currency, mode)
+        is_note = [plan.is_note(i) for i in range(len(plan))]
+        
+        program = None
+        if plan.mode == OptimizationMode.CONSTRAINED and constraints:
+            program = self.compile_constraints(plan.currency, constraints)
+            if program.is_trivial:
+                # Nothing restricted: same as a minimum-count breakdown
+                plan = self._plans[(plan.currency, OptimizationMode.EXACT)]
+                program = None
+        
+        table_counts = None
+        if program is None:
+            table_counts = self._table_counts(plan, amounts)
+        
+        solve_info = None
+        
+        if program is not None:
+            counts = []
+            remainders = []
+            for units in amounts:
+                units = operator.index(units)
+                if units < 0:
+                    raise ValueError("Amounts must be non-negative minor units")
+                row, _ = solve_program(program, plan, units)
+                if row is None:
+                    counts.append([0] * len(plan))
+                    remainders.append(units)
+                else:
+                    counts.append(row)
+                    remainders.append(0)
+            vectorized = False
+        elif table_counts is not None:
+            counts, remainders = table_counts
+            vectorized = True
+        elif plan.currency in self._exact_solvers and plan.mode == OptimizationMode.EXACT:
+            solved = [self._solve_exact(plan, operator.index(units)) for units in amounts]
+            counts = [row for row, _, _ in solved]
+            remainders = [remainder for _, remainder, _ in solved]
+            solve_info = [info for _, _, info in solved]
+            vectorized = False
+        else:
+            counts, remainders, vectorized = greedy_counts_batch(amounts, plan.values)
+        
+        if vectorized:
+            # One pass over the matrix instead of copying masked columns
+            note_mask = np.array(is_note, dtype=np.int64)
+            total_notes = counts @ note_mask
+            total_coins = counts @ (1 - note_mask)
+        else:
+            total_notes = [
+                sum(c for c, note in zip(row, is_note) if note) for row in counts
+            ]
+            total_coins = [
+                sum(c for c, note in zip(row, is_note) if not note) for row in counts
+            ]
+        
+        return BatchCalculationResult(
+            currency=plan.currency,
+            optimization_mode=OptimizationMode(mode),
+            denominations=list(plan.denominations),
+            is_note=is_note,
+            counts=counts,
+            total_notes=total_notes,
+            total_coins=total_coins,
+            remainders=remainders,
+            vectorized=vectorized,
+            solve_info=solve_info
+        )
+    
+    def aggregate(
+        self,
+        amounts: Iterable[Any],
+        currency: Optional[str] = None,
+        mode: OptimizationMode = OptimizationMode.GREEDY,
+        chunk_size: int = 4096
+    ) -> AggregateResult:
+        """
+        Sum denomination counts over a stream of amounts.
+        
+        Amounts are folded into one count per denomination as they are read,
+        so no per-amount result is built and memory stays bounded by
+        chunk_size whatever the length of the stream (generators welcome).
+        Chunks are vectorized the same way as calculate_batch (greedy
+        divmod, or a gather from the plan's lookup table).
+        
+        Args:
+            amounts: Iterable of amounts (Decimal, str or number, in major
+                    units), or of (amount, currency) pairs if currency is None
+            currency: 3-letter currency code for plain amounts
+            mode: Optimization mode
+            chunk_size: Amounts buffered per currency before folding
+        
+        Returns:
+            AggregateResult with grand totals and per-currency subtotals
+        
+        Raises:
+            ValueError: If a currency is not supported or an amount is invalid
+        """
+        if chunk_size <= 0:
+            raise ValueError("Chunk size must be positive")
+        
+        mode = OptimizationMode(mode)
+        if currency is not None:
+            currency = currency.upper()
+        
+        plans: Dict[str, DenominationPlan] = {}
+        counts: Dict[str, List[int]] = {}
+        buffers: Dict[str, List[int]] = {}
+        amount_counts: Dict[str, int] = {}
+        totals: Dict[str, int] = {}
+        remainders: Dict[str, int] = {}
+        
+        for position, item in enumerate(amounts):
+            if currency is None:
+                amount, code = item
+                code = code.upper()
+            else:
+                amount, code = item, currency
+            
+            plan = plans.get(code)
+            if plan is None:
+                plan = plans[code] = self.get_plan(code, mode)
+                counts[code] = [0] * len(plan)
+                buffers[code] = []
+                amount_counts[code] = totals[code] = remainders[code] = 0
+            
+            if not isinstance(amount, Decimal):
+                amount = Decimal(str(amount))
+            if not amount > 0:
+                raise ValueError(f"Amount at position {position} must be positive")
+            
+            buffer = buffers[code]
+            buffer.append(to_minor_units(amount, plan.decimal_places))
+            if len(buffer) >= chunk_size:
+                amount_counts[code] += len(buffer)
+                totals[code] += sum(buffer)
+                remainders[code] += self._fold_counts(plan, buffer, counts[code])
+                buffer.clear()
+        
+        currencies = {}
+        for code, plan in plans.items():
+            buffer = buffers[code]
+            if buffer:
+                amount_counts[code] += len(buffer)
+                totals[code] += sum(buffer)
+                remainders[code] += self._fold_counts(plan, buffer, counts[code])
+            
+            breakdowns = self.breakdowns_from_counts(plan, counts[code])
+            currencies[plan.currency] = CurrencyAggregate(
+                currency=plan.currency,
+                amount_count=amount_counts[code],
+                total_amount=from_minor_units(totals[code], plan.decimal_places),
+                breakdowns=breakdowns,
+                total_notes=sum(b.count for b in breakdowns if b.is_note),
+                total_coins=sum(b.count for b in breakdowns if b.is_coin),
+                remainder=from_minor_units(remainders[code], plan.decimal_places)
+            )
+        
+        return AggregateResult(optimization_mode=mode, currencies=currencies)
+    
+    def _fold_counts(
+        self,
+        plan: DenominationPlan,
+        amounts: List[int],
+        counts: List[int]
+    ) -> int:
+        """
+        Add the breakdown counts of a chunk of amounts into `counts`.
+        
+        Args:
+            plan: Precompiled denomination plan
+            amounts: Amounts in minor units
+            counts: Accumulator aligned with the plan (updated in place)
+        
+        Returns:
+            Undistributed minor units of the chunk
+        """
+        table_counts = self._table_counts(plan, amounts)
+        
+        solver = None
+        if plan.mode == OptimizationMode.EXACT:
+            solver = self._exact_solvers.get(plan.currency)
+        
+        if table_counts is not None:
+            chunk_counts, chunk_remainders = table_counts
+            vectorized = True
+        elif solver is not None:
+            remainder = 0
+            for units in amounts:
+                row, rest, _ = self._solve_exact(plan, units)
+                for i, count in enumerate(row):
+                    counts[i] += count
+                remainder += rest
+            return remainder
+        else:
+            chunk_counts, chunk_remainders, vectorized = greedy_counts_batch(amounts, plan.values)
+        
+        if vectorized:
+            # No column sum can exceed the chunk total, so int64 is safe below it
+            dtype = np.int64 if sum(amounts) <= INT64_MAX else object
+            column_totals = chunk_counts.sum(axis=0, dtype=dtype).tolist()
+            remainder = int(chunk_remainders.sum(dtype=dtype))
+        else:
+            column_totals = [sum(column) for column in zip(*chunk_counts)]
+            remainder = sum(chunk_remainders)
+        
+        for i, total in enumerate(column_totals):
+            counts[i] += total
+        return remainder
+    
+    def _table_counts(
+        self,
+        plan: DenominationPlan,
+        amounts: Any
+    ) -> Optional[Tuple[Any, Any]]:
+        """
+        Count matrix and remainders of a batch, read from the plan's lookup table.
+        
+        Returns:
+            Tuple of (N x k int64 counts, int64 remainders), or None if there
+            is no table, NumPy is missing, an amount does not fit in int64 or
+            the table cannot answer every amount
+        """
+        table = self._lookup_tables.get((plan.currency, plan.mode))
+        if table is None:
+            return None
+        
+        array = as_int64_array(amounts)
+        if array is None:
+            return None
+        counts = table.lookup_batch(array)
+        if counts is None:
+            return None
+        if plan.values[-1] == table.unit:
+            # The last denomination is the unit itself, so every row is paid
+            # in full and only the part below the unit is left over
+            return counts, array % table.unit
+        # count_i * value_i never exceeds the amount, so this stays in int64
+        return counts, array - counts @ np.array(plan.values, dtype=np.int64)
+    
+    def calculate_bulk(self, request: BulkCalculationRequest) -> BulkCalculationResult:
+        """
+        Calculate many independent requests in one call.
+        
+        Requests without constraints or budgets are grouped by (currency,
+        mode), and the distinct amounts of each group go through
+        calculate_batch (vectorized greedy, or the minimum-count solver for
+        EXACT). Everything else is calculated one request at a time. A
+        request that fails is reported in `errors` with its index instead
+        of raising; `results` holds the successful results in request order.
+        EXACT results carry the solver's proof info per amount
+        (proven_optimal / optimality_gap), as calculate() reports it.
+        Summary and analytics are accumulated while the results are
+        collected.
+        
+        Args:
+            request: BulkCalculationRequest
+        
+        Returns:
+            BulkCalculationResult. The summary has per-currency totals; the
+            analytics have per-denomination totals, a decade histogram of
+            amounts per currency, the mode mix and how many requests took
+            the batched path.
+        """
+        start = time.perf_counter()
+        calculations = request.calculations
+        outcomes: List[Union[CalculationResult, str, None]] = [None] * len(calculations)
+        
+        currencies: Dict[str, Dict[str, Any]] = {}
+        denomination_totals: Dict[str, Dict[Decimal, int]] = {}
+        
+        def tally(code, breakdowns, total_notes, total_coins, times=1):
+            """Add `times` results with these breakdowns to the currency totals."""
+            subtotal = currencies.get(code)
+            if subtotal is None:
+                subtotal = currencies[code] = {
+                    'count': 0,
+                    'total_amount': Decimal(0),
+                    'total_notes': 0,
+                    'total_coins': 0,
+                    'total_denominations': 0
+                }
+                denomination_totals[code] = {}
+            subtotal['total_notes'] += total_notes * times
+            subtotal['total_coins'] += total_coins * times
+            subtotal['total_denominations'] += (total_notes + total_coins) * times
+            if request.generate_analytics:
+                totals = denomination_totals[code]
+                for b in breakdowns:
+                    totals[b.denomination] = totals.get(b.denomination, 0) + b.count * times
+        
+        groups: Dict[Tuple[str, OptimizationMode], List[int]] = {}
+        for index, calc in enumerate(calculations):
+            if calc.constraints or calc.time_budget_ms is not None or calc.node_budget is not None:
+                try:
+                    result = self.calculate(calc)
+                except ValueError as e:
+                    outcomes[index] = str(e)
+                    continue
+                outcomes[index] = result
+                tally(result.currency, result.breakdowns, result.total_notes, result.total_coins)
+            else:
+                groups.setdefault((calc.currency, calc.optimization_mode), []).append(index)
+        
+        batched = 0
+        for (code, mode), indices in groups.items():
+            try:
+                plan = self.get_plan(code, mode)
+            except ValueError as e:
+                for index in indices:
+                    outcomes[index] = str(e)
+                continue
+            
+            units: Dict[int, int] = {}
+            repeats: Dict[int, int] = {}
+            for index in indices:
+                try:
+                    amount_units = to_minor_units(calculations[index].amount, plan.decimal_places)
+                except ValueError as e:
+                    outcomes[index] = str(e)
+                    continue
+                units[index] = amount_units
+                repeats[amount_units] = repeats.get(amount_units, 0) + 1
+            
+            if not repeats:
+                continue
+            
+            # Each distinct amount is solved once and its repeats share the
+            # breakdowns. Breakdown objects are immutable, so amounts using
+            # the same count of a denomination share that object too, and
+            # the group is tallied once from repeat-weighted column totals
+            distinct = list(repeats)
+            batch = self.calculate_batch(distinct, plan.currency, mode)
+            if batch.vectorized:
+                rows = batch.counts.tolist()
+                notes = batch.total_notes.tolist()
+                coins = batch.total_coins.tolist()
+            else:
+                rows, notes, coins = batch.counts, batch.total_notes, batch.total_coins
+            
+            proven = None
+            if mode == OptimizationMode.EXACT:
+                proven = {'proven_optimal': True, 'optimality_gap': 0}
+            
+            pieces: Dict[Tuple[int, int], DenominationBreakdown] = {}
+            solved = {}
+            column_totals = [0] * len(plan)
+            group_notes = group_coins = 0
+            for position, amount_units in enumerate(distinct):
+                times = repeats[amount_units]
+                breakdowns = []
+                for i, count in enumerate(rows[position]):
+                    if count:
+                        column_totals[i] += count * times
+                        piece = pieces.get((i, count))
+                        if piece is None:
+                            denom = plan.denominations[i]
+                            piece = pieces[i, count] = DenominationBreakdown(
+                                denomination=denom,
+                                count=count,
+                                total_value=exact_total(denom, count),
+                                is_note=batch.is_note[i]
+                            )
+                        breakdowns.append(piece)
+                solve_info = batch.solve_info[position] if batch.solve_info else proven
+                total_notes, total_coins = notes[position], coins[position]
+                solved[amount_units] = (breakdowns, total_notes, total_coins, solve_info)
+                group_notes += total_notes * times
+                group_coins += total_coins * times
+            tally(code, self.breakdowns_from_counts(plan, column_totals), group_notes, group_coins)
+            
+            for index, amount_units in units.items():
+                calc = calculations[index]
+                breakdowns, total_notes, total_coins, solve_info = solved[amount_units]
+                metadata = calc.metadata.copy()
+                if solve_info is not None:
+                    metadata.update(solve_info)
+                outcomes[index] = CalculationResult(
+                    original_amount=calc.amount,
+                    currency=calc.currency,
+                    breakdowns=list(breakdowns),
+                    total_notes=total_notes,
+                    total_coins=total_coins,
+                    total_denominations=total_notes + total_coins,
+                    optimization_mode=calc.optimization_mode,
+                    constraints_applied=calc.constraints,
+                    metadata=metadata
+                )
+            batched += len(units)
+        
+        # One pass in request order: results, errors, amounts and mode mix
+        results: List[CalculationResult] = []
+        errors: List[Dict[str, Any]] = []
+        histogram: Dict[str, Dict[int, int]] = {}
+        modes: Dict[OptimizationMode, int] = {}
+        
+        for index, outcome in enumerate(outcomes):
+            calc = calculations[index]
+            modes[calc.optimization_mode] = modes.get(calc.optimization_mode, 0) + 1
+            
+            if not isinstance(outcome, CalculationResult):
+                errors.append({
+                    'index': index,
+                    'amount': str(calc.amount),
+                    'currency': calc.currency,
+                    'error': outcome
+                })
+                continue
+            results.append(outcome)
+            
+            subtotal = currencies[outcome.currency]
+            subtotal['count'] += 1
+            subtotal['total_amount'] = EXACT_CONTEXT.add(
+                subtotal['total_amount'], outcome.original_amount
+            )
+            
+            if request.generate_analytics:
+                # Decade of the amount: 10^k <= amount < 10^(k+1)
+                decades = histogram.get(outcome.currency)
+                if decades is None:
+                    decades = histogram[outcome.currency] = {}
+                decade = outcome.original_amount.adjusted()
+                decades[decade] = decades.get(decade, 0) + 1
+        
+        summary: Dict[str, Any] = {}
+        if request.generate_summary:
+            for subtotal in currencies.values():
+                subtotal['total_amount'] = str(subtotal['total_amount'])
+            summary = {
+                'currencies': currencies,
+                'total_notes': sum(c['total_notes'] for c in currencies.values()),
+                'total_coins': sum(c['total_coins'] for c in currencies.values()),
+                'total_denominations': sum(
+                    c['total_denominations'] for c in currencies.values()
+                )
+            }
+        
+        analytics = None
+        if request.generate_analytics:
+            analytics = {
+                'denomination_totals': {
+                    code: {
+                        str(denom): count
+                        for denom, count in sorted(totals.items(), reverse=True)
+                    }
+                    for code, totals in denomination_totals.items()
+                },
+                'amount_histogram': {
+                    code: {
+                        f"{Decimal(1).scaleb(decade):f}-{Decimal(1).scaleb(decade + 1):f}": count
+                        for decade, count in sorted(decades.items())
+                    }
+                    for code, decades in histogram.items()
+                },
+                'mode_mix': {mode.value: count for mode, count in modes.items()},
+                'batched': batched,
+                'individual': len(calculations) - batched,
+                'processing_time_ms': (time.perf_counter() - start) * 1000
+            }
+        return BulkCalculationResult(
+            results=results,
+            summary=summary,
+            analytics=analytics,
+            errors=errors
+        )
+    
     def _get_denominations_for_mode(
         self,
         currency_config: CurrencyConfig,
@@ -180,6 +1091,10 @@ class DenominationEngine:
             # Could implement custom ordering
             return all_denoms
         
+        elif mode == OptimizationMode.EXACT:
+            # Largest first; counts come from the minimum-count DP solver
+            return all_denoms
+        
         else:
             # Default to greedy
             return all_denoms
@@ -187,7 +1102,7 @@ class DenominationEngine:
     def _greedy_breakdown(
         self,
         amount: Decimal,
-        denominations: List[Decimal],
+        plan: DenominationPlan,
         currency_config: CurrencyConfig
     ) -> List[DenominationBreakdown]:
         """
@@ -198,16 +1113,19 @@ class DenominationEngine:
         
         Args:
             amount: Amount to break down
-            denominations: Sorted list of denominations (descending)
+            plan: Precompiled denomination plan (greedy order)
             currency_config: Currency configuration
         
         Returns:
             List of DenominationBreakdown objects
         """
+        if self.use_minor_units:
+            return self._greedy_breakdown_minor_units(amount, plan)
+        
         remaining = amount
         breakdowns = []
         
-        for denom in denominations:
+        for i, denom in enumerate(plan.denominations):
             if remaining <= 0:
                 break
             
@@ -220,7 +1138,7 @@ class DenominationEngine:
                 remaining -= total_value
                 
                 # Determine if note or coin
-                is_note = currency_config.is_note(denom)
+                is_note = plan.is_note(i)
                 
                 breakdowns.append(DenominationBreakdown(
                     denomination=denom,
@@ -244,6 +1162,342 @@ class DenominationEngine:
         
         return breakdowns
     
+    def _greedy_breakdown_minor_units(
+        self,
+        amount: Decimal,
+        plan: DenominationPlan
+    ) -> List[DenominationBreakdown]:
+        """
+        Perform greedy breakdown as an integer divmod chain.
+        
+        The plan's denominations were converted to minor units at load time,
+        so the loop is pure Python int arithmetic with no Decimal context.
+        Values are converted back to Decimal only when the breakdowns are built.
+        
+        Args:
+            amount: Amount to break down
+            plan: Precompiled denomination plan (greedy order)
+        
+        Returns:
+            List of DenominationBreakdown objects
+        """
+        units = to_minor_units(amount, plan.decimal_places)
+        note_mask = plan.note_mask
+        breakdowns = []
+        
+        for i, (denom, value) in enumerate(zip(plan.denominations, plan.values)):
+            if units <= 0:
+                break
+            
+            count, units = divmod(units, value)
+            
+            if count > 0:
+                breakdowns.append(DenominationBreakdown(
+                    denomination=denom,
+                    count=count,
+                    total_value=exact_total(denom, count),
+                    is_note=bool(note_mask >> i & 1)
+                ))
+        
+        # Anything left below the smallest denomination is dropped, as in
+        # the Decimal path
+        return breakdowns
+    
+    def _exact_breakdown(
+        self,
+        amount: Decimal,
+        plan: DenominationPlan,
+        node_limit: int = DEFAULT_NODE_LIMIT,
+        deadline: Optional[float] = None
+    ) -> Tuple[List[DenominationBreakdown], Dict[str, Any]]:
+        """
+        Perform minimum-count breakdown.
+        
+        Canonical currencies are solved exactly by greedy; the others use
+        the bounded DP solver. Under a deadline the DP table may grow for
+        half of the remaining time; if it does not cover the amount by then,
+        branch-and-bound searches for the rest, and greedy is the last resort.
+        
+        Args:
+            amount: Amount to break down
+            plan: Precompiled denomination plan
+            node_limit: Search effort limit for the fallback search
+            deadline: time.perf_counter() value after which solving stops
+        
+        Returns:
+            Tuple of (DenominationBreakdown objects, largest first;
+            proven_optimal / optimality_gap / fallback info)
+        """
+        solver = self._exact_solvers.get(plan.currency)
+        if solver is None:
+            breakdowns = self._greedy_breakdown_minor_units(amount, plan)
+            return breakdowns, {'proven_optimal': True, 'optimality_gap': 0}
+        
+        units = to_minor_units(amount, plan.decimal_places)
+        
+        # Growing the DP table may use half the budget; the search gets the rest
+        table_deadline = deadline
+        if deadline is not None:
+            now = time.perf_counter()
+            table_deadline = now + max(0.0, deadline - now) / 2
+        
+        solved = solver.solve(units, table_deadline)
+        if solved is not None:
+            return self.breakdowns_from_counts(plan, solved[0]), {
+                'proven_optimal': True,
+                'optimality_gap': 0
+            }
+        
+        # Out of time, or the amount is past the DP table cap: best
+        # breakdown found within the remaining budget
+        units -= units % solver.unit
+        counts, exhausted = solve_bounded(
+            units, plan.values, [None] * len(plan), node_limit, deadline=deadline
+        )
+        return self._budgeted_breakdowns(
+            amount, plan, counts, exhausted, cost_lower_bound(units, plan.values)
+        )
+    
+    def _solve_exact(
+        self,
+        plan: DenominationPlan,
+        units: int
+    ) -> Tuple[List[int], int, Dict[str, Any]]:
+        """
+        Minimum-count counts for one amount with the plan's exact solver.
+        
+        Amounts past the solver's DP table cap are searched by
+        branch-and-bound within DEFAULT_NODE_LIMIT nodes (the best breakdown
+        found, not necessarily proven), with greedy as the last resort.
+        
+        Returns:
+            Tuple of (counts aligned with the plan, undistributed minor
+            units, proven_optimal / optimality_gap / fallback info - the
+            same info calculate() reports for the amount)
+        """
+        solver = self._exact_solvers[plan.currency]
+        solved = solver.solve(units)
+        if solved is not None:
+            return solved[0], solved[1], {'proven_optimal': True, 'optimality_gap': 0}
+        
+        remainder = units % solver.unit
+        units -= remainder
+        counts, exhausted = solve_bounded(units, plan.values, [None] * len(plan), self.DEFAULT_NODE_LIMIT)
+        if counts is not None:
+            info = {'proven_optimal': exhausted}
+        else:
+            counts = []
+            rest = units
+            for value in plan.values:
+                count, rest = divmod(rest, value)
+                counts.append(count)
+            remainder += rest
+            info = {'proven_optimal': False, 'fallback': 'greedy'}
+        
+        bound = cost_lower_bound(units, plan.values)
+        info['optimality_gap'] = 0 if info['proven_optimal'] else max(0, sum(counts) - bound)
+        return counts, remainder, info
+    
+    def _constrained_breakdown(
+        self,
+        amount: Decimal,
+        plan: DenominationPlan,
+        signature: ConstraintSignature,
+        node_limit: int = DEFAULT_NODE_LIMIT,
+        deadline: Optional[float] = None,
+        budgeted: bool = False
+    ) -> Tuple[List[DenominationBreakdown], Dict[str, Any]]:
+        """
+        Perform a breakdown that satisfies every constraint at once.
+        
+        The constraints are compiled into bounds and objective weights and
+        solved exactly, so the amount is always paid in full.
+        
+        Args:
+            amount: Amount to break down
+            plan: Precompiled denomination plan
+            signature: Signature of the constraints to satisfy
+            node_limit: Search effort limit
+            deadline: time.perf_counter() value after which the search stops
+            budgeted: The request set a budget, so running out of it falls
+                     back to greedy instead of failing
+        
+        Returns:
+            Tuple of (DenominationBreakdown objects, largest first;
+            proven_optimal / optimality_gap / fallback info)
+        
+        Raises:
+            ValueError: If a constraint is malformed
+            InfeasibleBreakdownError: If no breakdown satisfies the constraints
+        """
+        program = self._program_for(plan, signature)
+        if program.is_trivial:
+            return self._exact_breakdown(
+                amount,
+                self._plans[(plan.currency, OptimizationMode.EXACT)],
+                node_limit,
+                deadline
+            )
+        
+        units = to_minor_units(amount, plan.decimal_places)
+        if from_minor_units(units, plan.decimal_places) != amount:
+            raise InfeasibleBreakdownError(
+                f"Amount {amount} is finer than the {plan.currency} minor unit"
+            )
+        
+        counts, exhausted = solve_program(program, plan, units, node_limit, deadline)
+        if counts is None:
+            if exhausted:
+                raise InfeasibleBreakdownError(
+                    f"No breakdown of {amount} {plan.currency} satisfies the constraints"
+                )
+            if not budgeted:
+                raise InfeasibleBreakdownError(
+                    f"No breakdown of {amount} {plan.currency} found within the search limit"
+                )
+        
+        bound = cost_lower_bound(units, plan.values, program.upper, program.lower)
+        breakdowns, info = self._budgeted_breakdowns(amount, plan, counts, exhausted, bound)
+        if counts is None:
+            info['constraints_satisfied'] = False
+        return breakdowns, info
+    
+    def _budgeted_breakdowns(
+        self,
+        amount: Decimal,
+        plan: DenominationPlan,
+        counts: Optional[List[int]],
+        exhausted: bool,
+        bound: int
+    ) -> Tuple[List[DenominationBreakdown], Dict[str, Any]]:
+        """Breakdowns and solve info for a search result, greedy if it found none."""
+        if counts is not None:
+            breakdowns = self.breakdowns_from_counts(plan, counts)
+            info = {'proven_optimal': exhausted}
+        else:
+            greedy_plan = self._plans[(plan.currency, OptimizationMode.GREEDY)]
+            breakdowns = self._greedy_breakdown_minor_units(amount, greedy_plan)
+            info = {'proven_optimal': False, 'fallback': 'greedy'}
+        
+        pieces = sum(b.count for b in breakdowns)
+        info['optimality_gap'] = 0 if info['proven_optimal'] else max(0, pieces - bound)
+        return breakdowns, info
+    
+    def breakdowns_from_counts(
+        self,
+        plan: DenominationPlan,
+        counts: List[int]
+    ) -> List[DenominationBreakdown]:
+        """Build DenominationBreakdown objects from counts aligned with a plan."""
+        note_mask = plan.note_mask
+        return [
+            DenominationBreakdown(
+                denomination=denom,
+                count=count,
+                total_value=exact_total(denom, count),
+                is_note=bool(note_mask >> i & 1)
+            )
+            for i, (denom, count) in enumerate(zip(plan.denominations, counts))
+            if count > 0
+        ]
+    
+    def count_breakdowns(
+        self,
+        amount: Decimal,
+        currency_code: str
+    ) -> int:
+        """
+        Count the distinct ways an amount can be paid in a currency.
+        
+        Breakdowns are distinct count vectors over the currency's
+        denominations; a value issued both as a note and as a coin counts
+        as one denomination.
+        
+        Args:
+            amount: Amount to pay
+            currency_code: 3-letter currency code
+        
+        Returns:
+            Number of breakdowns (exact integer, 0 if the amount is finer
+            than the denominations allow)
+        
+        Raises:
+            ValueError: If the currency is not supported, the amount is
+                negative or too large to count in memory
+        """
+        config, denominations, values = self._denomination_values(currency_code)
+        units = self._exact_minor_units(amount, config)
+        if units is None:
+            return 0
+        return count_combinations(units, values)
+    
+    def iter_breakdowns(
+        self,
+        amount: Decimal,
+        currency_code: str
+    ) -> Iterator[List[DenominationBreakdown]]:
+        """
+        Lazily yield every way an amount can be paid in a currency.
+        
+        Breakdowns come in descending lexicographic order of counts, largest
+        denomination first, so the greedy breakdown is the first one. Only
+        the breakdown being yielded is built, so callers can stop early or
+        stream through amounts with huge numbers of breakdowns.
+        
+        Args:
+            amount: Amount to pay
+            currency_code: 3-letter currency code
+        
+        Yields:
+            List of DenominationBreakdown objects (largest first)
+        
+        Raises:
+            ValueError: If the currency is not supported or the amount is negative
+        """
+        config, denominations, values = self._denomination_values(currency_code)
+        units = self._exact_minor_units(amount, config)
+        if units is None:
+            return
+        
+        is_note = [config.is_note(d) for d in denominations]
+        for counts in iter_combinations(units, values):
+            yield [
+                DenominationBreakdown(
+                    denomination=denom,
+                    count=count,
+                    total_value=exact_total(denom, count),
+                    is_note=note
+                )
+                for denom, count, note in zip(denominations, counts, is_note)
+                if count > 0
+            ]
+    
+    def _denomination_values(
+        self,
+        currency_code: str
+    ) -> Tuple[CurrencyConfig, List[Decimal], List[int]]:
+        """Currency config, its distinct denominations (largest first) and their minor units."""
+        config = self.get_currency_config(currency_code)
+        denominations = list(dict.fromkeys(config.all_denominations))
+        values = [denomination_to_minor_units(d, config.decimal_places) for d in denominations]
+        return config, denominations, values
+    
+    def _exact_minor_units(
+        self,
+        amount: Decimal,
+        config: CurrencyConfig
+    ) -> Optional[int]:
+        """Amount in minor units, or None if it is finer than the minor unit."""
+        if not isinstance(amount, Decimal):
+            amount = Decimal(str(amount))
+        if amount < 0:
+            raise ValueError("Amount must be non-negative")
+        
+        units = to_minor_units(amount, config.decimal_places)
+        if from_minor_units(units, config.decimal_places) != amount:
+            return None
+        return units
+    
     def generate_alternatives(
         self,
         request: CalculationRequest,
@@ -252,23 +1506,37 @@ class DenominationEngine:
         """
         Generate alternative denomination breakdowns.
         
+        Tries the other optimization modes and keeps only breakdowns that
+        differ from the original and from each other (several modes give
+        the same result for canonical currencies). For searched
+        alternatives see OptimizationEngine.suggest_alternatives.
+        
         Args:
             request: Original calculation request
-            count: Number of alternatives to generate
+            count: Maximum number of alternatives to generate
         
         Returns:
             List of alternative CalculationResult objects
         """
         alternatives = []
         
+        def key(result: CalculationResult) -> frozenset:
+            return frozenset((b.denomination, b.count) for b in result.breakdowns)
+        
+        seen = {key(self.calculate(request))}
+        
         # Generate alternatives using different optimization modes
         modes = [
             OptimizationMode.GREEDY,
+            OptimizationMode.EXACT,
             OptimizationMode.MINIMIZE_LARGE,
-            OptimizationMode.BALANCED
+            OptimizationMode.BALANCED,
+            OptimizationMode.MINIMIZE_SMALL
         ]
         
-        for mode in modes[:count]:
+        for mode in modes:
+            if len(alternatives) >= count:
+                break
             if mode != request.optimization_mode:
                 alt_request = CalculationRequest(
                     amount=request.amount,
@@ -279,7 +1547,9 @@ class DenominationEngine:
                 )
                 
                 result = self.calculate(alt_request)
-                alternatives.append(result)
+                if key(result) not in seen:
+                    seen.add(key(result))
+                    alternatives.append(result)
         
         return alternatives
     
@@ -319,6 +1589,24 @@ class DenominationEngine:
         """Get list of supported currency codes."""
         return [code for code, config in self.currencies.items() if config.active]
     
+    def lookup_table_info(self) -> List[Dict]:
+        """Describe the lookup tables in use (one entry per currency and mode)."""
+        return [
+            {
+                'currency': code,
+                'mode': mode.value,
+                'ceiling': table.ceiling,
+                'split': table.split,
+                'path': table.path
+            }
+            for (code, mode), table in self._lookup_tables.items()
+        ]
+    
+    def get_canonicality(self, currency_code: str) -> CanonicalityReport:
+        """Get the load-time greedy optimality analysis for a currency."""
+        config = self.get_currency_config(currency_code)
+        return self._canonicality[config.code]
+    
     def get_currency_info(self, currency_code: str) -> Dict:
         """
         Get detailed information about a currency.
@@ -330,6 +1618,7 @@ class DenominationEngine:
             Dictionary with currency details
         """
         config = self.get_currency_config(currency_code)
+        canonicality = self._canonicality[config.code]
         
         return {
             'code': config.code,
@@ -339,7 +1628,13 @@ class DenominationEngine:
             'notes': [str(n) for n in config.notes],
             'coins': [str(c) for c in config.coins],
             'smallest_unit': str(config.smallest_unit),
-            'total_denominations': len(config.all_denominations)
+            'total_denominations': len(config.notes) + len(config.coins),
+            'greedy_optimal': canonicality.canonical,
+            'greedy_counterexample': (
+                str(canonicality.counterexample)
+                if canonicality.counterexample is not None else None
+            ),
+            'exact_solver': canonicality.exact_solver
         }
 
 
@@ -374,3 +1669,15 @@ def calculate_denominations(
     )
     
     return engine.calculate(request)
+
+
+def count_breakdowns(amount: float | Decimal | str, currency: str) -> int:
+    """
+    Quick count of the distinct ways to pay an amount.
+    
+    Example:
+        >>> count_breakdowns(10, "INR")
+        11
+    """
+    engine = DenominationEngine()
+    return engine.count_breakdowns(Decimal(str(amount)), currency)
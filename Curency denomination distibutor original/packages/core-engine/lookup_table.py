@@ -0,0 +1,364 @@
+"""
+Denomination Lookup Tables
+
+Precomputed, memory-mapped denomination counts for small amounts.
+
+A table stores the count vector of every amount from 0 up to a ceiling for
+one (currency, mode) plan, as a flat binary file that is opened with mmap.
+Every process that opens the same file shares one copy of the pages, and a
+lookup below the ceiling is a single slice of the mapped array. Batches are
+answered with one NumPy gather over the mapped rows, which is where tables
+pay off: a single greedy row costs about as much to compute as to read.
+
+Larger amounts are split into a quotient of the largest denomination plus a
+residue that is read from the table, when that split is provably the same
+breakdown the engine would compute.
+
+Build tables with:
+    python lookup_table.py --output-dir lookup --ceiling 1000000
+"""
+
+import argparse
+import itertools
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, List, Optional
+
+from models import DenominationPlan, OptimizationMode
+from solvers import MinCountSolver, HAS_NUMPY
+
+if HAS_NUMPY:
+    import numpy as np
+
+
+MAGIC = b"DENOMLUT"
+FORMAT_VERSION = 1
+
+# magic, version, k, currency, mode, config sha256, unit, rows,
+# largest denomination (in units), count typecode, byte order, split flag
+_HEADER = struct.Struct("<8sHH8s16s32sQQQcc?")
+HEADER_SIZE = 128
+
+# Rows are written in chunks so building never holds the whole table
+_BUILD_CHUNK_ROWS = 65536
+
+
+def table_filename(currency: str, mode: OptimizationMode) -> str:
+    """File name of the table for a currency and mode."""
+    return f"{currency}-{OptimizationMode(mode).value}.lut"
+
+
+def _count_typecode(max_count: int) -> str:
+    """Smallest unsigned typecode that holds max_count."""
+    for typecode in ("B", "H", "I", "Q"):
+        if max_count < 1 << (8 * struct.calcsize(typecode)):
+            return typecode
+    raise ValueError("Lookup table ceiling is too large")
+
+
+def _is_descending(values) -> bool:
+    """True if values are strictly decreasing (largest-first greedy order)."""
+    return all(a > b for a, b in zip(values, values[1:]))
+
+
+class DenominationLookupTable:
+    """
+    Read-only, memory-mapped table of denomination counts.
+    
+    Rows are indexed by amount // unit, where unit is the gcd of the
+    denomination values (anything below it is never distributed anyway).
+    Thread-safe: close() waits for lookups that are reading the mapping, and
+    lookups after it return None.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open and validate a table file.
+        
+        Args:
+            path: Path to a .lut file
+        
+        Raises:
+            ValueError: If the file is not a lookup table of a supported version
+        """
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._closed = False
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        if len(self._mmap) < HEADER_SIZE:
+            self._mmap.close()
+            raise ValueError(f"{path}: not a denomination lookup table")
+        
+        (magic, version, k, currency, mode, digest, unit, rows, largest,
+         typecode, byteorder, split) = _HEADER.unpack_from(self._mmap)
+        
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path}: not a denomination lookup table")
+        if version != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(
+                f"{path}: table format version {version}, expected {FORMAT_VERSION}"
+            )
+        if byteorder.decode() != sys.byteorder[0]:
+            self._mmap.close()
+            raise ValueError(f"{path}: table was built on a different byte order")
+        
+        self.currency = currency.rstrip(b"\0").decode()
+        self.mode = OptimizationMode(mode.rstrip(b"\0").decode())
+        self.config_hash = digest.hex()
+        self.unit = unit
+        self.rows = rows
+        self.k = k
+        self.split = split
+        self._largest = largest
+        
+        # Largest amount (minor units) answered without a split
+        self.ceiling = rows * unit - 1
+        
+        self._counts = memoryview(self._mmap)[HEADER_SIZE:].cast(typecode.decode())
+        self._array = None
+        if len(self._counts) != rows * k:
+            self.close()
+            raise ValueError(f"{path}: truncated lookup table")
+        
+        if HAS_NUMPY:
+            # (rows x k) view of the same pages for batch lookups
+            self._array = np.frombuffer(self._counts, dtype=typecode.decode()).reshape(rows, k)
+    
+    def lookup(self, units: int) -> Optional[List[int]]:
+        """
+        Get denomination counts for an amount.
+        
+        Args:
+            units: Amount in minor units
+        
+        Returns:
+            Counts aligned with the plan, or None if the table cannot answer
+        """
+        row, _ = divmod(units, self.unit)
+        k = self.k
+        
+        quotient = 0
+        if row >= self.rows:
+            if not self.split:
+                return None
+            # Take enough of the largest denomination to land inside the table
+            largest = self._largest
+            quotient = (row - self.rows + largest) // largest
+            row -= quotient * largest
+        
+        with self._lock:
+            if self._closed:
+                return None
+            counts = self._counts[row * k:(row + 1) * k].tolist()
+        counts[0] += quotient
+        return counts
+    
+    def lookup_batch(self, units: Any) -> Optional[Any]:
+        """
+        Get denomination counts for many amounts at once (needs NumPy).
+        
+        Args:
+            units: One-dimensional int64 array of amounts in minor units
+        
+        Returns:
+            (N x k) int64 count matrix, or None if the table cannot answer
+            every amount
+        """
+        if self._array is None:
+            return None
+        
+        rows = units // self.unit
+        quotients = None
+        beyond = rows >= self.rows
+        if beyond.any():
+            if not self.split:
+                return None
+            largest = self._largest
+            quotients = np.where(beyond, (rows - self.rows + largest) // largest, 0)
+            rows -= quotients * largest
+        
+        with self._lock:
+            if self._closed:
+                return None
+            # take() copies, so nothing refers to the mapping afterwards
+            counts = self._array.take(rows, axis=0).astype(np.int64)
+        if quotients is not None:
+            counts[:, 0] += quotients
+        return counts
+    
+    def close(self) -> None:
+        """Release the mapping once no lookup is reading it."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._array = None
+            self._counts.release()
+            self._mmap.close()
+    
+    def __len__(self) -> int:
+        """Number of rows."""
+        return self.rows
+
+
+def build_lookup_table(
+    engine,
+    currency: str,
+    mode: OptimizationMode,
+    ceiling: int,
+    path: str
+) -> DenominationLookupTable:
+    """
+    Build a table file for one currency and mode.
+    
+    Rows come from DenominationEngine.calculate_batch, so the table holds
+    exactly the breakdowns the engine computes. They are computed once into
+    a 64-bit scratch file and then stored with the smallest typecode that
+    holds the largest count actually seen (the worst case, amount divided
+    by the smallest denomination, is far above what greedy and minimum-count
+    breakdowns use). The file is written next to its destination and renamed
+    into place, so running processes never see a partial table.
+    
+    Args:
+        engine: DenominationEngine the table is built for
+        currency: 3-letter currency code
+        mode: Optimization mode
+        ceiling: Largest amount to precompute, in minor units
+        path: Output file path
+    
+    Returns:
+        The opened table
+    
+    Raises:
+        ValueError: If currency is not supported, ceiling is negative, or
+                    an EXACT row up to the ceiling is not proven optimal
+    """
+    if ceiling < 0:
+        raise ValueError("Ceiling must be non-negative")
+    
+    plan: DenominationPlan = engine.get_plan(currency, mode)
+    unit = math.gcd(*plan.values)
+    scaled = [v // unit for v in plan.values]
+    rows = ceiling // unit + 1
+    
+    # Splitting off the largest denomination is only safe when the engine
+    # would do the same: greedy takes floor(amount / largest) first, and
+    # the exact solver does so above its proven threshold
+    split = _is_descending(scaled) and rows >= scaled[0]
+    if split and mode == OptimizationMode.EXACT and not engine.get_canonicality(currency).canonical:
+        split = rows >= MinCountSolver(scaled).table_limit
+    
+    path = Path(path)
+    wide_path = path.with_name(path.name + ".wide")
+    tmp_path = path.with_name(path.name + ".tmp")
+    
+    max_count = 0
+    try:
+        with open(wide_path, "wb") as f:
+            for start in range(0, rows, _BUILD_CHUNK_ROWS):
+                stop = min(start + _BUILD_CHUNK_ROWS, rows)
+                if HAS_NUMPY:
+                    amounts = np.arange(start, stop, dtype=np.int64) * unit
+                else:
+                    amounts = [row * unit for row in range(start, stop)]
+                
+                batch = engine.calculate_batch(amounts, plan.currency, plan.mode)
+                # Looked-up EXACT rows are reported as proven minimum-count
+                unproven = [
+                    i for i, info in enumerate(batch.solve_info or ()) if not info['proven_optimal']
+                ]
+                if unproven:
+                    raise ValueError(
+                        f"{plan.currency} {plan.mode.value} breakdowns from "
+                        f"{(start + unproven[0]) * unit} minor units are not proven optimal; "
+                        f"use a lower ceiling"
+                    )
+                if batch.vectorized:
+                    block = np.ascontiguousarray(batch.counts, dtype=np.uint64)
+                    max_count = max(max_count, int(block.max(initial=0)))
+                else:
+                    block = array("Q", itertools.chain.from_iterable(batch.counts))
+                    max_count = max(max_count, max(block, default=0))
+                f.write(block.tobytes())
+        
+        typecode = _count_typecode(max_count)
+        header = _HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            len(plan),
+            plan.currency.encode(),
+            plan.mode.value.encode(),
+            bytes.fromhex(engine.config_hash),
+            unit,
+            rows,
+            max(scaled),
+            typecode.encode(),
+            sys.byteorder[0].encode(),
+            split
+        )
+        
+        # Narrow the scratch rows chunk by chunk into the final file
+        chunk_bytes = _BUILD_CHUNK_ROWS * len(plan) * 8
+        with open(wide_path, "rb") as src, open(tmp_path, "wb") as f:
+            f.write(header.ljust(HEADER_SIZE, b"\0"))
+            for data in iter(lambda: src.read(chunk_bytes), b""):
+                if HAS_NUMPY:
+                    f.write(np.frombuffer(data, dtype=np.uint64).astype(typecode).tobytes())
+                else:
+                    wide = array("Q")
+                    wide.frombytes(data)
+                    f.write(array(typecode, wide).tobytes())
+    finally:
+        if wide_path.exists():
+            wide_path.unlink()
+    
+    os.replace(tmp_path, path)
+    return DenominationLookupTable(path)
+
+
+def main():
+    """Command line entry point: build lookup tables for an engine config."""
+    from engine import DenominationEngine
+    
+    parser = argparse.ArgumentParser(description="Build denomination lookup tables")
+    parser.add_argument("--output-dir", required=True, help="Directory for .lut files")
+    parser.add_argument("--ceiling", type=int, default=1_000_000,
+                        help="Largest amount to precompute, in minor units")
+    parser.add_argument("--currency", action="append",
+                        help="Currency code (repeatable, default: all active)")
+    parser.add_argument("--mode", action="append",
+                        choices=[m.value for m in OptimizationMode],
+                        help="Optimization mode (repeatable, default: greedy)")
+    parser.add_argument("--config", help="Path to currencies.json")
+    args = parser.parse_args()
+    
+    engine = DenominationEngine(args.config)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    currencies = args.currency or engine.get_supported_currencies()
+    modes = [OptimizationMode(m) for m in (args.mode or ["greedy"])]
+    
+    for currency in currencies:
+        for mode in modes:
+            path = output_dir / table_filename(currency.upper(), mode)
+            table = build_lookup_table(engine, currency, mode, args.ceiling, path)
+            print(
+                f"{path}: {table.rows:,} rows x {table.k} "
+                f"({os.path.getsize(path):,} bytes, split={table.split})"
+            )
+            table.close()
+
+
+if __name__ == "__main__":
+    main()
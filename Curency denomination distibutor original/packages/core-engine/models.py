@@ -7,7 +7,7 @@ making them portable across all platforms (desktop, mobile backend, cloud).
 
 from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Mapping, Optional, Any, Tuple
 from enum import Enum
 
 
@@ -18,9 +18,14 @@ class OptimizationMode(str, Enum):
     MINIMIZE_LARGE = "minimize_large"          # Avoid large denominations
     MINIMIZE_SMALL = "minimize_small"          # Avoid small denominations
     BALANCED = "balanced"                      # Balance between large and small
+    EXACT = "exact"                            # Provably minimal total count (DP)
     AI_SUGGESTED = "ai_suggested"              # Gemini-powered suggestions
 
 
+class InfeasibleBreakdownError(ValueError):
+    """Raised when no breakdown satisfies the requested limits."""
+
+
 class ConstraintType(str, Enum):
     """Types of constraints that can be applied."""
     MINIMIZE = "minimize"                      # Minimize usage of specific denomination
@@ -39,9 +44,13 @@ class Constraint:
     denominations: Optional[List[Decimal]] = None  # For ONLY
 
 
-@dataclass
+@dataclass(frozen=True)
 class DenominationBreakdown:
-    """Represents the count for a single denomination."""
+    """
+    Represents the count for a single denomination.
+    
+    Immutable, so cached results can share breakdown objects safely.
+    """
     denomination: Decimal
     count: int
     total_value: Decimal
@@ -50,7 +59,7 @@ class DenominationBreakdown:
     def __post_init__(self):
         """Ensure total_value is calculated correctly."""
         if self.total_value is None:
-            self.total_value = self.denomination * self.count
+            object.__setattr__(self, 'total_value', self.denomination * self.count)
     
     @property
     def is_coin(self) -> bool:
@@ -69,6 +78,10 @@ class CalculationRequest:
     convert_before_breakdown: bool = True       # Convert then breakdown, or vice versa
     metadata: Dict[str, Any] = field(default_factory=dict)
     
+    # Search budget for EXACT and CONSTRAINED modes (None = engine default)
+    time_budget_ms: Optional[int] = None
+    node_budget: Optional[int] = None
+    
     def __post_init__(self):
         """Validate and normalize the request."""
         # Ensure amount is Decimal
@@ -79,6 +92,11 @@ class CalculationRequest:
         if self.amount <= 0:
             raise ValueError("Amount must be positive")
         
+        if self.time_budget_ms is not None and self.time_budget_ms <= 0:
+            raise ValueError("Time budget must be positive")
+        if self.node_budget is not None and self.node_budget <= 0:
+            raise ValueError("Node budget must be positive")
+        
         # Normalize currency codes to uppercase
         self.currency = self.currency.upper()
         if self.source_currency:
@@ -170,7 +188,7 @@ class BulkCalculationResult:
     total_processed: int = 0
     successful: int = 0
     failed: int = 0
-    errors: List[Dict[str, str]] = field(default_factory=list)
+    errors: List[Dict[str, Any]] = field(default_factory=list)  # index, amount, currency, error
     
     def __post_init__(self):
         """Calculate stats."""
@@ -179,6 +197,191 @@ class BulkCalculationResult:
         self.failed = len(self.errors)
 
 
+@dataclass(frozen=True)
+class DenominationPlan:
+    """
+    Precompiled, immutable denomination order for one (currency, mode).
+    
+    Built once when currency configs are loaded and shared by every request.
+    Denominations are distinct and in solver order; `values` holds the same
+    denominations in integer minor units.
+    """
+    currency: str
+    mode: OptimizationMode
+    decimal_places: int
+    denominations: Tuple[Decimal, ...]
+    values: Tuple[int, ...]                    # Minor units, aligned with denominations
+    note_mask: int                             # Bit i set if denominations[i] is a note
+    index: Mapping[Decimal, int] = field(compare=False)  # Denomination -> position
+    
+    def __len__(self) -> int:
+        """Number of distinct denominations."""
+        return len(self.denominations)
+    
+    def is_note(self, position: int) -> bool:
+        """Check if the denomination at a position is a note."""
+        return bool(self.note_mask >> position & 1)
+
+
+@dataclass(frozen=True)
+class ConstraintProgram:
+    """
+    A constraint list compiled against one denomination plan.
+    
+    Every constraint becomes a bound or an objective term at a plan position:
+    AVOID/ONLY set upper bounds to 0, CAP sets an upper bound, REQUIRE a
+    lower bound and MINIMIZE marks a position whose count is minimized
+    before the total number of pieces.
+    """
+    currency: str
+    lower: Tuple[int, ...]                     # Minimum count per position
+    upper: Tuple[Optional[int], ...]           # Maximum count (None = unbounded)
+    allowed_mask: int                          # Bit i set: position i may be used
+    minimize_mask: int                         # Bit i set: minimize position i first
+    min_units: int                             # Value of the required minimum counts
+    max_units: Optional[int]                   # Value of the capped maximum (None = unbounded)
+    step: int                                  # Payable amounts are min_units + multiples of step
+    
+    def may_pay(self, units: int) -> bool:
+        """
+        Quick feasibility test (necessary, not sufficient).
+        
+        Args:
+            units: Amount in minor units
+        
+        Returns:
+            False if no breakdown can satisfy the program
+        """
+        extra = units - self.min_units
+        if extra < 0 or (self.max_units is not None and units > self.max_units):
+            return False
+        if self.step == 0:
+            return extra == 0
+        return extra % self.step == 0
+    
+    @property
+    def is_trivial(self) -> bool:
+        """True if the program does not restrict a plain minimum-count breakdown."""
+        return (
+            not self.minimize_mask
+            and not any(self.lower)
+            and all(cap is None for cap in self.upper)
+        )
+
+
+@dataclass(frozen=True)
+class CanonicalityReport:
+    """Load-time analysis of whether greedy is optimal for a currency."""
+    currency: str
+    canonical: Optional[bool]                  # Greedy is always minimum-count (None: unknown)
+    counterexample: Optional[Decimal]          # Smallest amount where greedy is not minimal
+    exact_solver: str                          # Algorithm used for EXACT mode: 'greedy' or 'dp'
+
+
+@dataclass
+class BatchCalculationResult:
+    """
+    Result from vectorized batch calculation.
+    
+    Amounts and remainders are in integer minor units. Count matrix columns
+    follow the `denominations` header. Array fields are NumPy int64 arrays
+    when the batch was vectorized, plain lists otherwise.
+    """
+    currency: str
+    optimization_mode: OptimizationMode
+    denominations: List[Decimal]               # Column header (greedy order)
+    is_note: List[bool]                        # Per column
+    counts: Any                                # N x k count matrix
+    total_notes: Any                           # Per amount
+    total_coins: Any                           # Per amount
+    remainders: Any                            # Undistributed minor units per amount
+    vectorized: bool = False
+    solve_info: Optional[List[Dict[str, Any]]] = None  # EXACT proof info per amount (None = all proven)
+    
+    def __len__(self) -> int:
+        """Number of amounts in the batch."""
+        return len(self.counts)
+
+
+@dataclass
+class CurrencyAggregate:
+    """Summed denomination counts for all amounts of one currency."""
+    currency: str
+    amount_count: int                          # Number of amounts folded in
+    total_amount: Decimal                      # Sum of the amounts (minor unit precision)
+    breakdowns: List[DenominationBreakdown]    # Summed counts, plan order
+    total_notes: int
+    total_coins: int
+    remainder: Decimal = Decimal("0")          # Sum of undistributed amounts
+    
+    @property
+    def total_denominations(self) -> int:
+        """Total pieces (notes + coins)."""
+        return self.total_notes + self.total_coins
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'currency': self.currency,
+            'amount_count': self.amount_count,
+            'total_amount': str(self.total_amount),
+            'breakdowns': [
+                {
+                    'denomination': str(b.denomination),
+                    'count': b.count,
+                    'total_value': str(b.total_value),
+                    'is_note': b.is_note
+                }
+                for b in self.breakdowns
+            ],
+            'total_notes': self.total_notes,
+            'total_coins': self.total_coins,
+            'total_denominations': self.total_denominations,
+            'remainder': str(self.remainder)
+        }
+
+
+@dataclass
+class AggregateResult:
+    """Denomination demand summed over a stream of amounts."""
+    optimization_mode: OptimizationMode
+    currencies: Dict[str, CurrencyAggregate]   # Per-currency subtotals
+    
+    @property
+    def amount_count(self) -> int:
+        """Number of amounts folded in (all currencies)."""
+        return sum(c.amount_count for c in self.currencies.values())
+    
+    @property
+    def total_notes(self) -> int:
+        """Notes needed across all currencies."""
+        return sum(c.total_notes for c in self.currencies.values())
+    
+    @property
+    def total_coins(self) -> int:
+        """Coins needed across all currencies."""
+        return sum(c.total_coins for c in self.currencies.values())
+    
+    @property
+    def total_denominations(self) -> int:
+        """Pieces needed across all currencies."""
+        return self.total_notes + self.total_coins
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization."""
+        return {
+            'optimization_mode': self.optimization_mode.value,
+            'amount_count': self.amount_count,
+            'total_notes': self.total_notes,
+            'total_coins': self.total_coins,
+            'total_denominations': self.total_denominations,
+            'currencies': {
+                code: aggregate.to_dict()
+                for code, aggregate in self.currencies.items()
+            }
+        }
+
+
 @dataclass
 class CurrencyConfig:
     """Configuration for a single currency."""
@@ -5,17 +5,27 @@ Applies advanced optimization strategies and constraints to denomination breakdo
 Supports custom constraint logic and alternative distribution generation.
 """
 
+import math
+import time
 from decimal import Decimal
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 from models import (
     CalculationRequest,
     CalculationResult,
-    DenominationBreakdown,
+    DenominationPlan,
     Constraint,
     ConstraintType,
-    OptimizationMode,
-    CurrencyConfig
+    InfeasibleBreakdownError,
+    OptimizationMode
 )
+from solvers import to_minor_units, from_minor_units, solve_bounded, k_best_bounded
+from constraints import ConstraintSignature, constraint_signature
+from cache import LRUCache
+
+
+# Objectives alternatives can be ranked by; all but 'pieces' are minimized
+# first with the number of pieces as tie-breaker
+OBJECTIVES = ('pieces', 'notes', 'coins', 'largest')
 
 
 class OptimizationEngine:
@@ -24,7 +34,8 @@ class OptimizationEngine:
     
     Handles:
     - Custom constraints (minimize, avoid, cap, require)
-    - Alternative distribution generation
+    - Breakdowns limited by finite denomination stock (cash drawers, vaults)
+    - Alternative distribution generation (k best, Pareto frontier)
     - Constraint validation and application
     """
     
@@ -36,6 +47,7 @@ class OptimizationEngine:
             denomination_engine: Instance of DenominationEngine
         """
         self.engine = denomination_engine
+        self._validation_cache = LRUCache(256)
     
     def apply_constraints(
         self,
@@ -45,253 +57,502 @@ class OptimizationEngine:
         """
         Apply constraints to a calculation result.
         
+        All constraints are compiled into one integer program (bounds per
+        denomination plus objective weights) and solved once for the
+        original amount, so the result always pays the amount exactly.
+        
         Args:
             result: Original calculation result
             constraints: List of constraints to apply
         
         Returns:
-            Modified CalculationResult
+            New CalculationResult (CONSTRAINED mode)
+        
+        Raises:
+            ValueError: If a constraint is malformed
+            InfeasibleBreakdownError: If no breakdown satisfies the constraints
         """
         if not constraints:
             return result
         
-        currency_config = self.engine.get_currency_config(result.currency)
-        modified_breakdowns = result.breakdowns.copy()
-        
-        for constraint in constraints:
-            modified_breakdowns = self._apply_single_constraint(
-                modified_breakdowns,
-                constraint,
-                result.original_amount,
-                currency_config
-            )
-        
-        # Recalculate totals
-        total_notes = sum(b.count for b in modified_breakdowns if b.is_note)
-        total_coins = sum(b.count for b in modified_breakdowns if b.is_coin)
-        
-        # Create new result
-        return CalculationResult(
-            original_amount=result.original_amount,
+        return self.engine.calculate(CalculationRequest(
+            amount=result.original_amount,
             currency=result.currency,
-            breakdowns=modified_breakdowns,
-            total_notes=total_notes,
-            total_coins=total_coins,
-            total_denominations=total_notes + total_coins,
             optimization_mode=OptimizationMode.CONSTRAINED,
-            constraints_applied=constraints,
+            constraints=constraints,
             metadata=result.metadata.copy()
-        )
+        ))
     
-    def _apply_single_constraint(
+    def solve_with_inventory(
         self,
-        breakdowns: List[DenominationBreakdown],
-        constraint: Constraint,
-        total_amount: Decimal,
-        currency_config: CurrencyConfig
-    ) -> List[DenominationBreakdown]:
-        """Apply a single constraint to breakdowns."""
-        
-        if constraint.type == ConstraintType.AVOID:
-            # Remove specified denomination completely
-            return [
-                b for b in breakdowns 
-                if b.denomination != constraint.denomination
-            ]
+        amount: Decimal,
+        currency_code: str,
+        inventory: Dict[Any, int],
+        node_limit: int = 200_000
+    ) -> CalculationResult:
+        """
+        Find the fewest-pieces breakdown that the available stock can pay.
         
-        elif constraint.type == ConstraintType.CAP:
-            # Cap maximum count for denomination
-            modified = []
-            redistributed_value = Decimal(0)
-            
-            for b in breakdowns:
-                if b.denomination == constraint.denomination:
-                    if b.count > constraint.value:
-                        # Cap the count
-                        capped_count = constraint.value
-                        capped_value = b.denomination * capped_count
-                        redistributed_value = b.total_value - capped_value
-                        
-                        modified.append(DenominationBreakdown(
-                            denomination=b.denomination,
-                            count=capped_count,
-                            total_value=capped_value,
-                            is_note=b.is_note
-                        ))
-                    else:
-                        modified.append(b)
-                else:
-                    modified.append(b)
-            
-            # Redistribute the excess using smaller denominations
-            if redistributed_value > 0:
-                modified = self._redistribute_value(
-                    modified,
-                    redistributed_value,
-                    constraint.denomination,
-                    currency_config
-                )
-            
-            return modified
+        Solved exactly with branch-and-bound on integer minor units, so the
+        amount is always distributed in full or the call fails.
         
-        elif constraint.type == ConstraintType.MINIMIZE:
-            # Try to minimize usage of specific denomination
-            target_breakdown = next(
-                (b for b in breakdowns if b.denomination == constraint.denomination),
-                None
-            )
-            
-            if target_breakdown and target_breakdown.count > 0:
-                # Try to redistribute using other denominations
-                return self._minimize_denomination(
-                    breakdowns,
-                    constraint.denomination,
-                    currency_config
-                )
-            
-            return breakdowns
+        Args:
+            amount: Amount to dispense
+            currency_code: Currency code
+            inventory: Available count per denomination. Denominations that
+                      are not listed are treated as out of stock.
+            node_limit: Search effort limit (see solvers.solve_bounded)
         
-        elif constraint.type == ConstraintType.ONLY:
-            # Use only specified denominations
-            allowed = set(constraint.denominations)
-            filtered = [b for b in breakdowns if b.denomination in allowed]
-            
-            # Recalculate to ensure amount matches
-            used_amount = sum(b.total_value for b in filtered)
-            if used_amount < total_amount:
-                # Need to recalculate with only allowed denominations
-                pass
-            
-            return filtered
+        Returns:
+            CalculationResult; metadata['proven_optimal'] is False if the
+            search stopped at node_limit with a feasible breakdown
         
-        return breakdowns
+        Raises:
+            InfeasibleBreakdownError: If the stock cannot pay the amount exactly
+            ValueError: If the currency, a denomination or a count is invalid
+        """
+        plan = self.engine.get_plan(currency_code)
+        upper, _ = self._inventory_bounds(plan, inventory)
+        return self._solve_bounded_result(amount, plan, upper, node_limit)
     
-    def _redistribute_value(
+    def withdraw(
         self,
-        breakdowns: List[DenominationBreakdown],
-        value_to_redistribute: Decimal,
-        avoid_denomination: Decimal,
-        currency_config: CurrencyConfig
-    ) -> List[DenominationBreakdown]:
-        """Redistribute value to other denominations."""
-        # Get available denominations (excluding the one to avoid)
-        available_denoms = [
-            d for d in currency_config.all_denominations
-            if d != avoid_denomination and d < avoid_denomination
-        ]
+        amount: Decimal,
+        currency_code: str,
+        inventory: Dict[Any, int],
+        node_limit: int = 200_000
+    ) -> CalculationResult:
+        """
+        Dispense an amount from an inventory, updating the inventory in place.
         
-        remaining = value_to_redistribute
-        breakdown_dict = {b.denomination: b for b in breakdowns}
+        The inventory is only modified if the withdrawal succeeds, so a
+        sequence of withdrawals can run against one drawer or vault dict.
         
-        for denom in available_denoms:
-            if remaining <= 0:
-                break
+        Args:
+            amount: Amount to dispense
+            currency_code: Currency code
+            inventory: Available count per denomination (decremented)
+            node_limit: Search effort limit (see solvers.solve_bounded)
+        
+        Returns:
+            CalculationResult with the dispensed breakdown
+        
+        Raises:
+            InfeasibleBreakdownError: If the stock cannot pay the amount exactly
+            ValueError: If the currency, a denomination or a count is invalid
+        """
+        plan = self.engine.get_plan(currency_code)
+        upper, keys = self._inventory_bounds(plan, inventory)
+        result = self._solve_bounded_result(amount, plan, upper, node_limit)
+        
+        for breakdown in result.breakdowns:
+            inventory[keys[plan.index[breakdown.denomination]]] -= breakdown.count
+        
+        return result
+    
+    def _inventory_bounds(
+        self,
+        plan: DenominationPlan,
+        inventory: Dict[Any, int]
+    ) -> Tuple[List[int], Dict[int, Any]]:
+        """
+        Convert an inventory dict to per-denomination upper bounds.
+        
+        Returns:
+            Tuple of (bound per plan position, plan position -> inventory key)
+        """
+        upper = [0] * len(plan)
+        keys = {}
+        
+        for key, count in inventory.items():
+            denomination = key if isinstance(key, Decimal) else Decimal(str(key))
+            position = plan.index.get(denomination)
+            if position is None:
+                raise ValueError(f"Denomination {key} not available in {plan.currency}")
+            if not isinstance(count, int) or count < 0:
+                raise ValueError(f"Invalid stock count for denomination {key}: {count}")
             
-            count = int(remaining / denom)
-            if count > 0:
-                if denom in breakdown_dict:
-                    # Add to existing
-                    existing = breakdown_dict[denom]
-                    new_count = existing.count + count
-                    breakdown_dict[denom] = DenominationBreakdown(
-                        denomination=denom,
-                        count=new_count,
-                        total_value=denom * new_count,
-                        is_note=currency_config.is_note(denom)
-                    )
-                else:
-                    # Create new
-                    breakdown_dict[denom] = DenominationBreakdown(
-                        denomination=denom,
-                        count=count,
-                        total_value=denom * count,
-                        is_note=currency_config.is_note(denom)
-                    )
-                
-                remaining -= denom * count
+            upper[position] = count
+            keys[position] = key
         
-        # Return sorted by denomination (descending)
-        return sorted(
-            breakdown_dict.values(),
-            key=lambda b: b.denomination,
-            reverse=True
-        )
+        return upper, keys
+    
+    def _solve_bounded_result(
+        self,
+        amount: Decimal,
+        plan: DenominationPlan,
+        upper: List[Optional[int]],
+        node_limit: int
+    ) -> CalculationResult:
+        """Solve a bounded breakdown and wrap it in a CalculationResult."""
+        if not isinstance(amount, Decimal):
+            amount = Decimal(str(amount))
+        if not amount > 0:
+            raise ValueError("Amount must be positive")
+        
+        units = to_minor_units(amount, plan.decimal_places)
+        if from_minor_units(units, plan.decimal_places) != amount:
+            raise InfeasibleBreakdownError(
+                f"Amount {amount} is finer than the {plan.currency} minor unit"
+            )
+        
+        counts, exhausted = solve_bounded(units, plan.values, upper, node_limit)
+        if counts is None:
+            if exhausted:
+                raise InfeasibleBreakdownError(
+                    f"Cannot pay {amount} {plan.currency} exactly with the available denominations"
+                )
+            raise InfeasibleBreakdownError(
+                f"No breakdown of {amount} {plan.currency} found within {node_limit} search nodes"
+            )
+        
+        return self._result_from_counts(amount, plan, counts, {'proven_optimal': exhausted})
     
-    def _minimize_denomination(
+    def _result_from_counts(
         self,
-        breakdowns: List[DenominationBreakdown],
-        target_denomination: Decimal,
-        currency_config: CurrencyConfig
-    ) -> List[DenominationBreakdown]:
-        """Try to minimize usage of specific denomination."""
-        # This is a placeholder for more advanced optimization
-        # Could use linear programming or other optimization techniques
-        return breakdowns
+        amount: Decimal,
+        plan: DenominationPlan,
+        counts: List[int],
+        metadata: Dict[str, Any]
+    ) -> CalculationResult:
+        """Wrap counts aligned with a plan in a CONSTRAINED CalculationResult."""
+        breakdowns = self.engine.breakdowns_from_counts(plan, counts)
+        total_notes = sum(b.count for b in breakdowns if b.is_note)
+        total_coins = sum(b.count for b in breakdowns if b.is_coin)
+        
+        return CalculationResult(
+            original_amount=amount,
+            currency=plan.currency,
+            breakdowns=breakdowns,
+            total_notes=total_notes,
+            total_coins=total_coins,
+            total_denominations=total_notes + total_coins,
+            optimization_mode=OptimizationMode.CONSTRAINED,
+            constraints_applied=[],
+            metadata=metadata
+        )
     
     def suggest_alternatives(
         self,
         original_request: CalculationRequest,
-        count: int = 3
+        count: int = 3,
+        time_budget_ms: Optional[int] = 200
     ) -> List[CalculationResult]:
         """
-        Generate alternative distributions with explanations.
+        Generate distinct alternative distributions with explanations.
+        
+        Alternatives are points of the Pareto frontier (see
+        pareto_alternatives), topped up with the next-fewest-pieces
+        breakdowns when the frontier is small. None of them repeats the
+        breakdown the original request produces, or each other.
         
         Args:
             original_request: Original calculation request
             count: Number of alternatives to generate
+            time_budget_ms: Search time budget (None = node limits only)
         
         Returns:
             List of alternative CalculationResult objects
         """
+        deadline = self._deadline(time_budget_ms)
+        original = self.engine.calculate(original_request)
+        seen = {self._breakdown_key(original)}
         alternatives = []
         
-        # Strategy 1: Minimize large denominations
-        alt1_request = CalculationRequest(
-            amount=original_request.amount,
-            currency=original_request.currency,
-            optimization_mode=OptimizationMode.MINIMIZE_LARGE,
-            metadata={'strategy': 'minimize_large_notes'}
-        )
-        alt1 = self.engine.calculate(alt1_request)
-        alt1.metadata['explanation'] = "Prefers smaller denominations to minimize large notes"
-        alternatives.append(alt1)
-        
-        # Strategy 2: Balanced approach
-        alt2_request = CalculationRequest(
-            amount=original_request.amount,
-            currency=original_request.currency,
-            optimization_mode=OptimizationMode.BALANCED,
-            metadata={'strategy': 'balanced'}
+        def add(candidates: List[CalculationResult]) -> None:
+            for alternative in candidates:
+                key = self._breakdown_key(alternative)
+                if key not in seen and len(alternatives) < count:
+                    seen.add(key)
+                    alternatives.append(alternative)
+        
+        add(self.pareto_alternatives(
+            original_request,
+            max_points=count + 1,
+            time_budget_ms=time_budget_ms
+        ))
+        
+        if len(alternatives) < count and (deadline is None or time.perf_counter() < deadline):
+            remaining = None if deadline is None else max(1, int((deadline - time.perf_counter()) * 1000))
+            add(self.k_best_alternatives(
+                original_request,
+                k=count + len(seen),
+                time_budget_ms=remaining
+            ))
+        
+        return alternatives
+    
+    def k_best_alternatives(
+        self,
+        request: CalculationRequest,
+        k: int = 5,
+        objective: str = 'pieces',
+        time_budget_ms: Optional[int] = None,
+        node_limit: int = 200_000
+    ) -> List[CalculationResult]:
+        """
+        Enumerate the k best distinct breakdowns for an objective.
+        
+        Args:
+            request: Calculation request (constraints are honored in
+                    CONSTRAINED mode)
+            k: Number of breakdowns wanted
+            objective: One of OBJECTIVES; ties are broken by fewer pieces
+            time_budget_ms: Search time budget (None = node limit only)
+            node_limit: Search effort limit (see solvers.k_best_bounded)
+        
+        Returns:
+            Up to k CalculationResults, best first. metadata['rank'] is the
+            position and metadata['proven_optimal'] is True if the search
+            finished, i.e. these are exactly the k best.
+        
+        Raises:
+            ValueError: If the objective, currency or a constraint is invalid
+            InfeasibleBreakdownError: If no breakdown was found
+        """
+        plan, units, lower, upper = self._search_space(request)
+        weights = self._objective_weights(plan, units, objective)
+        
+        found, exhausted = k_best_bounded(
+            units,
+            plan.values,
+            k,
+            upper,
+            node_limit,
+            lower=lower,
+            weights=weights,
+            deadline=self._deadline(time_budget_ms)
         )
-        alt2 = self.engine.calculate(alt2_request)
-        alt2.metadata['explanation'] = "Balanced distribution between large and small denominations"
-        alternatives.append(alt2)
-        
-        # Strategy 3: Avoid coins (if applicable)
-        currency_config = self.engine.get_currency_config(original_request.currency)
-        if currency_config.coins:
-            # Try to avoid coins
-            avoid_coins_constraint = Constraint(
-                type=ConstraintType.ONLY,
-                denominations=currency_config.notes
+        if not found:
+            raise InfeasibleBreakdownError(
+                f"No breakdown of {request.amount} {plan.currency} found"
             )
+        
+        return [
+            self._result_from_counts(request.amount, plan, counts, {
+                'strategy': f'k_best_{objective}',
+                'rank': rank,
+                'proven_optimal': exhausted,
+                'objectives': self._objective_vector(plan, counts),
+                'explanation': f"#{rank} by fewest {objective}"
+            })
+            for rank, (_, counts) in enumerate(found, 1)
+        ]
+    
+    def pareto_alternatives(
+        self,
+        request: CalculationRequest,
+        max_points: int = 8,
+        time_budget_ms: Optional[int] = 200,
+        node_limit: int = 200_000
+    ) -> List[CalculationResult]:
+        """
+        Non-dominated breakdowns over (pieces, notes, coins, largest usage).
+        
+        Frontier points are found by scalarization rather than by listing
+        every breakdown: the fewest-pieces breakdown, the lexicographic
+        minimum of each other objective, and fewest pieces under caps
+        spread over the usage of the largest denomination (the
+        epsilon-constraint method). Candidates dominated by another
+        candidate are dropped. The budget bounds the whole call and is
+        shared out between the searches; a search that runs out of time
+        still contributes the best breakdown it found.
+        
+        Args:
+            request: Calculation request (constraints are honored in
+                    CONSTRAINED mode)
+            max_points: Maximum number of breakdowns returned
+            time_budget_ms: Search time budget (None = node limits only)
+            node_limit: Search effort limit per solve
+        
+        Returns:
+            CalculationResults sorted by pieces. metadata['objectives'] holds
+            the objective vector and metadata['explanation'] the objectives
+            the breakdown is best at.
+        
+        Raises:
+            ValueError: If the currency or a constraint is invalid
+            InfeasibleBreakdownError: If no breakdown was found
+        """
+        plan, units, lower, upper = self._search_space(request)
+        deadline = self._deadline(time_budget_ms)
+        top = max(range(len(plan)), key=plan.values.__getitem__)
+        candidates: Dict[Tuple[int, ...], bool] = {}
+        
+        # Each solve gets an even share of what is left of the budget, so
+        # one hard objective cannot starve the others
+        planned = len(OBJECTIVES) + max(0, max_points - len(OBJECTIVES))
+        
+        def solve(bounds, weights) -> Optional[List[int]]:
+            nonlocal planned
+            share = None
+            if deadline is not None:
+                now = time.perf_counter()
+                share = now + (deadline - now) / max(1, planned)
+            planned -= 1
             
-            alt3_request = CalculationRequest(
-                amount=original_request.amount,
-                currency=original_request.currency,
-                optimization_mode=OptimizationMode.CONSTRAINED,
-                constraints=[avoid_coins_constraint],
-                metadata={'strategy': 'notes_only'}
+            counts, exhausted = solve_bounded(
+                units, plan.values, bounds, node_limit,
+                lower=lower, weights=weights, deadline=share
             )
-            
-            try:
-                alt3 = self.engine.calculate(alt3_request)
-                alt3.metadata['explanation'] = "Uses only notes, avoiding coins"
-                alternatives.append(alt3)
-            except Exception:
-                pass  # Skip if not possible
-        
-        return alternatives[:count]
+            if counts is not None:
+                key = tuple(counts)
+                candidates[key] = candidates.get(key, False) or exhausted
+            return counts
+        
+        def expired() -> bool:
+            return deadline is not None and time.perf_counter() > deadline
+        
+        fewest = solve(upper, None)
+        if fewest is None:
+            raise InfeasibleBreakdownError(
+                f"No breakdown of {request.amount} {plan.currency} found"
+            )
+        
+        for objective in OBJECTIVES[1:]:
+            if expired():
+                break
+            solve(upper, self._objective_weights(plan, units, objective))
+        
+        # Fewest pieces for capped use of the largest denomination
+        least = min(counts[top] for counts in candidates)
+        most = fewest[top]
+        steps = max(0, min(max_points - len(candidates), most - least - 1))
+        for step in range(1, steps + 1):
+            if expired():
+                break
+            bounds = list(upper)
+            bounds[top] = most - (most - least) * step // (steps + 1)
+            solve(bounds, None)
+        
+        vectors = {key: self._objective_vector(plan, key) for key in candidates}
+        front = [
+            key for key in candidates
+            if not any(self._dominates(vectors[other], vectors[key]) for other in candidates)
+        ]
+        front.sort(key=lambda key: (vectors[key]['pieces'], vectors[key]['largest']))
+        
+        best = {name: min(vectors[key][name] for key in front) for name in OBJECTIVES}
+        largest_name = self._denomination_name(plan, top)
+        results = []
+        for key in front[:max_points]:
+            vector = vectors[key]
+            labels = [
+                f"fewest {largest_name}" if name == 'largest' else f"fewest {name}"
+                for name in OBJECTIVES if vector[name] == best[name]
+            ]
+            if labels:
+                explanation = "Pareto-optimal: " + ", ".join(labels)
+            else:
+                explanation = (
+                    f"Pareto-optimal trade-off: {vector['pieces']} pieces "
+                    f"with {vector['largest']} {largest_name}"
+                )
+            results.append(self._result_from_counts(request.amount, plan, list(key), {
+                'strategy': 'pareto',
+                'proven_optimal': candidates[key],
+                'objectives': vector,
+                'explanation': explanation
+            }))
+        
+        return results
+    
+    def _search_space(
+        self,
+        request: CalculationRequest
+    ) -> Tuple[DenominationPlan, int, Optional[Tuple[int, ...]], List[Optional[int]]]:
+        """
+        Plan, amount in minor units and count bounds for a request.
+        
+        Constrained requests must be paid exactly, as in the engine. Without
+        constraints, whatever is below the smallest unit the denominations
+        can form is left over, as greedy leaves it.
+        
+        Raises:
+            InfeasibleBreakdownError: If a constrained amount is finer than
+                the minor unit or the constraints contradict each other
+        """
+        plan = self.engine.get_plan(request.currency, OptimizationMode.CONSTRAINED)
+        units = to_minor_units(request.amount, plan.decimal_places)
+        
+        if request.optimization_mode == OptimizationMode.CONSTRAINED and request.constraints:
+            if from_minor_units(units, plan.decimal_places) != request.amount:
+                raise InfeasibleBreakdownError(
+                    f"Amount {request.amount} is finer than the {plan.currency} minor unit"
+                )
+            program = self.engine.compile_constraints(request.currency, request.constraints)
+            return plan, units, program.lower, list(program.upper)
+        
+        units -= units % math.gcd(*plan.values)
+        return plan, units, None, [None] * len(plan)
+    
+    def _objective_weights(
+        self,
+        plan: DenominationPlan,
+        units: int,
+        objective: str
+    ) -> Optional[List[int]]:
+        """
+        Per-piece weights that minimize an objective, then pieces.
+        
+        Raises:
+            ValueError: If the objective is unknown
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(
+                f"Unknown objective '{objective}' (expected one of {', '.join(OBJECTIVES)})"
+            )
+        if objective == 'pieces':
+            return None
+        
+        if objective == 'notes':
+            mask = plan.note_mask
+        elif objective == 'coins':
+            mask = ~plan.note_mask
+        else:
+            mask = 1 << max(range(len(plan)), key=plan.values.__getitem__)
+        
+        # No breakdown has more pieces than units / smallest denomination
+        penalty = units // min(plan.values) + 1
+        return [1 + penalty if mask >> i & 1 else 1 for i in range(len(plan))]
+    
+    def _objective_vector(
+        self,
+        plan: DenominationPlan,
+        counts: List[int]
+    ) -> Dict[str, int]:
+        """Objective values of a breakdown (counts aligned with the plan)."""
+        notes = sum(count for i, count in enumerate(counts) if plan.is_note(i))
+        pieces = sum(counts)
+        return {
+            'pieces': pieces,
+            'notes': notes,
+            'coins': pieces - notes,
+            'largest': counts[max(range(len(plan)), key=plan.values.__getitem__)]
+        }
+    
+    @staticmethod
+    def _dominates(a: Dict[str, int], b: Dict[str, int]) -> bool:
+        """True if a is no worse than b in every objective and better in one."""
+        return a != b and all(a[name] <= b[name] for name in OBJECTIVES)
+    
+    @staticmethod
+    def _denomination_name(plan: DenominationPlan, position: int) -> str:
+        """Readable name such as '500 notes'."""
+        kind = 'notes' if plan.is_note(position) else 'coins'
+        return f"{plan.denominations[position]} {kind}"
+    
+    @staticmethod
+    def _breakdown_key(result: CalculationResult) -> frozenset:
+        """Order-independent identity of a breakdown."""
+        return frozenset((b.denomination, b.count) for b in result.breakdowns)
+    
+    @staticmethod
+    def _deadline(time_budget_ms: Optional[int]) -> Optional[float]:
+        """time.perf_counter() deadline for a budget in milliseconds."""
+        if time_budget_ms is None:
+            return None
+        return time.perf_counter() + time_budget_ms / 1000
     
     def validate_constraints(
         self,
@@ -301,6 +562,10 @@ class OptimizationEngine:
         """
         Validate that constraints are applicable to the currency.
         
+        Valid constraint sets are also compiled (see
+        DenominationEngine.compile_constraints), so contradictions are
+        reported here. Outcomes are cached per (currency, signature).
+        
         Args:
             constraints: List of constraints
             currency_code: Currency code
@@ -309,28 +574,47 @@ class OptimizationEngine:
             Tuple of (is_valid, error_message)
         """
         try:
-            currency_config = self.engine.get_currency_config(currency_code)
-            all_denoms = set(currency_config.all_denominations)
+            signature = constraint_signature(constraints)
+        except ValueError as e:
+            return False, str(e)
+        
+        key = (self.engine.config_hash, currency_code.upper(), signature)
+        outcome = self._validation_cache.get(key)
+        if outcome is None:
+            outcome = self._check_constraints(signature, currency_code)
+            self._validation_cache.put(key, outcome)
+        return outcome
+    
+    def _check_constraints(
+        self,
+        signature: ConstraintSignature,
+        currency_code: str
+    ) -> tuple[bool, Optional[str]]:
+        """Validate a constraint signature (uncached)."""
+        try:
+            all_denoms = self.engine.get_plan(currency_code).index
             
-            for constraint in constraints:
+            for kind, denomination, value, denominations in signature:
                 # Check if denomination exists
-                if constraint.denomination and constraint.denomination not in all_denoms:
-                    return False, f"Denomination {constraint.denomination} not available in {currency_code}"
+                if denomination and denomination not in all_denoms:
+                    return False, f"Denomination {denomination} not available in {currency_code}"
                 
                 # Check if value is valid for CAP/REQUIRE
-                if constraint.type in [ConstraintType.CAP, ConstraintType.REQUIRE]:
-                    if constraint.value is None or constraint.value < 0:
-                        return False, f"Invalid value for {constraint.type.value} constraint"
+                if kind in [ConstraintType.CAP, ConstraintType.REQUIRE]:
+                    if value is None or value < 0:
+                        return False, f"Invalid value for {kind.value} constraint"
                 
                 # Check ONLY constraint
-                if constraint.type == ConstraintType.ONLY:
-                    if not constraint.denominations:
+                if kind == ConstraintType.ONLY:
+                    if not denominations:
                         return False, "ONLY constraint requires list of denominations"
                     
-                    for denom in constraint.denominations:
+                    for denom in denominations:
                         if denom not in all_denoms:
                             return False, f"Denomination {denom} not available in {currency_code}"
             
+            # Contradictions only show up once the constraints are combined
+            self.engine.compile_constraints(currency_code, signature)
             return True, None
             
         except ValueError as e:
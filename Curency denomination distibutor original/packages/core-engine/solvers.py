@@ -0,0 +1,819 @@
+"""
+Integer Solvers
+
+Pure integer algorithms used by the denomination engine.
+All amounts and denominations are expressed in integer minor units
+(e.g. paise, cents), so no Decimal context or rounding is involved.
+
+Key Features:
+- Exact Decimal <-> minor unit conversion (no 28-digit context limit)
+- Exact Decimal totals for converting results back
+- Vectorized greedy over many amounts (NumPy int64, Python int fallback)
+- Exact minimum-count solver with bounded DP for non-canonical systems
+- Canonical coin system test (is greedy always optimal?)
+- Branch-and-bound breakdown under limited denomination stock, with
+  node and time budgets and a bound for the optimality gap
+- k cheapest distinct breakdowns, with a node and time budget
+- Counting and lazily listing every breakdown of an amount
+"""
+
+import heapq
+import itertools
+import math
+import operator
+import threading
+import time
+from decimal import Decimal, Context, MAX_PREC, MAX_EMAX, MIN_EMIN
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+
+# Optional: vectorized batch calculations
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+# Context large enough that multiplications never round
+EXACT_CONTEXT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+# Largest amount (in minor units) the NumPy path can hold
+INT64_MAX = 2 ** 63 - 1
+
+
+def to_minor_units(amount: Decimal, decimal_places: int) -> int:
+    """
+    Convert a Decimal amount to integer minor units.
+    
+    Exact for amounts of any size (no 28-digit context limit).
+    Anything below the minor unit is truncated (round down).
+    
+    Args:
+        amount: Amount to convert
+        decimal_places: Number of decimal places of the currency
+    
+    Returns:
+        Amount in minor units
+    
+    Raises:
+        ValueError: If amount is not a finite number
+    """
+    if not amount.is_finite():
+        raise ValueError(f"Amount must be a finite number, got {amount}")
+    
+    # scaleb is exact under EXACT_CONTEXT; int() truncates toward zero
+    return int(EXACT_CONTEXT.scaleb(amount, decimal_places))
+
+
+def denomination_to_minor_units(denomination: Decimal, decimal_places: int) -> int:
+    """
+    Convert a denomination to minor units, rejecting sub-unit values.
+    
+    Raises:
+        ValueError: If denomination is not a positive whole number of minor units
+    """
+    scaled = EXACT_CONTEXT.scaleb(denomination, decimal_places)
+    units = to_minor_units(denomination, decimal_places)
+    if units <= 0 or scaled != units:
+        raise ValueError(
+            f"Denomination {denomination} is not a whole number of minor units "
+            f"({decimal_places} decimal places)"
+        )
+    return units
+
+
+def from_minor_units(units: int, decimal_places: int) -> Decimal:
+    """Convert integer minor units back to a Decimal amount (exact)."""
+    return EXACT_CONTEXT.scaleb(Decimal(units), -decimal_places)
+
+
+def exact_total(denomination: Decimal, count: int) -> Decimal:
+    """Multiply denomination by count without context rounding."""
+    return EXACT_CONTEXT.multiply(denomination, count)
+
+
+
+def as_int64_array(amounts: Any) -> Optional[Any]:
+    """
+    Convert amounts to a NumPy int64 array if every value fits.
+    
+    Returns:
+        int64 array, or None if NumPy is unavailable or a value would overflow
+    
+    Raises:
+        ValueError: If amounts are not non-negative integers
+    """
+    if not HAS_NUMPY:
+        return None
+    
+    array = None
+    if isinstance(amounts, np.ndarray):
+        array = amounts
+    elif isinstance(amounts, (list, tuple)):
+        # Ints convert directly; one that does not fit raises instead of
+        # becoming a float, and the batch takes the object path below
+        try:
+            array = np.fromiter(map(operator.index, amounts), dtype=np.int64, count=len(amounts))
+        except OverflowError:
+            pass
+    if array is None:
+        # Let NumPy guess nothing: big ints would silently become floats
+        array = np.asarray(amounts, dtype=object)
+    if array.ndim != 1:
+        raise ValueError("Amounts must be a one-dimensional sequence")
+    
+    if array.dtype.kind == 'O':
+        # Python ints too large for int64 end up here
+        values = [operator.index(v) for v in array.tolist()]
+        if any(v < 0 for v in values):
+            raise ValueError("Amounts must be non-negative minor units")
+        if any(v > INT64_MAX for v in values):
+            return None
+        return np.array(values, dtype=np.int64)
+    
+    if array.dtype.kind == 'u':
+        if array.size and array.max() > INT64_MAX:
+            return None
+    elif array.dtype.kind != 'i' and array.size:
+        raise ValueError("Amounts must be integers in minor units")
+    
+    array = array.astype(np.int64)
+    if array.size and array.min() < 0:
+        raise ValueError("Amounts must be non-negative minor units")
+    return array
+
+
+def greedy_counts_batch(
+    amounts: Any,
+    values: Sequence[int]
+) -> Tuple[Any, Any, bool]:
+    """
+    Greedy divmod chain applied to many amounts at once.
+    
+    Uses a column-at-a-time NumPy int64 divmod when available and every
+    amount fits in int64 (counts and remainders never exceed the amount, so
+    nothing can overflow after that check). Otherwise falls back to Python ints.
+    
+    Args:
+        amounts: One-dimensional sequence of amounts in minor units
+        values: Denomination values in minor units, in greedy order
+    
+    Returns:
+        Tuple of (N x k count matrix, remainders, vectorized flag).
+        The matrix is an int64 array when vectorized, else a list of lists.
+    """
+    array = as_int64_array(amounts)
+    
+    if array is not None:
+        remaining = array
+        counts = np.empty((len(array), len(values)), dtype=np.int64)
+        for column, value in enumerate(values):
+            counts[:, column], remaining = np.divmod(remaining, value)
+        return counts, remaining, True
+    
+    counts = []
+    remainders = []
+    for units in amounts:
+        units = operator.index(units)
+        if units < 0:
+            raise ValueError("Amounts must be non-negative minor units")
+        
+        row = []
+        for value in values:
+            count, units = divmod(units, value)
+            row.append(count)
+        counts.append(row)
+        remainders.append(units)
+    
+    return counts, remainders, False
+
+
+class MinCountSolver:
+    """
+    Exact minimum-count breakdown for one denomination set.
+    
+    Greedy is only optimal for canonical coin systems. This solver is exact
+    for any system while keeping memory and time bounded for huge amounts:
+    
+    - All values are divided by their gcd first.
+    - In an optimal breakdown, a denomination d other than the largest L is
+      used fewer than lcm(d, L) / d times (otherwise that many d's can be
+      swapped for fewer L's). So the value not covered by L is at most
+      threshold = sum(lcm(d, L) - d).
+    - Amounts above the threshold take the largest denomination greedily down
+      to a residue in [threshold, threshold + L); the residue is solved by DP.
+    
+    The DP table is built lazily and never grows beyond threshold + L entries,
+    nor beyond max_table_size entries: for awkward sets threshold + L can be
+    astronomically large, and amounts whose residue lies past the cap are
+    left to the caller (solve returns None). Thread-safe.
+    """
+    
+    # Largest DP table (entries) any solver builds, ~16 MB
+    MAX_TABLE_SIZE = 1_000_000
+    
+    def __init__(self, values: Sequence[int], max_table_size: Optional[int] = None):
+        """
+        Initialize the solver.
+        
+        Args:
+            values: Denomination values in minor units (any order, distinct)
+            max_table_size: DP table cap (default MAX_TABLE_SIZE)
+        """
+        self.values = tuple(values)
+        self.max_table_size = max_table_size or self.MAX_TABLE_SIZE
+        self.unit = math.gcd(*self.values)
+        
+        scaled = [v // self.unit for v in self.values]
+        self.largest = max(scaled)
+        self.threshold = sum(
+            math.lcm(d, self.largest) - d for d in scaled if d != self.largest
+        )
+        self.table_limit = self.threshold + self.largest
+        
+        # Position of each scaled denomination, largest first
+        self._order = sorted(range(len(scaled)), key=lambda i: scaled[i], reverse=True)
+        self._scaled = [scaled[i] for i in self._order]
+        
+        # _best[v]: minimum pieces for v (None if unreachable)
+        # _last[v]: position in _scaled of one denomination used for v
+        self._best: List[Optional[int]] = [0]
+        self._last: List[int] = [-1]
+        self._lock = threading.Lock()
+    
+    def _extend(self, size: int, deadline: Optional[float] = None) -> bool:
+        """
+        Grow the DP table so that it covers values 0..size.
+        
+        Returns:
+            False if the deadline passed first (the rows built so far are
+            kept, so a later call carries on from there)
+        """
+        with self._lock:
+            best = self._best
+            last = self._last
+            scaled = self._scaled
+            
+            for v in range(len(best), size + 1):
+                if deadline is not None and not v & 4095 and time.perf_counter() > deadline:
+                    return False
+                best_count = None
+                best_pos = -1
+                for pos, d in enumerate(scaled):
+                    if d > v:
+                        continue
+                    previous = best[v - d]
+                    if previous is not None and (best_count is None or previous + 1 < best_count):
+                        best_count = previous + 1
+                        best_pos = pos
+                best.append(best_count)
+                last.append(best_pos)
+        
+        return True
+    
+    def solve(
+        self,
+        units: int,
+        deadline: Optional[float] = None
+    ) -> Optional[Tuple[List[int], int]]:
+        """
+        Find a minimum-count breakdown.
+        
+        Args:
+            units: Amount in minor units
+            deadline: time.perf_counter() value after which the DP table
+                     stops growing
+        
+        Returns:
+            Tuple of (count per denomination in the order given to the
+            constructor, undistributed remainder in minor units), or None
+            if the deadline passed before the table covered the amount or
+            covering it would take more than max_table_size entries
+        """
+        reduced, remainder = divmod(units, self.unit)
+        
+        # Take the largest denomination greedily above the proven threshold
+        if reduced > self.threshold:
+            bulk = (reduced - self.threshold) // self.largest
+        else:
+            bulk = 0
+        residue = reduced - bulk * self.largest
+        
+        if residue >= self.max_table_size:
+            return None
+        if residue >= len(self._best) and not self._extend(residue, deadline):
+            return None
+        
+        # Systems without a unit denomination may not reach every value
+        while self._best[residue] is None:
+            residue -= 1
+            remainder += self.unit
+        
+        counts = [0] * len(self.values)
+        counts[self._order[0]] = bulk
+        while residue > 0:
+            pos = self._last[residue]
+            counts[self._order[pos]] += 1
+            residue -= self._scaled[pos]
+        
+        return counts, remainder
+
+
+# Amounts compared with the exact solver when a system has no unit coin;
+# the full proof can need astronomically many
+COUNTEREXAMPLE_SCAN_LIMIT = 20_000
+
+
+def _greedy_vector(units: int, descending: Sequence[int]) -> List[int]:
+    """Greedy counts for a single amount over descending values."""
+    counts = []
+    for value in descending:
+        count, units = divmod(units, value)
+        counts.append(count)
+    return counts
+
+
+def greedy_counterexample(
+    values: Sequence[int],
+    scan_limit: int = COUNTEREXAMPLE_SCAN_LIMIT
+) -> Optional[int]:
+    """
+    Find the smallest amount for which greedy is not a minimum-count breakdown.
+    
+    Uses Pearson's O(n^3) test: every minimal counterexample is built from the
+    greedy representation of (c[i-1] - 1) by keeping its first j-1 counts and
+    adding one coin c[j]. Systems without a unit coin (after gcd reduction)
+    fall back to comparing greedy with the exact solver below its DP limit,
+    scanning at most scan_limit amounts.
+    
+    Args:
+        values: Denomination values in minor units (any order, distinct)
+        scan_limit: Largest (gcd-reduced) amount scanned without a unit coin
+    
+    Returns:
+        Smallest counterexample in minor units, or None if the system is canonical
+    
+    Raises:
+        ValueError: If the scan limit was reached before the DP limit
+                    without finding a counterexample (canonicality undecided)
+    """
+    unit = math.gcd(*values)
+    coins = sorted({v // unit for v in values}, reverse=True)
+    
+    if coins[-1] != 1:
+        solver = MinCountSolver(coins)
+        limit = min(solver.table_limit, scan_limit + 1)
+        solver._extend(limit - 1)
+        best = solver._best
+        
+        # The exact breakdown pays the largest reachable amount below
+        reachable = 0
+        for amount in range(1, limit):
+            if best[amount] is not None:
+                reachable = amount
+            greedy = _greedy_vector(amount, coins)
+            leftover = amount - sum(c * v for c, v in zip(greedy, coins))
+            remainder = amount - reachable
+            if remainder < leftover or (remainder == leftover and best[reachable] < sum(greedy)):
+                return amount * unit
+        if solver.table_limit - 1 > scan_limit:
+            raise ValueError(
+                f"No greedy counterexample up to {scan_limit}; a proof needs "
+                f"amounts up to {solver.table_limit - 1}"
+            )
+        return None
+    
+    smallest = None
+    for i in range(1, len(coins)):
+        base = _greedy_vector(coins[i - 1] - 1, coins)
+        for j in range(i, len(coins)):
+            candidate = base[:j] + [base[j] + 1]
+            amount = sum(c * v for c, v in zip(candidate, coins))
+            if sum(_greedy_vector(amount, coins)) > sum(candidate):
+                if smallest is None or amount < smallest:
+                    smallest = amount
+    
+    return smallest * unit if smallest is not None else None
+
+
+def solve_bounded(
+    units: int,
+    values: Sequence[int],
+    upper: Sequence[Optional[int]],
+    node_limit: int = 200_000,
+    lower: Optional[Sequence[int]] = None,
+    weights: Optional[Sequence[int]] = None,
+    deadline: Optional[float] = None
+) -> Tuple[Optional[List[int]], bool]:
+    """
+    Exact minimum-cost breakdown with per-denomination count bounds.
+    
+    Minimizes sum(weight * count) (by default the number of pieces) subject
+    to lower <= count <= upper. Lower bounds are paid up front; the rest is a
+    depth-first branch-and-bound over the denominations, largest first.
+    Counts are tried in the order in which the bound below grows (largest
+    count first, as greedy does, unless the denomination costs more per
+    minor unit than the ones after it), so good solutions are found
+    immediately. Subtrees are cut by:
+    
+    - bound: cost so far + the cheapest cost per minor unit of the remaining
+      denominations cannot beat the best solution; since the bound only
+      grows along the loop, the loop stops
+    - capacity: counts that leave more than the remaining stock can pay
+      are never tried
+    - divisibility: the rest is not a multiple of the remaining gcd
+    - dominance: the same (denomination, rest) was reached at no higher cost
+    
+    Args:
+        units: Amount in minor units
+        values: Denomination values in minor units (distinct, any order)
+        upper: Maximum count per denomination (None = unlimited)
+        node_limit: Maximum search nodes before giving up on a proof
+        lower: Minimum count per denomination (default 0)
+        weights: Positive integer cost per piece (default 1)
+        deadline: time.perf_counter() value after which the search stops
+    
+    Returns:
+        Tuple of (counts in the order given, or None if no breakdown was
+        found; True if the search finished, i.e. the counts are optimal or
+        the amount is proven impossible)
+    """
+    found, exhausted = _bounded_search(
+        units, values, upper, lower, weights, 1, node_limit, deadline
+    )
+    return (found[0][1] if found else None), exhausted
+
+
+def cost_lower_bound(
+    units: int,
+    values: Sequence[int],
+    upper: Optional[Sequence[Optional[int]]] = None,
+    lower: Optional[Sequence[int]] = None,
+    weights: Optional[Sequence[int]] = None
+) -> int:
+    """
+    Lower bound on the cost of any bounded breakdown (LP relaxation).
+    
+    The required minimum counts are paid, and the rest is priced at the
+    lowest cost per minor unit among denominations that may still be used.
+    With the default weights this is the minimum possible number of pieces.
+    
+    Args:
+        units: Amount in minor units
+        values: Denomination values in minor units
+        upper: Maximum count per denomination (None = unlimited)
+        lower: Minimum count per denomination (default 0)
+        weights: Positive integer cost per piece (default 1)
+    
+    Returns:
+        Cost no breakdown can go below
+    """
+    k = len(values)
+    if upper is None:
+        upper = [None] * k
+    if lower is None:
+        lower = [0] * k
+    if weights is None:
+        weights = [1] * k
+    
+    cost = sum(low * weight for low, weight in zip(lower, weights))
+    rest = units - sum(low * value for low, value in zip(lower, values))
+    if rest <= 0:
+        return cost
+    
+    # Cheapest cost per minor unit, compared exactly
+    cheapest = None
+    for i in range(k):
+        if upper[i] is not None and upper[i] <= lower[i]:
+            continue
+        if cheapest is None or weights[i] * values[cheapest] < weights[cheapest] * values[i]:
+            cheapest = i
+    if cheapest is None:
+        return cost
+    
+    return cost - (-rest * weights[cheapest] // values[cheapest])
+
+
+def k_best_bounded(
+    units: int,
+    values: Sequence[int],
+    k: int,
+    upper: Optional[Sequence[Optional[int]]] = None,
+    node_limit: int = 200_000,
+    lower: Optional[Sequence[int]] = None,
+    weights: Optional[Sequence[int]] = None,
+    deadline: Optional[float] = None
+) -> Tuple[List[Tuple[int, List[int]]], bool]:
+    """
+    The k cheapest distinct breakdowns under per-denomination bounds.
+    
+    Same search as solve_bounded, but a subtree is only cut when it cannot
+    beat the k-th best breakdown found so far (the dominance cut is off,
+    since a dearer path to the same rest still leads to different
+    breakdowns). Every count vector is visited at most once, so the
+    results are distinct.
+    
+    Args:
+        units: Amount in minor units
+        values: Denomination values in minor units (distinct, any order)
+        k: Number of breakdowns wanted
+        upper: Maximum count per denomination (None = unlimited)
+        node_limit: Maximum search nodes
+        lower: Minimum count per denomination (default 0)
+        weights: Positive integer cost per piece (default 1)
+        deadline: time.perf_counter() value after which the search stops
+    
+    Returns:
+        Tuple of ([(cost, counts in the order given)] cheapest first, True
+        if the search finished, i.e. these are provably the k best)
+    """
+    if k <= 0:
+        raise ValueError("k must be positive")
+    if upper is None:
+        upper = [None] * len(values)
+    return _bounded_search(
+        units, values, upper, lower, weights, k, node_limit, deadline
+    )
+
+
+def _bounded_search(
+    units: int,
+    values: Sequence[int],
+    upper: Sequence[Optional[int]],
+    lower: Optional[Sequence[int]],
+    weights: Optional[Sequence[int]],
+    keep: int,
+    node_limit: int,
+    deadline: Optional[float]
+) -> Tuple[List[Tuple[int, List[int]]], bool]:
+    """Branch-and-bound keeping the `keep` cheapest breakdowns."""
+    if units < 0:
+        raise ValueError("Amount must be non-negative minor units")
+    
+    k = len(values)
+    if lower is None:
+        lower = [0] * k
+    if weights is None:
+        weights = [1] * k
+    
+    # Pay the required minimum counts first
+    base_cost = sum(low * weight for low, weight in zip(lower, weights))
+    units -= sum(low * value for low, value in zip(lower, values))
+    if units < 0:
+        return [], True
+    for low, cap in zip(lower, upper):
+        if cap is not None and cap < low:
+            return [], True
+    
+    order = sorted(range(k), key=lambda i: values[i], reverse=True)
+    vals = [values[i] for i in order]
+    costs = [weights[i] for i in order]
+    caps = [
+        upper[i] - lower[i] if upper[i] is not None else None
+        for i in order
+    ]
+    
+    # Suffix capacity (None = unlimited), suffix gcd and the suffix position
+    # with the lowest cost per minor unit (for the bound)
+    capacity: List[Optional[int]] = [0] * (k + 1)
+    divisor = [0] * (k + 1)
+    cheapest = [-1] * (k + 1)
+    for i in range(k - 1, -1, -1):
+        if caps[i] is None or capacity[i + 1] is None:
+            capacity[i] = None
+        else:
+            capacity[i] = capacity[i + 1] + caps[i] * vals[i]
+        divisor[i] = math.gcd(divisor[i + 1], vals[i])
+        
+        j = cheapest[i + 1]
+        if j < 0 or costs[i] * vals[j] < costs[j] * vals[i]:
+            j = i
+        cheapest[i] = j
+    
+    # The bound grows as the count of i falls when i is no more expensive per
+    # unit than the cheapest denomination after it, and as it rises otherwise
+    monotone = [
+        cheapest[i + 1] < 0
+        or costs[i] * vals[cheapest[i + 1]] <= costs[cheapest[i + 1]] * vals[i]
+        for i in range(k)
+    ]
+    
+    # Max-heap (by cost) of the best breakdowns; the worst one is the bar
+    # a subtree has to beat once the heap is full
+    kept: List[Tuple[int, int, List[int]]] = []
+    limit = None
+    counts = [0] * k
+    seen = {} if keep == 1 else None
+    nodes = 0
+    
+    def search(i: int, rest: int, cost: int) -> bool:
+        """Explore denominations i.. for `rest`; False once a limit is hit."""
+        nonlocal limit, nodes
+        
+        if rest == 0:
+            if limit is None or cost < limit:
+                entry = (-cost, nodes, counts.copy())
+                if len(kept) < keep:
+                    heapq.heappush(kept, entry)
+                else:
+                    heapq.heapreplace(kept, entry)
+                if len(kept) == keep:
+                    limit = -kept[0][0]
+            return True
+        
+        if i == k:
+            return True
+        
+        nodes += 1
+        if nodes > node_limit:
+            return False
+        if deadline is not None and not nodes & 255 and time.perf_counter() > deadline:
+            return False
+        
+        if seen is not None:
+            key = (i, rest)
+            previous = seen.get(key)
+            if previous is not None and previous <= cost:
+                return True
+            seen[key] = cost
+        
+        value = vals[i]
+        weight = costs[i]
+        most = rest // value
+        if caps[i] is not None and caps[i] < most:
+            most = caps[i]
+        
+        # Fewest pieces of i that leave a rest the stock after i can pay
+        least = 0
+        next_capacity = capacity[i + 1]
+        if next_capacity is not None and rest > next_capacity:
+            least = -((next_capacity - rest) // value)
+        if least > most:
+            return True
+        
+        next_divisor = divisor[i + 1]
+        j = cheapest[i + 1]
+        if j >= 0:
+            unit_cost, unit_value = costs[j], vals[j]
+        
+        # Walk the counts in the direction in which the bound grows, so the
+        # first count that fails it ends the loop
+        if monotone[i]:
+            candidates = range(most, least - 1, -1)
+        else:
+            candidates = range(least, most + 1)
+        
+        for count in candidates:
+            remaining = rest - count * value
+            
+            if limit is not None:
+                bound = cost + count * weight
+                if remaining:
+                    bound -= -remaining * unit_cost // unit_value
+                if bound >= limit:
+                    break
+            if remaining and remaining % next_divisor:
+                continue
+            
+            counts[i] = count
+            finished = search(i + 1, remaining, cost + count * weight)
+            counts[i] = 0
+            if not finished:
+                return False
+        
+        return True
+    
+    exhausted = search(0, units, 0)
+    
+    found = []
+    for negative_cost, _, best in sorted(kept, key=lambda entry: (-entry[0], entry[1])):
+        result = list(lower)
+        for position, count in zip(order, best):
+            result[position] += count
+        found.append((base_cost - negative_cost, result))
+    return found, exhausted
+
+
+# Largest amount (in gcd steps) count_combinations will hold in memory
+COUNT_LIMIT = 20_000_000
+
+
+def count_combinations(
+    units: int,
+    values: Sequence[int],
+    limit: int = COUNT_LIMIT
+) -> int:
+    """
+    Number of distinct ways to pay an amount (order does not matter).
+    
+    Rolling-array DP over the amount: ways[a] counts the breakdowns of a
+    with the denominations seen so far, and adding denomination v turns
+    every residue class a = r (mod v) into its running sum. Everything is
+    first divided by the gcd of the values, so memory is O(units / gcd).
+    Counts are exact Python integers.
+    
+    Args:
+        units: Amount in minor units
+        values: Denomination values in minor units (distinct, any order)
+        limit: Maximum DP size (units / gcd) before refusing
+    
+    Returns:
+        Number of breakdowns (0 if the amount cannot be paid)
+    
+    Raises:
+        ValueError: If units is negative or the DP would exceed limit
+    """
+    if units < 0:
+        raise ValueError("Amount must be non-negative minor units")
+    if not values:
+        return 1 if units == 0 else 0
+    
+    unit = math.gcd(*values)
+    if units % unit:
+        return 0
+    
+    size = units // unit
+    if size > limit:
+        raise ValueError(
+            f"Amount is too large to count breakdowns ({size:,} steps, limit {limit:,})"
+        )
+    
+    scaled = sorted({v // unit for v in values if v // unit <= size})
+    if not scaled:
+        return 1 if size == 0 else 0
+    
+    # The first denomination alone pays exactly its multiples
+    first = scaled[0]
+    ways = [0] * (size + 1)
+    ways[::first] = [1] * (size // first + 1)
+    
+    for value in scaled[1:]:
+        for residue in range(value):
+            ways[residue::value] = itertools.accumulate(ways[residue::value])
+    
+    return ways[size]
+
+
+def iter_combinations(
+    units: int,
+    values: Sequence[int]
+) -> Iterator[Tuple[int, ...]]:
+    """
+    Lazily yield every way to pay an amount.
+    
+    Counts are aligned with values as given and are yielded in descending
+    lexicographic order, taking values in the order given, so with values
+    largest first the greedy breakdown comes first. Only the current path
+    is held in memory. Branches whose rest is not a multiple of the gcd of
+    the remaining values are skipped.
+    
+    Args:
+        units: Amount in minor units
+        values: Denomination values in minor units (distinct)
+    
+    Yields:
+        Tuple of counts per value
+    
+    Raises:
+        ValueError: If units is negative
+    """
+    if units < 0:
+        raise ValueError("Amount must be non-negative minor units")
+    
+    k = len(values)
+    if k == 0:
+        if units == 0:
+            yield ()
+        return
+    
+    divisor = [0] * (k + 1)
+    for i in range(k - 1, -1, -1):
+        divisor[i] = math.gcd(divisor[i + 1], values[i])
+    if units % divisor[0]:
+        return
+    
+    # Explicit stack of count iterators, one per denomination on the path
+    counts = [0] * k
+    last = k - 1
+    stack = [iter(range(units // values[0], -1, -1))]
+    rests = [units]
+    
+    while stack:
+        i = len(stack) - 1
+        count = next(stack[i], None)
+        if count is None:
+            stack.pop()
+            rests.pop()
+            continue
+        
+        rest = rests[i] - count * values[i]
+        counts[i] = count
+        if i == last:
+            if rest == 0:
+                yield tuple(counts)
+            continue
+        if rest % divisor[i + 1]:
+            continue
+        
+        stack.append(iter(range(rest // values[i + 1], -1, -1)))
+        rests.append(rest)
@@ -4,11 +4,39 @@ Test script for the Core Denomination Engine
 Run this to verify the core engine works correctly.
 """
 
+import json
+import tempfile
+import threading
+import time
 from decimal import Decimal
+from pathlib import Path
 from engine import DenominationEngine, calculate_denominations
-from models import CalculationRequest, OptimizationMode, Constraint, ConstraintType
+from models import (
+    BulkCalculationRequest, CalculationRequest, OptimizationMode, Constraint, ConstraintType,
+    InfeasibleBreakdownError
+)
 from optimizer import OptimizationEngine
 from fx_service import FXService
+from lookup_table import build_lookup_table, table_filename
+from constraints import constraint_signature
+from solvers import MinCountSolver, greedy_counterexample
+
+
+NON_CANONICAL_CURRENCY = {
+    "NCS": {
+        "name": "Non-canonical", "symbol": "N", "code": "NCS",
+        "decimal_places": 0, "notes": [4, 3], "coins": [1],
+        "smallest_unit": 1, "active": True
+    }
+}
+
+
+def _engine_with_currencies(currencies):
+    """Create an engine from an ad-hoc currencies.json."""
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = Path(tmp) / "currencies.json"
+        config_path.write_text(json.dumps(currencies), encoding='utf-8')
+        return DenominationEngine(str(config_path))
 
 
 def test_basic_calculation():
@@ -194,6 +222,807 @@ def test_alternative_suggestions():
     print("\n✓ Test passed!\n")
 
 
+def test_minor_unit_fast_path():
+    """Test integer minor-unit greedy path against the Decimal path."""
+    print("=" * 60)
+    print("TEST 8: Integer Minor-Unit Fast Path")
+    print("=" * 60)
+    
+    decimal_engine = DenominationEngine(use_minor_units=False)
+    minor_engine = DenominationEngine(use_minor_units=True)
+    
+    # Both paths must agree wherever the Decimal path is still exact
+    for currency, amount in [("INR", "50000"), ("USD", "1234.56"), ("EUR", "0.99"), ("GBP", "88.88")]:
+        request = CalculationRequest(amount=Decimal(amount), currency=currency)
+        expected = decimal_engine.calculate(request).to_dict()
+        actual = minor_engine.calculate(request).to_dict()
+        assert actual == expected, f"Mismatch for {amount} {currency}"
+        print(f"  {amount} {currency}: {actual['total_denominations']} denominations (paths agree)")
+    
+    # 40-digit amount: beyond the 28-digit Decimal context
+    amount = Decimal("1234567890123456789012345678901234567891")
+    result = minor_engine.calculate(CalculationRequest(amount=amount, currency="INR"))
+    total = sum(int(b.total_value) for b in result.breakdowns)
+    assert total == int(amount), "Breakdown must sum exactly to the amount"
+    print(f"\n  {amount} INR sums exactly ({result.total_denominations:,} denominations)")
+    
+    print("\n✓ Test passed!\n")
+
+
+def test_batch_calculation():
+    """Test vectorized batch API against per-request calculation."""
+    print("=" * 60)
+    print("TEST 9: Batch Calculation")
+    print("=" * 60)
+    
+    engine = DenominationEngine()
+    
+    # USD amounts in cents, including one beyond int64 (Python int fallback)
+    amounts = [1, 99, 123456, 50000000, 2 ** 63 + 12345]
+    
+    for batch_amounts in (amounts[:-1], amounts):
+        batch = engine.calculate_batch(batch_amounts, "USD")
+        print(f"\n  {len(batch)} amounts, vectorized={batch.vectorized}")
+        
+        for row, cents in enumerate(batch_amounts):
+            expected = engine.calculate(CalculationRequest(
+                amount=Decimal(cents) / 100, currency="USD"
+            ))
+            counts = dict(zip(batch.denominations, (int(c) for c in batch.counts[row])))
+            for b in expected.breakdowns:
+                assert counts[b.denomination] == b.count, f"Count mismatch for {cents}"
+            assert int(batch.total_notes[row]) == expected.total_notes
+            assert int(batch.total_coins[row]) == expected.total_coins
+    
+    print("\n✓ Test passed!\n")
+
+
+def test_denomination_plans():
+    """Test precompiled per-currency denomination plans."""
+    print("=" * 60)
+    print("TEST 10: Denomination Plans")
+    print("=" * 60)
+    
+    engine = DenominationEngine()
+    
+    greedy = engine.get_plan("INR", OptimizationMode.GREEDY)
+    ascending = engine.get_plan("inr", OptimizationMode.MINIMIZE_LARGE)
+    
+    # INR lists 20 and 10 as both note and coin: one entry each, as a note
+    assert greedy.denominations.count(Decimal("20")) == 1
+    assert greedy.is_note(greedy.index[Decimal("20")])
+    assert not greedy.is_note(greedy.index[Decimal("5")])
+    assert list(greedy.denominations) == sorted(greedy.denominations, reverse=True)
+    assert ascending.denominations == tuple(reversed(greedy.denominations))
+    assert greedy.values[greedy.index[Decimal("500")]] == 50000  # paise
+    
+    # Plans are shared and immutable
+    assert engine.get_plan("INR") is greedy
+    try:
+        greedy.note_mask = 0
+        assert False, "Plan should be frozen"
+    except AttributeError:
+        pass
+    
+    print(f"\n  INR greedy: {len(greedy)} denominations, note mask {greedy.note_mask:b}")
+    print("\n✓ Test passed!\n")
+
+
+def test_exact_solver():
+    """Test minimum-count DP mode on a non-canonical denomination system."""
+    print("=" * 60)
+    print("TEST 11: Exact Minimum-Count Solver")
+    print("=" * 60)
+    
+    # 1, 3, 4: greedy gives 6 = 4 + 1 + 1, optimal is 3 + 3
+    engine = _engine_with_currencies(NON_CANONICAL_CURRENCY)
+    
+    # Reference: plain unbounded DP
+    best = [0] + [None] * 400
+    for v in range(1, 401):
+        best[v] = 1 + min(best[v - d] for d in (4, 3, 1) if d <= v)
+    
+    for amount in range(1, 401):
+        exact = engine.calculate(CalculationRequest(
+            amount=Decimal(amount), currency="NCS",
+            optimization_mode=OptimizationMode.EXACT
+        ))
+        assert exact.get_total_value() == amount
+        assert exact.total_denominations == best[amount], f"Not minimal for {amount}"
+    
+    greedy = engine.calculate(CalculationRequest(amount=Decimal(6), currency="NCS"))
+    exact = engine.calculate(CalculationRequest(
+        amount=Decimal(6), currency="NCS", optimization_mode=OptimizationMode.EXACT
+    ))
+    print(f"\n  6 NCS: greedy {greedy.total_denominations} pieces, exact {exact.total_denominations} pieces")
+    
+    # Huge amounts stay bounded: DP only covers the residue below the threshold
+    huge = Decimal(10) ** 30 + 2
+    exact = engine.calculate(CalculationRequest(
+        amount=huge, currency="NCS", optimization_mode=OptimizationMode.EXACT
+    ))
+    assert sum(int(b.total_value) for b in exact.breakdowns) == int(huge)
+    print(f"  10^30 + 2 NCS: {exact.total_denominations:,} pieces")
+    
+    # lcm(9973, 9967) puts the threshold near 10^8: the DP table stops at
+    # its cap and unbudgeted solves past it use the bounded search
+    engine = _engine_with_currencies({
+        "ADV": {
+            "name": "Adversarial", "symbol": "A", "code": "ADV",
+            "decimal_places": 0, "notes": [9973, 9967, 7], "coins": [1],
+            "smallest_unit": 1, "active": True
+        }
+    })
+    solver = engine._exact_solvers["ADV"]
+    assert solver.table_limit > MinCountSolver.MAX_TABLE_SIZE
+    start = time.perf_counter()
+    amount = Decimal("123456789")
+    exact = engine.calculate(CalculationRequest(
+        amount=amount, currency="ADV", optimization_mode=OptimizationMode.EXACT
+    ))
+    batch = engine.calculate_batch([123456789, 55], "ADV", OptimizationMode.EXACT)
+    elapsed = time.perf_counter() - start
+    assert exact.get_total_value() == amount
+    assert list(batch.remainders) == [0, 0]
+    assert len(solver._best) <= MinCountSolver.MAX_TABLE_SIZE
+    assert MinCountSolver([4, 3, 1], max_table_size=10).solve(6) == ([0, 2, 0], 0)
+    assert MinCountSolver([9973, 9967, 7], max_table_size=10).solve(10 ** 6) is None
+    print(f"  123456789 ADV: {exact.total_denominations:,} pieces, "
+          f"DP table {len(solver._best):,} entries ({elapsed * 1000:.0f} ms)")
+    
+    print("\n✓ Test passed!\n")
+
+
+def test_canonicality_analysis():
+    """Test load-time greedy optimality analysis and EXACT routing."""
+    print("=" * 60)
+    print("TEST 12: Canonicality Analysis")
+    print("=" * 60)
+    
+    engine = DenominationEngine()
+    for code in ["INR", "USD", "EUR", "GBP"]:
+        info = engine.get_currency_info(code)
+        assert info['greedy_optimal'] and info['exact_solver'] == 'greedy'
+        print(f"  {code}: canonical, EXACT mode uses greedy")
+    
+    engine = _engine_with_currencies(NON_CANONICAL_CURRENCY)
+    info = engine.get_currency_info("NCS")
+    assert not info['greedy_optimal']
+    assert info['greedy_counterexample'] == "6"
+    assert info['exact_solver'] == 'dp'
+    print(f"  NCS: not canonical, smallest counter-example {info['greedy_counterexample']}, EXACT mode uses DP")
+    
+    # 40 denominations without a unit coin: a full proof would scan ~10^25
+    # amounts, so the check stops at its limit and leaves the answer unknown
+    values = sorted({round(1.37 ** i, 2) for i in range(80)}, reverse=True)[:40]
+    start = time.perf_counter()
+    engine = _engine_with_currencies({
+        "SYN": {
+            "name": "Synthetic", "symbol": "S", "code": "SYN",
+            "decimal_places": 2, "notes": values[:20], "coins": values[20:],
+            "smallest_unit": 0.01, "active": True
+        }
+    })
+    elapsed = time.perf_counter() - start
+    assert elapsed < 5.0
+    info = engine.get_currency_info("SYN")
+    assert info['greedy_optimal'] is None and info['exact_solver'] == 'dp'
+    amount = Decimal("98765432.10")
+    exact = engine.calculate(CalculationRequest(
+        amount=amount, currency="SYN", optimization_mode=OptimizationMode.EXACT
+    ))
+    assert exact.get_total_value() <= amount
+    print(f"  SYN: canonicality unknown, loaded in {elapsed * 1000:.0f} ms, EXACT mode uses DP")
+    
+    try:
+        greedy_counterexample([15, 10, 6], scan_limit=10)
+        assert False, "undecided system reported canonical"
+    except ValueError:
+        pass
+    # 12 = 6 + 6, where greedy pays 10 and leaves 2
+    assert greedy_counterexample([15, 10, 6], scan_limit=20) == 12
+    
+    print("\n✓ Test passed!\n")
+
+
+def test_result_cache():
+    """Test the opt-in LRU result cache and its invalidation."""
+    print("=" * 60)
+    print("TEST 13: Result Cache")
+    print("=" * 60)
+    
+    assert DenominationEngine().cache_stats() is None
+    
+    engine = DenominationEngine(cache_size=2)
+    first = engine.calculate(CalculationRequest(amount=Decimal("1850"), currency="INR"))
+    second = engine.calculate(CalculationRequest(amount=Decimal("1850.00"), currency="INR"))
+    assert second.breakdowns == first.breakdowns
+    assert second.breakdowns[0] is first.breakdowns[0]
+    assert second.breakdowns is not first.breakdowns
+    
+    # Mode and constraints are part of the key
+    exact = engine.calculate(CalculationRequest(
+        amount=Decimal("1850"), currency="INR", optimization_mode=OptimizationMode.EXACT
+    ))
+    assert exact.breakdowns[0] is not first.breakdowns[0]
+    stats = engine.cache_stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 2, 0)
+    
+    engine.calculate(CalculationRequest(amount=Decimal("99"), currency="INR"))
+    stats = engine.cache_stats()
+    assert stats['size'] == 2 and stats['evictions'] == 1
+    print(f"  Stats: {stats}")
+    
+    # Reloading a changed config must not serve stale results
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = Path(tmp) / "currencies.json"
+        config_path.write_text(json.dumps(NON_CANONICAL_CURRENCY), encoding='utf-8')
+        engine = DenominationEngine(str(config_path), cache_size=16)
+        request = CalculationRequest(amount=Decimal("6"), currency="NCS")
+        assert engine.calculate(request).total_denominations == 3
+        
+        changed = json.loads(json.dumps(NON_CANONICAL_CURRENCY))
+        changed["NCS"]["notes"] = [6, 4, 3]
+        config_path.write_text(json.dumps(changed), encoding='utf-8')
+        old_hash = engine.config_hash
+        engine.reload_currencies()
+        assert engine.config_hash != old_hash
+        assert len(engine._result_cache) == 0
+        assert engine.calculate(request).total_denominations == 1
+    print("  Reload: cache cleared, new denominations used")
+    
+    print("\n✓ Test passed!\n")
+
+
+def test_lookup_tables():
+    """Test memory-mapped lookup tables against the computed breakdowns."""
+    print("=" * 60)
+    print("TEST 14: Lookup Tables")
+    print("=" * 60)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = DenominationEngine()
+        table = build_lookup_table(
+            engine, "INR", OptimizationMode.GREEDY, 500000,
+            Path(tmp) / table_filename("INR", OptimizationMode.GREEDY)
+        )
+        assert table.split and table.ceiling >= 500000
+        # Stored with the widest count greedy uses, not amount / smallest coin
+        assert table._counts.itemsize == 1
+        table.close()
+        
+        fast = DenominationEngine(lookup_dir=tmp)
+        opened = [fast]
+        assert ("INR", OptimizationMode.GREEDY) in fast._lookup_tables
+        for amount in ["0.50", "1", "1850", "4999.99", "5000", "123456789", "9" * 40]:
+            request = CalculationRequest(amount=Decimal(amount), currency="INR")
+            assert fast.calculate(request).breakdowns == engine.calculate(request).breakdowns
+        
+        units = [0, 49, 50, 185025, 499999, 500000, 12345678900, 9 * 10**17]
+        plan = fast.get_plan("INR", OptimizationMode.GREEDY)
+        if fast._table_counts(plan, units) is not None:
+            batch = fast.calculate_batch(units, "INR")
+            expected = engine.calculate_batch(units, "INR")
+            assert batch.counts.tolist() == expected.counts.tolist()
+            assert batch.remainders.tolist() == expected.remainders.tolist()
+            amounts = [Decimal(u).scaleb(-2) for u in units[1:]]
+            assert fast.aggregate(amounts, "INR") == engine.aggregate(amounts, "INR")
+        print("  INR greedy: batch, split and aggregate lookups match the engine")
+        
+        # close() waits for a lookup holding the table; later lookups miss
+        table = fast._lookup_tables[("INR", OptimizationMode.GREEDY)]
+        with table._lock:
+            closer = threading.Thread(target=table.close)
+            closer.start()
+            closer.join(0.1)
+            assert closer.is_alive() and not table._mmap.closed
+        closer.join()
+        assert table._mmap.closed and table.lookup(185000) is None
+        table.close()
+        fast.close()
+        print("  Table closed only after the lookup in progress")
+        
+        # A table built from another currencies.json is ignored
+        config_path = Path(tmp) / "currencies.json"
+        config_path.write_text(json.dumps(NON_CANONICAL_CURRENCY), encoding='utf-8')
+        other = DenominationEngine(str(config_path))
+        table = build_lookup_table(
+            other, "NCS", OptimizationMode.EXACT, 100,
+            Path(tmp) / table_filename("NCS", OptimizationMode.EXACT)
+        )
+        table.close()
+        
+        fast = DenominationEngine(str(config_path), lookup_dir=tmp)
+        opened.append(fast)
+        assert ("NCS", OptimizationMode.EXACT) in fast._lookup_tables
+        for units in range(1, 1000, 7):
+            request = CalculationRequest(
+                amount=Decimal(units), currency="NCS",
+                optimization_mode=OptimizationMode.EXACT
+            )
+            assert fast.calculate(request).breakdowns == other.calculate(request).breakdowns
+        batch = fast.calculate_batch(list(range(1000)), "NCS", OptimizationMode.EXACT)
+        expected = other.calculate_batch(list(range(1000)), "NCS", OptimizationMode.EXACT)
+        assert [list(map(int, row)) for row in batch.counts] == expected.counts
+        print("  NCS exact: table and split lookups match the DP solver")
+        
+        # Without a unit coin, remainders come from the gathered counts
+        no_unit = json.loads(json.dumps(NON_CANONICAL_CURRENCY))
+        no_unit["NCS"]["coins"] = []
+        config_path.write_text(json.dumps(no_unit), encoding='utf-8')
+        other = DenominationEngine(str(config_path))
+        build_lookup_table(
+            other, "NCS", OptimizationMode.GREEDY, 100,
+            Path(tmp) / table_filename("NCS", OptimizationMode.GREEDY)
+        ).close()
+        fast = DenominationEngine(str(config_path), lookup_dir=tmp)
+        opened.append(fast)
+        plan = fast.get_plan("NCS", OptimizationMode.GREEDY)
+        if fast._table_counts(plan, [0]) is not None:
+            batch = fast.calculate_batch(list(range(300)), "NCS")
+            expected = other.calculate_batch(list(range(300)), "NCS")
+            assert batch.counts.tolist() == expected.counts.tolist()
+            assert batch.remainders.tolist() == expected.remainders.tolist()
+        print("  NCS greedy without a unit coin: remainders match")
+        config_path.write_text(json.dumps(NON_CANONICAL_CURRENCY), encoding='utf-8')
+        fast = DenominationEngine(str(config_path), lookup_dir=tmp)
+        opened.append(fast)
+        
+        changed = json.loads(json.dumps(NON_CANONICAL_CURRENCY))
+        changed["NCS"]["notes"] = [6, 4, 3]
+        config_path.write_text(json.dumps(changed), encoding='utf-8')
+        stale = fast._lookup_tables[("NCS", OptimizationMode.EXACT)]
+        fast.reload_currencies()
+        assert not fast._lookup_tables
+        assert stale._mmap.closed
+        print("  Stale table ignored and closed after config change")
+        
+        # Release the mappings so the directory can be removed on Windows
+        for loaded in opened:
+            loaded.close()
+            assert not loaded._lookup_tables
+    
+    print("\n✓ Test passed!\n")
+
+
+def test_streaming_aggregate():
+    """Test aggregate() against summing individual calculations."""
+    print("=" * 60)
+    print("TEST 15: Streaming Aggregate")
+    print("=" * 60)
+    
+    engine = DenominationEngine()
+    items = [("1850", "INR"), ("2999.99", "USD"), ("0.35", "usd"), ("50000", "INR"), ("9" * 30, "USD")]
+    
+    expected = {}
+    for amount, code in items:
+        result = engine.calculate(CalculationRequest(amount=Decimal(amount), currency=code))
+        counts = expected.setdefault(code.upper(), {})
+        for b in result.breakdowns:
+            counts[b.denomination] = counts.get(b.denomination, 0) + b.count
+    
+    # Generator input, chunks smaller than the stream
+    aggregate = engine.aggregate((item for item in items), chunk_size=2)
+    assert set(aggregate.currencies) == {"INR", "USD"}
+    for code, subtotal in aggregate.currencies.items():
+        assert {b.denomination: b.count for b in subtotal.breakdowns} == expected[code]
+        print(f"  {code}: {subtotal.amount_count} amounts, {subtotal.total_denominations} pieces")
+    
+    usd = aggregate.currencies["USD"]
+    assert usd.total_amount == Decimal("1000000000000000000000000002999.34")
+    assert aggregate.amount_count == len(items)
+    assert aggregate.total_denominations == sum(
+        sum(counts.values()) for counts in expected.values()
+    )
+    
+    # Single-currency form and the EXACT solver path
+    engine = _engine_with_currencies(NON_CANONICAL_CURRENCY)
+    aggregate = engine.aggregate([6, 6, 7], currency="NCS", mode=OptimizationMode.EXACT)
+    assert aggregate.total_denominations == 2 + 2 + 2
+    print(f"  NCS exact: {aggregate.total_denominations} pieces for 3 amounts")
+    
+    print("\n✓ Test passed!\n")
+
+
+def test_inventory_solver():
+    """Test breakdowns limited by finite denomination stock."""
+    print("=" * 60)
+    print("TEST 16: Inventory-Constrained Breakdown")
+    print("=" * 60)
+    
+    engine = DenominationEngine()
+    optimizer = OptimizationEngine(engine)
+    
+    # Greedy would take the $50 and get stuck on the missing $10
+    result = optimizer.solve_with_inventory(
+        Decimal("60"), "USD", {Decimal("50"): 1, Decimal("20"): 3}
+    )
+    assert [(b.denomination, b.count) for b in result.breakdowns] == [(Decimal("20"), 3)]
+    assert result.metadata['proven_optimal']
+    print("  $60 from {50: 1, 20: 3} -> 3 x $20")
+    
+    # Withdrawals update the inventory in place
+    drawer = {Decimal("500"): 2, Decimal("200"): 10, Decimal("100"): 10}
+    result = optimizer.withdraw(Decimal("1800"), "INR", drawer)
+    assert result.total_denominations == 6
+    assert drawer == {Decimal("500"): 0, Decimal("200"): 6, Decimal("100"): 10}
+    result = optimizer.withdraw(Decimal("1800"), "INR", drawer)
+    assert result.get_total_value() == Decimal("1800")
+    assert drawer == {Decimal("500"): 0, Decimal("200"): 0, Decimal("100"): 4}
+    print("  Two withdrawals of 1800 INR: drawer updated in place")
+    
+    # Impossible withdrawals fail without touching the inventory
+    try:
+        optimizer.withdraw(Decimal("500"), "INR", drawer)
+        assert False, "Expected InfeasibleBreakdownError"
+    except InfeasibleBreakdownError:
+        pass
+    assert drawer[Decimal("100")] == 4
+    print("  Infeasible withdrawal rejected, inventory unchanged")
+    
+    print("\n✓ Test passed!\n")
+
+
+def test_constraint_program():
+    """Test constraints solved together as one integer program."""
+    print("=" * 60)
+    print("TEST 17: Unified Constraint Solver")
+    print("=" * 60)
+    
+    engine = DenominationEngine()
+    
+    def solve(amount, *constraints):
+        return engine.calculate(CalculationRequest(
+            amount=Decimal(amount),
+            currency="INR",
+            optimization_mode=OptimizationMode.CONSTRAINED,
+            constraints=list(constraints)
+        ))
+    
+    def counts(result):
+        return {b.denomination: b.count for b in result.breakdowns}
+    
+    # CAP is redistributed exactly, including the value the cap removed
+    result = solve("1700", Constraint(type=ConstraintType.CAP, denomination=Decimal("500"), value=1))
+    assert result.get_total_value() == Decimal("1700")
+    assert counts(result) == {Decimal("500"): 1, Decimal("200"): 6}
+    print(f"  CAP 500 x1: {counts(result)}")
+    
+    # REQUIRE and ONLY together; ONLY recomputes instead of dropping value
+    result = solve(
+        "1000",
+        Constraint(type=ConstraintType.ONLY, denominations=[Decimal("200"), Decimal("100")]),
+        Constraint(type=ConstraintType.REQUIRE, denomination=Decimal("100"), value=2)
+    )
+    assert counts(result) == {Decimal("200"): 4, Decimal("100"): 2}
+    print(f"  ONLY 200/100 + REQUIRE 100 x2: {counts(result)}")
+    
+    # MINIMIZE avoids the denomination when another exact breakdown exists
+    result = solve("2500", Constraint(type=ConstraintType.MINIMIZE, denomination=Decimal("500")))
+    assert Decimal("500") not in counts(result)
+    assert result.get_total_value() == Decimal("2500")
+    print(f"  MINIMIZE 500: {counts(result)}")
+    
+    # Contradictions and impossible amounts are reported, never truncated
+    for amount, constraints in [
+        ("1000", [Constraint(type=ConstraintType.CAP, denomination=Decimal("100"), value=1),
+                  Constraint(type=ConstraintType.REQUIRE, denomination=Decimal("100"), value=2)]),
+        ("150", [Constraint(type=ConstraintType.ONLY, denominations=[Decimal("100")])])
+    ]:
+        try:
+            solve(amount, *constraints)
+            assert False, "Expected InfeasibleBreakdownError"
+        except InfeasibleBreakdownError as e:
+            print(f"  Infeasible: {e}")
+    
+    print("\n✓ Test passed!\n")
+
+
+def test_constraint_signatures():
+    """Test hashable constraint signatures and compiled program reuse."""
+    print("=" * 60)
+    print("TEST 18: Constraint Signatures and Compiled Programs")
+    print("=" * 60)
+    
+    engine = DenominationEngine()
+    optimizer = OptimizationEngine(engine)
+    
+    avoid = Constraint(type=ConstraintType.AVOID, denomination=Decimal("500"))
+    cap = Constraint(type=ConstraintType.CAP, denomination=Decimal("200.00"), value=2)
+    same_cap = Constraint(type="cap", denomination=Decimal("200"), value=2)
+    
+    # Order, duplicates and Decimal spelling do not change the signature
+    signature = constraint_signature([avoid, cap])
+    assert signature == constraint_signature([same_cap, avoid, avoid])
+    assert hash(signature) == hash(constraint_signature([same_cap, avoid]))
+    
+    program = engine.compile_constraints("INR", [avoid, cap])
+    assert engine.compile_constraints("inr", [same_cap, avoid]) is program
+    plan = engine.get_plan("INR", OptimizationMode.CONSTRAINED)
+    assert program.upper[plan.index[Decimal("500")]] == 0
+    assert program.upper[plan.index[Decimal("200")]] == 2
+    assert not program.allowed_mask >> plan.index[Decimal("500")] & 1
+    print(f"  Signature of {len(signature)} constraints compiled once and reused")
+    
+    # Feasibility is precomputed: REQUIRE 3 x 100 needs at least 300
+    program = engine.compile_constraints(
+        "INR", [Constraint(type=ConstraintType.REQUIRE, denomination=Decimal("100"), value=3)]
+    )
+    assert program.min_units == 30000 and not program.may_pay(29900)
+    
+    # Batches compile once; amounts the program cannot pay come back unpaid
+    only = [Constraint(type=ConstraintType.ONLY, denominations=[Decimal("200"), Decimal("100")])]
+    batch = engine.calculate_batch([100000, 15050, 30000], "INR", OptimizationMode.CONSTRAINED, only)
+    assert batch.remainders == [0, 15050, 0]
+    assert list(batch.total_notes) == [5, 0, 2]
+    print(f"  Constrained batch: remainders {batch.remainders}")
+    
+    # Validation outcomes are cached per signature
+    assert optimizer.validate_constraints([avoid, cap], "INR") == (True, None)
+    assert optimizer.validate_constraints([cap, avoid], "INR") == (True, None)
+    assert optimizer._validation_cache.hits == 1
+    print("  Validation cached per (currency, signature)")
+    
+    print("\n✓ Test passed!\n")
+
+
+def test_alternative_search():
+    """Test k-best and Pareto-frontier alternatives."""
+    print("=" * 60)
+    print("TEST 19: k-Best and Pareto Alternatives")
+    print("=" * 60)
+    
+    engine = _engine_with_currencies(NON_CANONICAL_CURRENCY)
+    optimizer = OptimizationEngine(engine)
+    
+    # 6 = 3+3 (2 pieces), 4+1+1 (3), 3+1+1+1 (4), ...
+    request = CalculationRequest(amount=Decimal("6"), currency="NCS")
+    best = optimizer.k_best_alternatives(request, k=3)
+    assert [alt.total_denominations for alt in best] == [2, 3, 4]
+    assert all(alt.metadata['proven_optimal'] for alt in best)
+    assert len({optimizer._breakdown_key(alt) for alt in best}) == 3
+    print(f"  3 best for 6 NCS: {[alt.total_denominations for alt in best]} pieces")
+    
+    fewest_coins = optimizer.k_best_alternatives(request, k=1, objective='coins')[0]
+    assert fewest_coins.total_coins == 0 and fewest_coins.total_notes == 2
+    
+    # Frontier points are distinct and none dominates another
+    engine = DenominationEngine()
+    optimizer = OptimizationEngine(engine)
+    request = CalculationRequest(amount=Decimal("1888"), currency="INR")
+    front = optimizer.pareto_alternatives(request, max_points=6)
+    vectors = [alt.metadata['objectives'] for alt in front]
+    assert vectors[0]['pieces'] == engine.calculate(request).total_denominations
+    assert min(v['notes'] for v in vectors) == 0
+    assert min(v['largest'] for v in vectors) == 0
+    for a in vectors:
+        assert not any(optimizer._dominates(b, a) for b in vectors)
+    for alt in front:
+        assert sum(b.total_value for b in alt.breakdowns) == Decimal("1888")
+    print(f"  Frontier for ₹1,888: {[(v['pieces'], v['largest']) for v in vectors]}")
+    
+    # Suggested alternatives never repeat the original or each other
+    original = optimizer._breakdown_key(engine.calculate(request))
+    alternatives = optimizer.suggest_alternatives(request, count=3)
+    keys = {optimizer._breakdown_key(alt) for alt in alternatives}
+    assert len(alternatives) == 3 and len(keys) == 3 and original not in keys
+    
+    alternatives = engine.generate_alternatives(request, count=3)
+    keys = [optimizer._breakdown_key(alt) for alt in alternatives]
+    assert len(set(keys)) == len(keys) and original not in keys
+    print(f"  {len(alternatives)} distinct mode alternatives (duplicate modes skipped)")
+    
+    try:
+        optimizer.k_best_alternatives(request, objective='weight')
+        assert False, "unknown objective accepted"
+    except ValueError:
+        pass
+    
+    print("\n✓ Test passed!\n")
+
+
+def test_breakdown_counting():
+    """Test counting and lazily listing every breakdown."""
+    print("=" * 60)
+    print("TEST 20: Counting and Streaming Breakdowns")
+    print("=" * 60)
+    
+    engine = _engine_with_currencies(NON_CANONICAL_CURRENCY)
+    
+    # 6 NCS: 4+1+1, 3+3, 3+1+1+1, 1*6
+    ways = list(engine.iter_breakdowns(Decimal("6"), "NCS"))
+    vectors = [[(b.denomination, b.count) for b in way] for way in ways]
+    assert vectors == [
+        [(Decimal("4"), 1), (Decimal("1"), 2)],
+        [(Decimal("3"), 2)],
+        [(Decimal("3"), 1), (Decimal("1"), 3)],
+        [(Decimal("1"), 6)]
+    ]
+    assert engine.count_breakdowns(Decimal("6"), "NCS") == 4
+    print(f"  6 NCS: {len(ways)} breakdowns, greedy first")
+    
+    engine = DenominationEngine()
+    
+    # Every yielded breakdown pays the amount; the count matches the DP
+    amount = Decimal("100")
+    total = 0
+    for breakdowns in engine.iter_breakdowns(amount, "INR"):
+        assert sum(b.total_value for b in breakdowns) == amount
+        total += 1
+    assert total == engine.count_breakdowns(amount, "INR")
+    print(f"  ₹100: {total:,} breakdowns")
+    
+    # Counts are exact big integers; the generator stops early at no cost
+    count = engine.count_breakdowns(Decimal("100000"), "INR")
+    assert count > 2 ** 64
+    first = next(engine.iter_breakdowns(Decimal("100000"), "INR"))
+    assert first == engine.calculate(CalculationRequest(amount=Decimal("100000"), currency="INR")).breakdowns
+    print(f"  ₹1,00,000: {count:,} breakdowns")
+    
+    # Amounts finer than the minor unit cannot be paid at all
+    assert engine.count_breakdowns(Decimal("0.005"), "USD") == 0
+    assert list(engine.iter_breakdowns(Decimal("0.005"), "USD")) == []
+    assert engine.count_breakdowns(Decimal("0"), "USD") == 1
+    
+    print("\n✓ Test passed!\n")
+
+
+def test_anytime_budgets():
+    """Test time and node budgets on EXACT and CONSTRAINED solves."""
+    print("=" * 60)
+    print("TEST 21: Anytime Solving Under a Budget")
+    print("=" * 60)
+    
+    # lcm(9973, 9967) makes the exact DP table ~10^8 entries long
+    engine = _engine_with_currencies({
+        "ADV": {
+            "name": "Adversarial", "symbol": "A", "code": "ADV",
+            "decimal_places": 0, "notes": [9973, 9967, 7], "coins": [1],
+            "smallest_unit": 1, "active": True
+        }
+    })
+    
+    amount = Decimal("123456789")
+    start = time.perf_counter()
+    result = engine.calculate(CalculationRequest(
+        amount=amount, currency="ADV",
+        optimization_mode=OptimizationMode.EXACT, time_budget_ms=50
+    ))
+    elapsed = time.perf_counter() - start
+    assert elapsed < 1.0
+    assert sum(b.total_value for b in result.breakdowns) == amount
+    assert 'fallback' not in result.metadata
+    if result.metadata['proven_optimal']:
+        assert result.metadata['optimality_gap'] == 0
+    else:
+        assert result.metadata['optimality_gap'] >= 0
+    print(f"  Exact under 50 ms budget: {result.total_denominations} pieces, "
+          f"gap <= {result.metadata['optimality_gap']} ({elapsed * 1000:.0f} ms)")
+    
+    # Without a budget canonical currencies are exact and proven
+    engine = DenominationEngine(cache_size=16)
+    request = CalculationRequest(amount=Decimal("1888"), currency="INR",
+                                 optimization_mode=OptimizationMode.EXACT)
+    result = engine.calculate(request)
+    assert result.metadata['proven_optimal'] and result.metadata['optimality_gap'] == 0
+    
+    # A budget too small to find any constrained breakdown falls back to greedy
+    cap = [Constraint(type=ConstraintType.CAP, denomination=Decimal("500"), value=1)]
+    request = CalculationRequest(amount=Decimal("1888"), currency="INR",
+                                 optimization_mode=OptimizationMode.CONSTRAINED,
+                                 constraints=cap, node_budget=1)
+    result = engine.calculate(request)
+    assert result.metadata['fallback'] == 'greedy'
+    assert result.metadata['constraints_satisfied'] is False
+    assert sum(b.total_value for b in result.breakdowns) == Decimal("1888")
+    
+    # Fallbacks are not cached; the same request with room to search is solved
+    request.node_budget = None
+    result = engine.calculate(request)
+    assert result.metadata['proven_optimal'] and 'fallback' not in result.metadata
+    assert result.breakdowns[0].count == 1
+    print(f"  Node budget 1: greedy fallback; unbudgeted: {result.total_denominations} pieces")
+    
+    for budget in ({'time_budget_ms': 0}, {'node_budget': -1}):
+        try:
+            CalculationRequest(amount=Decimal("1"), currency="INR", **budget)
+            assert False, "non-positive budget accepted"
+        except ValueError:
+            pass
+    
+    print("\n✓ Test passed!\n")
+
+
+def test_bulk_calculation():
+    """Test calculate_bulk against individual calculations."""
+    print("=" * 60)
+    print("TEST 22: Bulk Calculation")
+    print("=" * 60)
+    
+    engine = DenominationEngine()
+    cap = [Constraint(type=ConstraintType.CAP, denomination=Decimal("500"), value=1)]
+    requests = [
+        CalculationRequest(amount=Decimal("1850"), currency="INR"),
+        CalculationRequest(amount=Decimal("1850.00"), currency="inr"),
+        CalculationRequest(amount=Decimal("2999.99"), currency="USD",
+                           optimization_mode=OptimizationMode.BALANCED),
+        CalculationRequest(amount=Decimal("0.35"), currency="USD",
+                           optimization_mode=OptimizationMode.EXACT),
+        CalculationRequest(amount=Decimal("9" * 30), currency="USD"),
+        CalculationRequest(amount=Decimal("10"), currency="XXX"),
+        CalculationRequest(amount=Decimal("1888"), currency="INR",
+                           optimization_mode=OptimizationMode.CONSTRAINED, constraints=cap),
+        CalculationRequest(amount=Decimal("50000"), currency="INR",
+                           optimization_mode=OptimizationMode.MINIMIZE_LARGE,
+                           metadata={'ref': 'r-8'})
+    ]
+    
+    bulk = engine.calculate_bulk(BulkCalculationRequest(calculations=requests))
+    assert bulk.total_processed == len(requests)
+    assert bulk.failed == 1 and bulk.errors[0]['index'] == 5
+    assert bulk.errors[0]['currency'] == "XXX"
+    
+    expected = [engine.calculate(r) for i, r in enumerate(requests) if i != 5]
+    for got, want in zip(bulk.results, expected):
+        assert got.to_dict() == want.to_dict(), (got.to_dict(), want.to_dict())
+    assert bulk.results[-1].metadata == {'ref': 'r-8'}
+    print(f"  {bulk.successful} results match calculate(), {bulk.failed} error collected")
+    
+    usd = bulk.summary['currencies']['USD']
+    assert usd['count'] == 3
+    assert usd['total_amount'] == "1000000000000000000000000002999.34"
+    assert bulk.summary['total_denominations'] == sum(r.total_denominations for r in expected)
+    
+    analytics = bulk.analytics
+    assert analytics['batched'] == 6 and analytics['individual'] == 2
+    assert analytics['mode_mix']['greedy'] == 4
+    assert analytics['amount_histogram']['INR'] == {"1000-10000": 3, "10000-100000": 1}
+    assert analytics['amount_histogram']['USD']["0.1-1"] == 1
+    inr_total = {}
+    for result in bulk.results:
+        if result.currency == "INR":
+            for b in result.breakdowns:
+                inr_total[str(b.denomination)] = inr_total.get(str(b.denomination), 0) + b.count
+    assert analytics['denomination_totals']['INR'] == inr_total
+    print(f"  Analytics: {analytics['batched']} batched, mode mix {analytics['mode_mix']}")
+    
+    # Non-canonical EXACT groups use the minimum-count solver
+    engine = _engine_with_currencies(NON_CANONICAL_CURRENCY)
+    requests = [
+        CalculationRequest(amount=Decimal(n), currency="NCS", optimization_mode=OptimizationMode.EXACT)
+        for n in (6, 7, 6)
+    ]
+    bulk = engine.calculate_bulk(BulkCalculationRequest(
+        calculations=requests, generate_summary=False, generate_analytics=False
+    ))
+    assert [r.total_denominations for r in bulk.results] == [2, 2, 2]
+    assert bulk.results[0].metadata['proven_optimal']
+    assert bulk.summary == {} and bulk.analytics is None
+    print("  NCS exact: 3 amounts, 2 pieces each")
+    
+    # Past the DP table cap the proof info is per amount, as calculate() has it
+    engine = _engine_with_currencies({
+        "ADV": {
+            "name": "Adversarial", "symbol": "A", "code": "ADV",
+            "decimal_places": 0, "notes": [9973, 9967, 7], "coins": [1],
+            "smallest_unit": 1, "active": True
+        }
+    })
+    engine.DEFAULT_NODE_LIMIT = 3
+    requests = [
+        CalculationRequest(amount=Decimal(n), currency="ADV", optimization_mode=OptimizationMode.EXACT)
+        for n in ("123456789", "55", "123456789")
+    ]
+    bulk = engine.calculate_bulk(BulkCalculationRequest(calculations=requests))
+    for got, request in zip(bulk.results, requests):
+        assert got.to_dict() == engine.calculate(request).to_dict()
+    assert [r.metadata['proven_optimal'] for r in bulk.results] == [False, True, False]
+    assert bulk.results[0].metadata['optimality_gap'] > 0
+    print(f"  ADV exact past the cap: gap {bulk.results[0].metadata['optimality_gap']}, not proven")
+    
+    print("\n✓ Test passed!\n")
+
+
 def main():
     """Run all tests."""
     print("\n" + "=" * 60)
@@ -208,6 +1037,21 @@ def main():
         test_constraints()
         test_fx_conversion()
         test_alternative_suggestions()
+        test_minor_unit_fast_path()
+        test_batch_calculation()
+        test_denomination_plans()
+        test_exact_solver()
+        test_canonicality_analysis()
+        test_result_cache()
+        test_lookup_tables()
+        test_streaming_aggregate()
+        test_inventory_solver()
+        test_constraint_program()
+        test_constraint_signatures()
+        test_alternative_search()
+        test_breakdown_counting()
+        test_anytime_budgets()
+        test_bulk_calculation()
         
         print("=" * 60)
         print("ALL TESTS PASSED! ✓")
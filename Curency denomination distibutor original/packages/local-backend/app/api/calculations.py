@@ -2,12 +2,15 @@
 Calculations API endpoints.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 from decimal import Decimal, InvalidOperation
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator, Iterator, TextIO
 from datetime import datetime, timezone
+import asyncio
+import itertools
 import json
 import sys
 from pathlib import Path
@@ -21,6 +24,10 @@ logger = logging.getLogger(__name__)
 
 # Import OCR processor
 from app.services.ocr_processor import get_ocr_processor
+from app.services.async_engine import AsyncDenominationEngine, ClientDisconnected, cancel_on_disconnect
+from app.services.bulk_processor import BulkProcessor, bulk_history_rows, columnar_results, summarize_results
+from app.services.history_writer import HistoryWriteBehind
+from app.services.bulk_jobs import BulkJobManager, job_progress
 
 # Add core-engine to path
 core_engine_path = Path(__file__).parent.parent.parent.parent / "core-engine"
@@ -31,16 +38,60 @@ from models import CalculationRequest as CoreRequest, OptimizationMode
 from optimizer import OptimizationEngine
 from fx_service import FXService
 
-from app.database import get_db, Calculation
+from app.config import settings
+from app.database import get_db, insert_calculations, BulkJob, BulkJobResult, Calculation, SessionLocal
 
 
 router = APIRouter()
 
+# Non-standard "client closed request" status (nginx) for abandoned calls
+CLIENT_CLOSED_REQUEST = 499
+
 # Initialize engines
-denomination_engine = DenominationEngine()
+denomination_engine = DenominationEngine(
+    cache_size=settings.ENGINE_CACHE_SIZE,
+    lookup_dir=settings.ENGINE_LOOKUP_DIR
+)
 optimization_engine = OptimizationEngine(denomination_engine)
 fx_service = FXService()
 
+# Heavy engine calls run on a pool so they never block the event loop
+async_engine = AsyncDenominationEngine(
+    denomination_engine,
+    optimization_engine,
+    executor=settings.ENGINE_EXECUTOR,
+    max_workers=settings.ENGINE_MAX_WORKERS
+)
+
+# Bulk uploads are computed in BULK_BATCH_SIZE chunks on a process pool
+bulk_processor = BulkProcessor(
+    denomination_engine,
+    batch_size=settings.BULK_BATCH_SIZE,
+    max_workers=settings.BULK_MAX_WORKERS
+)
+
+# Background bulk-upload jobs (bulk-upload?background=true), shared by every
+# process on the database; workers are started by the lifespan hook
+bulk_jobs = BulkJobManager(
+    bulk_processor,
+    SessionLocal,
+    load_rows=lambda payload, filename: load_upload_rows(payload, filename),
+    batch_size=settings.BULK_BATCH_SIZE,
+    max_rows=settings.MAX_BULK_ROWS,
+    workers=settings.BULK_JOB_WORKERS,
+    lease_seconds=settings.BULK_JOB_LEASE_SECONDS,
+    poll_interval_ms=settings.BULK_JOB_POLL_MS,
+    max_attempts=settings.BULK_JOB_MAX_ATTEMPTS
+)
+
+# /calculate history rows, when HISTORY_WRITE_BEHIND is on (started by the lifespan hook)
+history_writer = HistoryWriteBehind(
+    SessionLocal,
+    flush_rows=settings.HISTORY_FLUSH_ROWS,
+    flush_interval_ms=settings.HISTORY_FLUSH_INTERVAL_MS,
+    max_queued=settings.HISTORY_MAX_QUEUED
+)
+
 
 # Pydantic models
 class CalculateRequest(BaseModel):
@@ -51,6 +102,8 @@ class CalculateRequest(BaseModel):
     source_currency: Optional[str] = Field(None, description="Source currency for FX conversion")
     convert_before_breakdown: bool = Field(True, description="Convert before or after breakdown")
     save_to_history: bool = Field(True, description="Save to history")
+    time_budget_ms: Optional[int] = Field(None, ge=1, le=60000, description="Search time budget for exact/constrained modes")
+    node_budget: Optional[int] = Field(None, ge=1, description="Search node budget for exact/constrained modes")
     
     class Config:
         json_schema_extra = {
@@ -66,6 +119,7 @@ class CalculateRequest(BaseModel):
 class CalculateResponse(BaseModel):
     """Response model for calculation."""
     id: Optional[int] = None
+    provisional_id: Optional[str] = None  # Set instead of id when the row is queued (a receipt; never resolvable to id)
     amount: str
     currency: str
     breakdowns: List[Dict[str, Any]]
@@ -77,17 +131,27 @@ class CalculateResponse(BaseModel):
     exchange_rate: Optional[str] = None
     explanation: Optional[str] = None
     created_at: Optional[datetime] = None
+    proven_optimal: Optional[bool] = None
+    optimality_gap: Optional[int] = None
+    fallback: Optional[str] = None
 
 
 @router.post("/calculate", response_model=CalculateResponse)
 async def calculate(
     request: CalculateRequest,
+    http_request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Calculate denomination breakdown for given amount.
     
     This is the core endpoint used by the desktop app.
+    
+    time_budget_ms and node_budget make EXACT and CONSTRAINED searches
+    anytime: when the budget runs out the best breakdown found so far is
+    returned with proven_optimal false, or the greedy breakdown with
+    fallback 'greedy'. Without them the search is unbudgeted (and its
+    result cacheable) unless the server sets ENGINE_TIME_BUDGET_MS.
     """
     try:
         # Convert to Decimal for precision
@@ -107,41 +171,55 @@ async def calculate(
             amount_to_use = amount_decimal
             exchange_rate = None
         
+        time_budget_ms = request.time_budget_ms
+        if time_budget_ms is None:
+            time_budget_ms = settings.ENGINE_TIME_BUDGET_MS
+        
         # Create calculation request
         core_request = CoreRequest(
             amount=amount_to_use,
             currency=request.currency,
             optimization_mode=OptimizationMode(request.optimization_mode),
-            source_currency=request.source_currency
+            source_currency=request.source_currency,
+            time_budget_ms=time_budget_ms,
+            node_budget=request.node_budget
         )
         
         # Calculate
-        result = denomination_engine.calculate(core_request)
+        result = await cancel_on_disconnect(http_request, async_engine.calculate(core_request))
         
         # Save to history if requested
         calculation_id = None
+        provisional_id = None
         if request.save_to_history:
-            db_calc = Calculation(
-                amount=str(result.original_amount),
-                currency=result.currency,
-                source_currency=request.source_currency,
-                exchange_rate=str(exchange_rate) if exchange_rate else None,
-                optimization_mode=request.optimization_mode,
-                result=json.dumps(result.to_dict()),
-                total_notes=str(result.total_notes),
-                total_coins=str(result.total_coins),
-                total_denominations=str(result.total_denominations),
-                source="desktop",
-                synced=False
-            )
-            db.add(db_calc)
-            db.commit()
-            db.refresh(db_calc)
-            calculation_id = db_calc.id
+            history_row = {
+                'amount': str(result.original_amount),
+                'currency': result.currency,
+                'source_currency': request.source_currency,
+                'exchange_rate': str(exchange_rate) if exchange_rate else None,
+                'optimization_mode': request.optimization_mode,
+                'result': json.dumps(result.to_dict()),
+                'total_notes': str(result.total_notes),
+                'total_coins': str(result.total_coins),
+                'total_denominations': str(result.total_denominations),
+                'source': "desktop",
+                'synced': False
+            }
+            if history_writer.running:
+                # Write-behind: respond now, the row is flushed in a batch
+                provisional_id = history_writer.enqueue(history_row)
+            if provisional_id is None:
+                # Write-behind off, or its queue is full
+                db_calc = Calculation(**history_row)
+                db.add(db_calc)
+                db.commit()
+                db.refresh(db_calc)
+                calculation_id = db_calc.id
         
         # Format response
         return CalculateResponse(
             id=calculation_id,
+            provisional_id=provisional_id,
             amount=str(result.original_amount),
             currency=result.currency,
             breakdowns=[
@@ -159,9 +237,14 @@ async def calculate(
             optimization_mode=request.optimization_mode,
             source_currency=request.source_currency,
             exchange_rate=str(exchange_rate) if exchange_rate else None,
-            created_at=datetime.now(timezone.utc)
+            created_at=datetime.now(timezone.utc),
+            proven_optimal=result.metadata.get('proven_optimal'),
+            optimality_gap=result.metadata.get('optimality_gap'),
+            fallback=result.metadata.get('fallback')
         )
         
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -201,12 +284,35 @@ async def get_currency_info(currency_code: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/engine/stats")
+async def get_engine_stats():
+    """Get denomination engine runtime statistics (result cache, executor and history queues)."""
+    return {
+        "config_hash": denomination_engine.config_hash,
+        "cache": denomination_engine.cache_stats(),
+        "executor": async_engine.metrics(),
+        "history_queue": history_writer.metrics(),
+        "lookup_tables": denomination_engine.lookup_table_info()
+    }
+
+
 @router.post("/alternatives")
-async def get_alternatives(request: CalculateRequest):
+async def get_alternatives(
+    request: CalculateRequest,
+    http_request: Request,
+    count: int = Query(3, ge=1, le=20, description="Number of alternatives"),
+    strategy: str = Query("suggest", description="suggest, pareto or k_best"),
+    objective: str = Query("pieces", description="k_best objective: pieces, notes, coins or largest"),
+    time_budget_ms: int = Query(200, ge=1, le=5000, description="Search time budget")
+):
     """
     Generate alternative denomination distributions.
     
-    Provides 2-3 alternative ways to break down the same amount.
+    Alternatives are distinct breakdowns of the same amount:
+    - suggest: Pareto-optimal breakdowns that differ from the original
+    - pareto: the Pareto frontier over pieces, notes, coins and use of the
+      largest denomination
+    - k_best: the best breakdowns for one objective
     """
     try:
         amount_decimal = Decimal(str(request.amount))
@@ -214,14 +320,33 @@ async def get_alternatives(request: CalculateRequest):
         core_request = CoreRequest(
             amount=amount_decimal,
             currency=request.currency,
-            optimization_mode=OptimizationMode(request.optimization_mode)
+            optimization_mode=OptimizationMode(request.optimization_mode),
+            time_budget_ms=time_budget_ms,
+            node_budget=request.node_budget
         )
         
-        alternatives = optimization_engine.suggest_alternatives(core_request, count=3)
+        if strategy == "suggest":
+            work = async_engine.suggest_alternatives(
+                core_request, count=count, time_budget_ms=time_budget_ms
+            )
+        elif strategy == "pareto":
+            work = async_engine.pareto_alternatives(
+                core_request, max_points=count, time_budget_ms=time_budget_ms
+            )
+        elif strategy == "k_best":
+            work = async_engine.k_best_alternatives(
+                core_request, k=count, objective=objective, time_budget_ms=time_budget_ms
+            )
+        else:
+            raise ValueError(f"Unknown strategy '{strategy}'")
+        
+        # Searches run on the engine pool and stop if the client goes away
+        alternatives = await cancel_on_disconnect(http_request, work)
         
         return {
             "original_amount": str(amount_decimal),
             "currency": request.currency,
+            "strategy": strategy,
             "alternatives": [
                 {
                     "breakdowns": [
@@ -233,15 +358,22 @@ async def get_alternatives(request: CalculateRequest):
                         }
                         for b in alt.breakdowns
                     ],
+                    "total_notes": alt.total_notes,
+                    "total_coins": alt.total_coins,
                     "total_denominations": alt.total_denominations,
                     "optimization_mode": alt.optimization_mode.value,
-                    "explanation": alt.metadata.get('explanation', '')
+                    "explanation": alt.metadata.get('explanation', ''),
+                    "proven_optimal": alt.metadata.get('proven_optimal')
                 }
                 for alt in alternatives
             ],
             "count": len(alternatives)
         }
         
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -289,12 +421,17 @@ class BulkUploadResponse(BaseModel):
     results: List[BulkCalculationRow]
     processing_time_seconds: float
     saved_to_history: bool
+    unique_rows: int  # Distinct (amount, currency, mode) rows actually calculated
+    unique_ratio: float  # unique_rows / total_rows
 
 
 @router.post("/bulk-upload", response_model=BulkUploadResponse)
 async def bulk_upload_file(
     file: UploadFile = File(..., description="Upload: CSV, PDF, Word (.docx), or Image (JPG/PNG/etc.)"),
     save_to_history: bool = True,
+    stream: bool = Query(False, description="Stream results as NDJSON lines, then a summary line"),
+    background: bool = Query(False, description="Process as a background job and return its id immediately"),
+    response_format: str = Query("rows", pattern="^(rows|columnar|summary)$", description="rows, columnar or summary"),
     db: Session = Depends(get_db)
 ):
     """
@@ -317,6 +454,25 @@ async def bulk_upload_file(
     - Parses amounts, currencies, modes
     - Supports: CSV-like, pipe-separated, tabular, natural language
     
+    Streaming (stream=true):
+    - CSV is read incrementally and computed BULK_BATCH_SIZE rows at a time
+    - Response is application/x-ndjson: one BulkCalculationRow per line,
+      then {"summary": {...}} with the BulkUploadResponse totals
+    - Memory stays flat however large the file is
+    
+    Response formats (response_format, regular responses only):
+    - rows: one BulkCalculationRow per row (default)
+    - columnar: totals, a denomination header, one list per field, a dense
+      count matrix aligned to the header and a sparse error list
+    - summary: totals plus per-currency and per-denomination aggregates only
+    
+    Background jobs (background=true):
+    - Responds 202 with a job id as soon as the file is stored
+    - Any backend process on the same database may process it, and a job
+      interrupted by a crash or restart resumes from its last finished chunk
+    - Poll /bulk-jobs/{job_id} for progress, page through
+      /bulk-jobs/{job_id}/results, stop with /bulk-jobs/{job_id}/cancel
+    
     **CRITICAL**: Every upload performs FRESH calculations - no cached results.
     """
     import time
@@ -341,14 +497,31 @@ async def bulk_upload_file(
             detail=f"Unsupported file: {file_ext}. Supported: CSV, PDF, Word, Images"
         )
     
+    if response_format != "rows" and (stream or background):
+        raise HTTPException(
+            status_code=400,
+            detail="response_format applies only to regular (non-stream, non-background) uploads"
+        )
+    
     try:
+        # Route to appropriate processor
+        if file_ext in csv_ext and stream:
+            # Read the spooled upload incrementally, never as one string
+            logger.info("Processing as CSV (streaming)")
+            rows_iter = iter_csv_rows(io.TextIOWrapper(file.file, encoding='utf-8', newline=''))
+            return StreamingResponse(
+                stream_bulk_results(rows_iter, save_to_history, start_time),
+                media_type="application/x-ndjson"
+            )
+        
         # Read file data
         file_data = await file.read()
         logger.info(f"File size: {len(file_data)} bytes, Type: {file_ext}")
         
-        # Route to appropriate processor
         if file_ext in csv_ext:
             logger.info("Processing as CSV (direct parsing)")
+            if background:
+                return await submit_bulk_job(file_data, file.filename, save_to_history)
             rows_data = parse_csv_file(file_data, file.filename)
         else:
             logger.info(f"Processing with OCR (type: {file_ext})")
@@ -374,9 +547,18 @@ async def bulk_upload_file(
                     detail=f"OCR dependencies missing: {', '.join(missing)}. Run: install_ocr_simple.ps1"
                 )
             
-            # Process file with OCR
-            rows_data = ocr_processor.process_file(file_data, file.filename)
+            if background:
+                return await submit_bulk_job(file_data, file.filename, save_to_history)
+            
+            # Process file with OCR (blocking, so on a worker thread)
+            rows_data = await async_engine.run(ocr_processor.process_file, file_data, file.filename)
             logger.info(f"Extracted {len(rows_data)} rows from {file_ext}")
+            
+            if stream:
+                return StreamingResponse(
+                    stream_bulk_results(iter(rows_data), save_to_history, start_time),
+                    media_type="application/x-ndjson"
+                )
         
         if not rows_data:
             raise HTTPException(
@@ -387,152 +569,13 @@ async def bulk_upload_file(
         logger.info(f"Total rows to process: {len(rows_data)}")
         logger.debug(f"First row sample: {rows_data[0]}")
         
-        # Process each row - FRESH CALCULATIONS ONLY
-        results = []
-        successful_count = 0
-        failed_count = 0
-        
-        for idx, row_data in enumerate(rows_data, start=1):
-            row_num = row_data.get('row_number', idx)
-            
-            logger.debug(f"[ROW {row_num}] Input: {row_data}")
-            
-            try:
-                # Extract and validate fields
-                amount_str = row_data.get('amount', '').strip()
-                currency_raw = row_data.get('currency', '').strip()
-                optimization_raw = row_data.get('optimization_mode', '').strip()
-                
-                if not amount_str:
-                    raise ValueError("Amount is required")
-                if not currency_raw:
-                    raise ValueError("Currency is required")
-                
-                # Validate and normalize currency
-                currency = currency_raw.upper()
-                if len(currency) != 3:
-                    raise ValueError(f"Invalid currency code: {currency_raw} (must be 3 letters)")
-                
-                # Validate and normalize optimization mode
-                valid_modes = ['greedy', 'balanced', 'minimize_large', 'minimize_small']
-                optimization_mode = optimization_raw.lower() if optimization_raw else 'greedy'
-                if optimization_mode not in valid_modes:
-                    logger.warning(f"[ROW {row_num}] Invalid mode '{optimization_raw}', using 'greedy'")
-                    optimization_mode = 'greedy'
-                
-                # Parse amount (handle scientific notation)
-                try:
-                    clean_amount = amount_str.replace(' ', '').replace(',', '')
-                    
-                    if 'E' in clean_amount.upper() or 'e' in clean_amount:
-                        # Scientific notation: convert via float
-                        amount_float = float(clean_amount)
-                        amount_decimal = Decimal(str(amount_float))
-                        logger.debug(f"[ROW {row_num}] Scientific notation: {amount_str} → {amount_decimal}")
-                    else:
-                        amount_decimal = Decimal(clean_amount)
-                    
-                    if amount_decimal <= 0:
-                        raise ValueError("Amount must be positive")
-                        
-                except (ValueError, InvalidOperation):
-                    raise ValueError(f"Invalid amount: {amount_str}")
-                
-                # **PERFORM FRESH CALCULATION** - No cached data
-                core_request = CoreRequest(
-                    amount=amount_decimal,
-                    currency=currency,
-                    optimization_mode=OptimizationMode(optimization_mode)
-                )
-                
-                logger.debug(f"[ROW {row_num}] Calculating: {amount_decimal} {currency} ({optimization_mode})")
-                
-                # Calculate denomination breakdown
-                calculation_result = denomination_engine.calculate(core_request)
-                
-                logger.debug(f"[ROW {row_num}] ✓ SUCCESS: {calculation_result.total_denominations} denominations")
-                
-                # Optionally save to history
-                calculation_id = None
-                if save_to_history:
-                    db_calc = Calculation(
-                        amount=str(calculation_result.original_amount),
-                        currency=calculation_result.currency,
-                        source_currency=None,
-                        exchange_rate=None,
-                        optimization_mode=optimization_mode,
-                        result=json.dumps(calculation_result.to_dict()),
-                        total_notes=str(calculation_result.total_notes),
-                        total_coins=str(calculation_result.total_coins),
-                        total_denominations=str(calculation_result.total_denominations),
-                        source="bulk_upload",
-                        synced=False
-                    )
-                    db.add(db_calc)
-                    db.commit()
-                    db.refresh(db_calc)
-                    calculation_id = db_calc.id
-                
-                # Build success response
-                results.append(BulkCalculationRow(
-                    row_number=row_num,
-                    status="success",
-                    amount=str(calculation_result.original_amount),
-                    currency=calculation_result.currency,
-                    optimization_mode=optimization_mode,
-                    total_notes=calculation_result.total_notes,
-                    total_coins=calculation_result.total_coins,
-                    total_denominations=calculation_result.total_denominations,
-                    breakdowns=[
-                        {
-                            "denomination": str(b.denomination),
-                            "count": b.count,
-                            "total_value": str(b.total_value),
-                            "is_note": b.is_note
-                        }
-                        for b in calculation_result.breakdowns
-                    ],
-                    calculation_id=calculation_id
-                ))
-                successful_count += 1
-                
-            except ValueError as e:
-                logger.warning(f"[ROW {row_num}] ✗ Validation error: {str(e)}")
-                results.append(BulkCalculationRow(
-                    row_number=row_num,
-                    status="error",
-                    amount=row_data.get('amount', ''),
-                    currency=row_data.get('currency', ''),
-                    optimization_mode=row_data.get('optimization_mode', ''),
-                    error=str(e)
-                ))
-                failed_count += 1
-                
-            except Exception as e:
-                logger.error(f"[ROW {row_num}] ✗ Unexpected error: {str(e)}", exc_info=True)
-                results.append(BulkCalculationRow(
-                    row_number=row_num,
-                    status="error",
-                    amount=row_data.get('amount', ''),
-                    currency=row_data.get('currency', ''),
-                    optimization_mode=row_data.get('optimization_mode', ''),
-                    error=f"Processing error: {str(e)}"
-                ))
-                failed_count += 1
-        
-        processing_time = time.time() - start_time
-        
-        logger.info(f"========== BULK UPLOAD COMPLETE ==========")
-        logger.info(f"Total: {len(results)}, Success: {successful_count}, Failed: {failed_count}, Time: {processing_time:.3f}s")
+        if len(rows_data) > settings.MAX_BULK_ROWS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many rows: {len(rows_data)} (maximum {settings.MAX_BULK_ROWS})"
+            )
         
-        return BulkUploadResponse(
-            total_rows=len(results),
-            successful=successful_count,
-            failed=failed_count,
-            results=results,
-            processing_time_seconds=round(processing_time, 3),
-            saved_to_history=save_to_history
-        )
+        return await bulk_response(rows_data, save_to_history, response_format, start_time, db)
         
     except HTTPException:
         raise
@@ -549,10 +592,434 @@ async def bulk_upload_file(
         )
 
 
-def parse_csv_file(csv_data: bytes, filename: str) -> List[Dict[str, Any]]:
-    """Parse CSV file into structured rows with case-insensitive headers."""
-    csv_text = csv_data.decode('utf-8')
-    csv_reader = csv.DictReader(io.StringIO(csv_text))
+async def bulk_response(
+    rows_data: List[Dict[str, Any]],
+    save_to_history: bool,
+    response_format: str,
+    start_time: float,
+    db: Session,
+    source: str = "bulk_upload",
+    single_transaction: bool = False
+):
+    """
+    Compute bulk rows and build the regular (non-stream) response.
+    
+    History rows are inserted in BULK_BATCH_SIZE transactions, or all in
+    one transaction with single_transaction (nothing is saved if any
+    insert fails).
+    """
+    import time
+    
+    # Compute every row - FRESH CALCULATIONS ONLY - in parallel chunks
+    computed, dedup = await bulk_processor.process(rows_data, include_result=save_to_history)
+    
+    successful_count = sum(1 for row in computed if row['status'] == 'success')
+    failed_count = len(computed) - successful_count
+    
+    # Optionally save to history
+    if save_to_history and successful_count:
+        try:
+            ids = iter(insert_calculations(
+                db,
+                bulk_history_rows(computed, source),
+                settings.BULK_BATCH_SIZE,
+                commit=not single_transaction
+            ))
+            if single_transaction:
+                db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        for row in computed:
+            if row['status'] == 'success':
+                row['calculation_id'] = next(ids)
+    for row in computed:
+        row.pop('result_json', None)
+    
+    processing_time = time.time() - start_time
+    
+    logger.info(f"========== BULK COMPLETE ({source}) ==========")
+    logger.info(f"Total: {len(computed)}, Success: {successful_count}, Failed: {failed_count}, Unique: {dedup['unique_rows']}, Time: {processing_time:.3f}s")
+    
+    totals = {
+        "total_rows": len(computed),
+        "successful": successful_count,
+        "failed": failed_count,
+        "processing_time_seconds": round(processing_time, 3),
+        "saved_to_history": save_to_history,
+        "unique_rows": dedup['unique_rows'],
+        "unique_ratio": dedup['unique_ratio']
+    }
+    
+    # Compact formats skip per-row model validation entirely
+    if response_format == "columnar":
+        return JSONResponse(content={**totals, **columnar_results(computed)})
+    if response_format == "summary":
+        return JSONResponse(content={**totals, **summarize_results(computed)})
+    
+    return BulkUploadResponse(
+        results=[BulkCalculationRow(**row) for row in computed],
+        **totals
+    )
+
+
+async def load_upload_rows(file_data: bytes, filename: str) -> List[Dict[str, Any]]:
+    """Parse an uploaded file into rows (CSV directly, anything else with OCR)."""
+    if Path(filename).suffix.lower() == '.csv':
+        return await asyncio.to_thread(parse_csv_file, file_data, filename)
+    return await async_engine.run(get_ocr_processor().process_file, file_data, filename)
+
+
+async def submit_bulk_job(file_data: bytes, filename: str, save_to_history: bool) -> JSONResponse:
+    """Queue a background bulk job; 202 response with its id and URLs."""
+    job_id = await bulk_jobs.submit(file_data, filename, save_to_history)
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"/api/v1/bulk-jobs/{job_id}",
+            "results_url": f"/api/v1/bulk-jobs/{job_id}/results"
+        }
+    )
+
+
+class BulkJobStatus(BaseModel):
+    """Background bulk job status and progress."""
+    job_id: str
+    filename: str
+    status: str  # queued/running/completed/failed/cancelled
+    save_to_history: bool
+    total_rows: Optional[int] = None
+    processed_rows: int
+    successful: int
+    failed: int
+    unique_rows: int
+    rows_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    cancel_requested: bool
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class BulkJobResultsPage(BaseModel):
+    """One page of a bulk job's result rows, in file order."""
+    job_id: str
+    items: List[BulkCalculationRow]
+    total: int
+    page: int
+    page_size: int
+    has_more: bool
+
+
+def _get_job(db: Session, job_id: str) -> BulkJob:
+    """Look up a job or raise 404."""
+    job = db.query(BulkJob).filter(BulkJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Bulk job {job_id} not found")
+    return job
+
+
+@router.get("/bulk-jobs", response_model=List[BulkJobStatus])
+async def list_bulk_jobs(
+    limit: int = Query(20, ge=1, le=200, description="Most recent jobs to return"),
+    db: Session = Depends(get_db)
+):
+    """List recent background bulk jobs, newest first."""
+    jobs = db.query(BulkJob).order_by(BulkJob.created_at.desc()).limit(limit).all()
+    return [BulkJobStatus(**job_progress(job)) for job in jobs]
+
+
+@router.get("/bulk-jobs/{job_id}", response_model=BulkJobStatus)
+async def get_bulk_job(job_id: str, db: Session = Depends(get_db)):
+    """Get a bulk job's status, progress, throughput and ETA."""
+    return BulkJobStatus(**job_progress(_get_job(db, job_id)))
+
+
+@router.post("/bulk-jobs/{job_id}/cancel", response_model=BulkJobStatus)
+async def cancel_bulk_job(job_id: str, db: Session = Depends(get_db)):
+    """
+    Cancel a bulk job.
+    
+    The job stops at its next chunk boundary; rows already processed keep
+    their results (and history entries).
+    """
+    job = _get_job(db, job_id)
+    if not await bulk_jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Bulk job {job_id} is already {job.status}")
+    db.refresh(job)
+    return BulkJobStatus(**job_progress(job))
+
+
+@router.get("/bulk-jobs/{job_id}/results", response_model=BulkJobResultsPage)
+async def get_bulk_job_results(
+    job_id: str,
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(100, ge=1, le=1000, description="Rows per page"),
+    status: Optional[str] = Query(None, description="Filter by row status (success/error)"),
+    db: Session = Depends(get_db)
+):
+    """Page through the result rows a bulk job has produced so far."""
+    _get_job(db, job_id)
+    
+    query = db.query(BulkJobResult).filter(BulkJobResult.job_id == job_id)
+    if status:
+        query = query.filter(BulkJobResult.status == status)
+    
+    total = query.count()
+    rows = (
+        query.order_by(BulkJobResult.position)
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+        .all()
+    )
+    
+    return BulkJobResultsPage(
+        job_id=job_id,
+        items=[BulkCalculationRow(**json.loads(row.result)) for row in rows],
+        total=total,
+        page=page,
+        page_size=page_size,
+        has_more=page * page_size < total
+    )
+
+
+# JSON Bulk Calculation Models
+class BulkCalculateItem(BaseModel):
+    """One calculation of a /bulk-calculate array body."""
+    amount: str | float
+    currency: str
+    optimization_mode: str = "greedy"
+
+
+class BulkCalculateColumns(BaseModel):
+    """
+    Columnar /bulk-calculate body: parallel lists, one entry per calculation.
+    
+    currency and optimization_mode apply to every row unless the matching
+    list is given.
+    """
+    amounts: List[str | float]
+    currencies: Optional[List[str]] = None
+    currency: Optional[str] = None
+    optimization_modes: Optional[List[str]] = None
+    optimization_mode: str = "greedy"
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "amounts": ["50000", "1850.50", "999"],
+                "currency": "INR",
+                "optimization_mode": "greedy"
+            }
+        }
+
+
+def bulk_calculate_rows(body: List[BulkCalculateItem] | BulkCalculateColumns) -> List[Dict[str, Any]]:
+    """
+    Turn a /bulk-calculate body into bulk rows (the fields of a CSV row).
+    
+    Raises:
+        HTTPException: 400 if the columnar lists are inconsistent
+    """
+    if isinstance(body, list):
+        return [
+            {
+                'amount': str(item.amount),
+                'currency': item.currency,
+                'optimization_mode': item.optimization_mode
+            }
+            for item in body
+        ]
+    
+    count = len(body.amounts)
+    if (body.currencies is None) == (body.currency is None):
+        raise HTTPException(status_code=400, detail="Give either currencies or currency")
+    for name in ('currencies', 'optimization_modes'):
+        values = getattr(body, name)
+        if values is not None and len(values) != count:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{name} has {len(values)} entries, amounts has {count}"
+            )
+    
+    currencies = body.currencies or itertools.repeat(body.currency)
+    modes = body.optimization_modes or itertools.repeat(body.optimization_mode)
+    return [
+        {'amount': str(amount), 'currency': currency, 'optimization_mode': mode}
+        for amount, currency, mode in zip(body.amounts, currencies, modes)
+    ]
+
+
+@router.post("/bulk-calculate", response_model=BulkUploadResponse)
+async def bulk_calculate(
+    body: List[BulkCalculateItem] | BulkCalculateColumns,
+    save_to_history: bool = True,
+    stream: bool = Query(False, description="Stream results as NDJSON lines, then a summary line"),
+    response_format: str = Query("rows", pattern="^(rows|columnar|summary)$", description="rows, columnar or summary"),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk calculations from a JSON body, without a file upload.
+    
+    Body:
+    - An array of {amount, currency, optimization_mode} objects, or
+    - Columnar: {"amounts": [...], "currency": "INR"} with optional
+      "currencies" / "optimization_modes" lists of the same length
+    
+    Rows are validated like CSV rows (row_number is the 1-based position in
+    the body; a bad row becomes an error row) and computed by the bulk
+    processor, which deduplicates them and batch-solves each chunk with
+    DenominationEngine.calculate_bulk.
+    
+    With save_to_history every successful row is saved in one transaction:
+    either all rows are saved or none are. This applies only to regular
+    responses; a streamed request commits each chunk as it is sent, as
+    /bulk-upload does, so it never holds the database write lock while
+    the client reads.
+    
+    Streaming (stream=true) and response_format behave as in /bulk-upload.
+    """
+    import time
+    start_time = time.time()
+    
+    if response_format != "rows" and stream:
+        raise HTTPException(
+            status_code=400,
+            detail="response_format applies only to regular (non-stream) requests"
+        )
+    
+    rows_data = bulk_calculate_rows(body)
+    if not rows_data:
+        raise HTTPException(status_code=400, detail="No calculations given")
+    if len(rows_data) > settings.MAX_BULK_ROWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many rows: {len(rows_data)} (maximum {settings.MAX_BULK_ROWS})"
+        )
+    
+    logger.info(f"========== BULK CALCULATE START ({len(rows_data)} rows) ==========")
+    
+    if stream:
+        return StreamingResponse(
+            stream_bulk_results(
+                iter(rows_data), save_to_history, start_time, source="bulk_calculate"
+            ),
+            media_type="application/x-ndjson"
+        )
+    
+    try:
+        return await bulk_response(
+            rows_data, save_to_history, response_format, start_time, db,
+            source="bulk_calculate", single_transaction=True
+        )
+    except Exception as e:
+        logger.error(f"BULK CALCULATE FAILED: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Bulk calculation failed: {str(e)}"
+        )
+
+
+async def stream_bulk_results(
+    rows_iter: Iterator[Dict[str, Any]],
+    save_to_history: bool,
+    start_time: float,
+    source: str = "bulk_upload"
+) -> AsyncIterator[str]:
+    """
+    Compute bulk rows chunk by chunk, yielding NDJSON lines.
+    
+    Only one BULK_BATCH_SIZE chunk of rows is held at a time. Each chunk is
+    deduplicated and computed by the bulk processor and, with history on,
+    inserted in its own transaction. The last line is the summary; if
+    reading fails part-way an {"error": ...} line precedes it.
+    """
+    import time
+    
+    total = successful_count = unique_count = 0
+    error = None
+    db = SessionLocal() if save_to_history else None
+    
+    try:
+        while True:
+            try:
+                # Reading and CSV parsing block, so they run off the loop
+                chunk = await asyncio.to_thread(
+                    lambda: list(itertools.islice(rows_iter, settings.BULK_BATCH_SIZE))
+                )
+            except UnicodeDecodeError:
+                error = "File encoding error. Ensure CSV is UTF-8 encoded"
+                break
+            except ValueError as e:
+                error = str(e)
+                break
+            
+            if not chunk:
+                break
+            if total + len(chunk) > settings.MAX_BULK_ROWS:
+                error = f"Too many rows: more than {settings.MAX_BULK_ROWS}"
+                break
+            
+            computed, dedup = await bulk_processor.process(chunk, include_result=save_to_history)
+            
+            ids = iter(())
+            if save_to_history:
+                history_rows = bulk_history_rows(computed, source)
+                if history_rows:
+                    ids = iter(await asyncio.to_thread(
+                        insert_calculations, db, history_rows, settings.BULK_BATCH_SIZE
+                    ))
+            
+            lines = []
+            for row in computed:
+                row.pop('result_json', None)
+                if row['status'] == 'success':
+                    successful_count += 1
+                    if save_to_history:
+                        row['calculation_id'] = next(ids)
+                lines.append(BulkCalculationRow(**row).model_dump_json())
+            
+            total += len(computed)
+            unique_count += dedup['unique_rows']
+            yield "\n".join(lines) + "\n"
+    finally:
+        if db is not None:
+            db.close()
+    
+    if error:
+        logger.warning(f"BULK STREAM STOPPED: {error}")
+        yield json.dumps({"error": error}) + "\n"
+    
+    processing_time = time.time() - start_time
+    logger.info(f"========== BULK STREAM COMPLETE ==========")
+    logger.info(f"Total: {total}, Success: {successful_count}, Failed: {total - successful_count}, Time: {processing_time:.3f}s")
+    
+    # Same totals as BulkUploadResponse; unique rows are counted per chunk
+    yield json.dumps({"summary": {
+        "total_rows": total,
+        "successful": successful_count,
+        "failed": total - successful_count,
+        "processing_time_seconds": round(processing_time, 3),
+        "saved_to_history": save_to_history,
+        "unique_rows": unique_count,
+        "unique_ratio": round(unique_count / total, 4) if total else 0.0
+    }}) + "\n"
+
+
+def iter_csv_rows(text: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Parse CSV rows lazily with case-insensitive headers.
+    
+    The header is read and checked immediately; data rows are read as the
+    returned iterator is consumed.
+    
+    Raises:
+        ValueError: If the header is missing or lacks a required column
+    """
+    csv_reader = csv.DictReader(text)
     
     if not csv_reader.fieldnames:
         raise ValueError("CSV has no headers")
@@ -566,20 +1033,26 @@ def parse_csv_file(csv_data: bytes, filename: str) -> List[Dict[str, Any]]:
     if missing:
         raise ValueError(f"Missing columns: {', '.join(missing)}")
     
-    rows_data = []
-    for row_num, row in enumerate(csv_reader, start=2):
-        amount_col = header_map.get('amount', 'amount')
-        currency_col = header_map.get('currency', 'currency')
-        opt_col = header_map.get('optimization_mode', 'optimization_mode')
-        
-        rows_data.append({
-            'row_number': row_num,
-            'amount': row.get(amount_col, '').strip(),
-            'currency': row.get(currency_col, '').strip(),
-            'optimization_mode': row.get(opt_col, '').strip()
-        })
+    amount_col = header_map.get('amount', 'amount')
+    currency_col = header_map.get('currency', 'currency')
+    opt_col = header_map.get('optimization_mode', 'optimization_mode')
+    
+    def rows() -> Iterator[Dict[str, Any]]:
+        for row_num, row in enumerate(csv_reader, start=2):
+            yield {
+                'row_number': row_num,
+                'amount': (row.get(amount_col) or '').strip(),
+                'currency': (row.get(currency_col) or '').strip(),
+                'optimization_mode': (row.get(opt_col) or '').strip()
+            }
     
-    return rows_data
+    return rows()
+
+
+def parse_csv_file(csv_data: bytes, filename: str) -> List[Dict[str, Any]]:
+    """Parse CSV file into structured rows with case-insensitive headers."""
+    csv_text = csv_data.decode('utf-8')
+    return list(iter_csv_rows(io.StringIO(csv_text)))
 
 
 # Smart Currency Recommendation Models
@@ -30,10 +30,26 @@ class Settings(BaseSettings):
     # History
     MAX_HISTORY_ITEMS: int = 10000
     QUICK_ACCESS_COUNT: int = 10
+    HISTORY_WRITE_BEHIND: bool = False         # Queue /calculate history rows, flush in batches
+    HISTORY_FLUSH_ROWS: int = 500              # Queue length that triggers a flush
+    HISTORY_FLUSH_INTERVAL_MS: int = 250       # Longest time a queued row waits
+    HISTORY_MAX_QUEUED: int = 10000            # Queue cap; past it /calculate inserts synchronously
     
     # Bulk processing
     MAX_BULK_ROWS: int = 100000
     BULK_BATCH_SIZE: int = 1000
+    BULK_MAX_WORKERS: Optional[int] = None     # Bulk process pool size (None = CPU count)
+    BULK_JOB_WORKERS: int = 2                  # Job queue workers per process (0 = none)
+    BULK_JOB_LEASE_SECONDS: int = 30           # Claim lifetime without a heartbeat
+    BULK_JOB_POLL_MS: int = 500                # Idle wait between queue polls
+    BULK_JOB_MAX_ATTEMPTS: int = 3             # Claims of one file/chunk before the job fails
+    
+    # Engine
+    ENGINE_CACHE_SIZE: int = 0                 # LRU result cache entries (0 = off)
+    ENGINE_LOOKUP_DIR: Optional[Path] = None   # Prebuilt lookup tables (lookup_table.py)
+    ENGINE_TIME_BUDGET_MS: Optional[int] = None  # Budget when a request sets none (None = unbudgeted)
+    ENGINE_EXECUTOR: str = "thread"            # Pool for heavy engine calls: thread or process
+    ENGINE_MAX_WORKERS: Optional[int] = None   # Pool size (None = CPU count)
     
     class Config:
         env_file = ".env"
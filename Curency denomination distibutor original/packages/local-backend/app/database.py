@@ -2,10 +2,11 @@
 Database models and initialization.
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, DECIMAL
+from sqlalchemy import create_engine, insert, Column, ForeignKey, Index, Integer, String, Text, DateTime, Boolean, DECIMAL, Float, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from datetime import datetime, timezone
+from typing import Any, Dict, List
 from app.config import settings
 
 # Create engine
@@ -78,11 +79,109 @@ class ExportRecord(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
 
+class BulkJob(Base):
+    """Background bulk-upload job."""
+    __tablename__ = "bulk_jobs"
+    
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    filename = Column(String, nullable=False)
+    status = Column(String(20), default="queued")  # queued/running/completed/failed/cancelled
+    save_to_history = Column(Boolean, default=True)
+    cancel_requested = Column(Boolean, default=False)
+    error = Column(Text, nullable=True)
+    
+    # Uploaded file, kept until a worker has parsed it into chunks
+    payload = Column(LargeBinary, nullable=True)
+    
+    # Lease of the worker parsing the upload (epoch seconds)
+    lease_owner = Column(String, nullable=True)
+    lease_expires = Column(Float, nullable=True)
+    attempts = Column(Integer, default=0)
+    
+    # Progress
+    total_rows = Column(Integer, nullable=True)  # Known once the file is parsed
+    processed_rows = Column(Integer, default=0)
+    successful = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    unique_rows = Column(Integer, default=0)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class BulkJobChunk(Base):
+    """BULK_BATCH_SIZE input rows of a bulk job, claimed by workers under a lease."""
+    __tablename__ = "bulk_job_chunks"
+    __table_args__ = (
+        Index("ix_bulk_job_chunks_job_status", "job_id", "status"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    job_id = Column(String(32), ForeignKey("bulk_jobs.id"), nullable=False)
+    position = Column(Integer, nullable=False)  # 0-based index of the first row
+    rows = Column(Text, nullable=True)  # JSON input rows, cleared once done or cancelled
+    status = Column(String(10), default="pending")  # pending/done
+    
+    # Lease of the worker computing the chunk (epoch seconds)
+    lease_owner = Column(String, nullable=True)
+    lease_expires = Column(Float, nullable=True)
+    attempts = Column(Integer, default=0)
+
+
+class BulkJobResult(Base):
+    """One result row of a bulk job."""
+    __tablename__ = "bulk_job_results"
+    __table_args__ = (
+        Index("ix_bulk_job_results_job_position", "job_id", "position"),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    job_id = Column(String(32), ForeignKey("bulk_jobs.id"), nullable=False)
+    position = Column(Integer, nullable=False)  # 0-based order in the file
+    row_number = Column(Integer, nullable=False)
+    status = Column(String(10), nullable=False)  # success/error
+    result = Column(Text, nullable=False)  # JSON BulkCalculationRow
+    calculation_id = Column(Integer, nullable=True)
+
+
 async def init_db():
     """Initialize database - create tables."""
     Base.metadata.create_all(bind=engine)
 
 
+def insert_calculations(
+    db: Session,
+    rows: List[Dict[str, Any]],
+    batch_size: int = 1000,
+    commit: bool = True
+) -> List[int]:
+    """
+    Bulk insert calculation history rows.
+    
+    Each chunk of batch_size rows is one multi-row INSERT ... RETURNING in
+    its own transaction, so a large upload neither commits per row nor
+    reads rows back to learn their ids.
+    
+    Args:
+        db: Database session
+        rows: Column values for each Calculation
+        batch_size: Rows per transaction
+        commit: Commit each chunk (False leaves the caller's transaction open)
+    
+    Returns:
+        Generated ids, in the order of rows
+    """
+    statement = insert(Calculation).returning(Calculation.id, sort_by_parameter_order=True)
+    ids: List[int] = []
+    for start in range(0, len(rows), batch_size):
+        ids.extend(db.scalars(statement, rows[start:start + batch_size]).all())
+        if commit:
+            db.commit()
+    return ids
+
+
 def get_db():
     """Get database session."""
     db = SessionLocal()
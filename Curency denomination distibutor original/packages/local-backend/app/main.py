@@ -37,11 +37,22 @@ async def lifespan(app: FastAPI):
     print(f"📁 Database: {app_settings.LOCAL_DB_PATH}")
     await init_db()
     print("✓ Database initialized")
+    await calculations.bulk_jobs.start()
+    print("✓ Bulk job workers started")
+    if app_settings.HISTORY_WRITE_BEHIND:
+        await calculations.history_writer.start()
+        print("✓ History write-behind enabled")
     
     yield
     
     # Shutdown
     print("👋 Shutting down Local Backend API...")
+    # Stop bulk jobs and write queued history before the pools go away
+    await calculations.bulk_jobs.shutdown()
+    await calculations.history_writer.stop()
+    calculations.async_engine.shutdown(wait=False)
+    calculations.bulk_processor.shutdown(wait=False)
+    calculations.denomination_engine.close()
 
 
 # Create FastAPI app
@@ -0,0 +1,286 @@
+"""
+Async Engine Facade
+
+Keeps CPU-heavy engine work off the event loop.
+
+The core engine is synchronous. Calling it from an `async def` route blocks
+every other request until it returns, so this facade:
+- Runs trivial greedy-family calculations inline (they take microseconds)
+- Sends exact/constrained solves, large batches, alternative searches and
+  OCR to a thread or process pool
+- Stops waiting (and drops queued work) when the caller is cancelled,
+  e.g. because the HTTP client disconnected
+- Counts in-flight, queued and finished calls for the metrics endpoint
+"""
+
+import asyncio
+import functools
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+# Add core-engine to path (process pool workers import this module fresh)
+core_engine_path = Path(__file__).parent.parent.parent.parent / "core-engine"
+if str(core_engine_path) not in sys.path:
+    sys.path.insert(0, str(core_engine_path))
+
+from engine import DenominationEngine
+from models import CalculationRequest, Constraint, OptimizationMode
+from optimizer import OptimizationEngine
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+# Modes that are a single greedy pass, cheap enough to run on the loop
+INLINE_MODES = {
+    OptimizationMode.GREEDY,
+    OptimizationMode.BALANCED,
+    OptimizationMode.MINIMIZE_LARGE,
+    OptimizationMode.MINIMIZE_SMALL
+}
+
+# Batches up to this many rows run inline
+INLINE_BATCH_ROWS = 1000
+
+
+# Per-process engines for the process pool
+_worker_engine: Optional[DenominationEngine] = None
+_worker_optimizer: Optional[OptimizationEngine] = None
+
+
+def _init_worker(config_path: str, cache_size: int, lookup_dir: Optional[str]) -> None:
+    """Process pool initializer: build this worker's engines once."""
+    global _worker_engine, _worker_optimizer
+    _worker_engine = DenominationEngine(
+        config_path,
+        cache_size=cache_size,
+        lookup_dir=lookup_dir
+    )
+    _worker_optimizer = OptimizationEngine(_worker_engine)
+
+
+def _call_worker(target: str, method: str, *args, **kwargs) -> Any:
+    """Call a method on this worker's engine ('engine') or optimizer."""
+    obj = _worker_engine if target == "engine" else _worker_optimizer
+    return getattr(obj, method)(*args, **kwargs)
+
+
+class AsyncDenominationEngine:
+    """
+    Asyncio facade over DenominationEngine and OptimizationEngine.
+    
+    With executor="thread" calls share the engines of this process (the
+    engines are thread-safe). With executor="process" every worker builds
+    its own engines from the same configuration, which sidesteps the GIL
+    for CPU-bound solves at the cost of pickling requests and results.
+    """
+    
+    def __init__(
+        self,
+        engine: DenominationEngine,
+        optimizer: OptimizationEngine,
+        executor: str = "thread",
+        max_workers: Optional[int] = None
+    ):
+        """
+        Initialize the facade.
+        
+        Args:
+            engine: Engine used for inline calls (and by thread workers)
+            optimizer: Optimizer used by thread workers
+            executor: "thread" or "process"
+            max_workers: Pool size (default: CPU count)
+        
+        Raises:
+            ValueError: If executor is not "thread" or "process"
+        """
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor '{executor}' (expected thread or process)")
+        
+        self.engine = engine
+        self.optimizer = optimizer
+        self.executor_kind = executor
+        self.max_workers = max_workers or os.cpu_count() or 1
+        
+        if executor == "process":
+            cache_size = engine._result_cache.max_size if engine._result_cache else 0
+            self._executor: Executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(
+                    str(engine.config_path),
+                    cache_size,
+                    str(engine.lookup_dir) if engine.lookup_dir else None
+                )
+            )
+            # Arbitrary callables (OCR) stay in this process
+            self._threads: Executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="engine-io"
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="engine"
+            )
+            self._threads = self._executor
+        
+        # Counters are only touched from the event loop thread
+        self.in_flight = 0
+        self.inline = 0
+        self.offloaded = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+    
+    async def calculate(self, request: CalculationRequest):
+        """
+        Calculate a breakdown, offloading exact and constrained solves.
+        
+        Returns:
+            CalculationResult
+        """
+        if request.optimization_mode in INLINE_MODES:
+            self.inline += 1
+            return self.engine.calculate(request)
+        return await self._submit("engine", "calculate", request)
+    
+    async def calculate_batch(
+        self,
+        amounts: Any,
+        currency_code: str,
+        mode: OptimizationMode = OptimizationMode.GREEDY,
+        constraints: Optional[List[Constraint]] = None
+    ):
+        """
+        Batch calculation; batches above INLINE_BATCH_ROWS are offloaded.
+        
+        Returns:
+            BatchCalculationResult
+        """
+        if len(amounts) <= INLINE_BATCH_ROWS and OptimizationMode(mode) in INLINE_MODES:
+            self.inline += 1
+            return self.engine.calculate_batch(amounts, currency_code, mode, constraints)
+        return await self._submit(
+            "engine", "calculate_batch", amounts, currency_code, mode, constraints
+        )
+    
+    async def suggest_alternatives(self, request: CalculationRequest, **kwargs):
+        """OptimizationEngine.suggest_alternatives, offloaded."""
+        return await self._submit("optimizer", "suggest_alternatives", request, **kwargs)
+    
+    async def pareto_alternatives(self, request: CalculationRequest, **kwargs):
+        """OptimizationEngine.pareto_alternatives, offloaded."""
+        return await self._submit("optimizer", "pareto_alternatives", request, **kwargs)
+    
+    async def k_best_alternatives(self, request: CalculationRequest, **kwargs):
+        """OptimizationEngine.k_best_alternatives, offloaded."""
+        return await self._submit("optimizer", "k_best_alternatives", request, **kwargs)
+    
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run any blocking callable (e.g. OCR) on a worker thread.
+        
+        Returns:
+            The callable's return value
+        """
+        call = functools.partial(func, *args, **kwargs)
+        return await self._await(self._threads, call)
+    
+    async def _submit(self, target: str, method: str, *args, **kwargs) -> Any:
+        """Run an engine or optimizer method on the configured pool."""
+        if self.executor_kind == "process":
+            call = functools.partial(_call_worker, target, method, *args, **kwargs)
+        else:
+            obj = self.engine if target == "engine" else self.optimizer
+            call = functools.partial(getattr(obj, method), *args, **kwargs)
+        return await self._await(self._executor, call)
+    
+    async def _await(self, executor: Executor, call: Callable) -> Any:
+        """Submit a call and wait for it, keeping the counters."""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(executor, call)
+        self.in_flight += 1
+        self.offloaded += 1
+        try:
+            result = await future
+        except asyncio.CancelledError:
+            # Queued work is dropped; a call already running finishes in
+            # the background (its result is discarded)
+            future.cancel()
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        
+        self.completed += 1
+        return result
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth and call counters."""
+        return {
+            'executor': self.executor_kind,
+            'max_workers': self.max_workers,
+            'in_flight': self.in_flight,
+            'queue_depth': max(0, self.in_flight - self.max_workers),
+            'inline': self.inline,
+            'offloaded': self.offloaded,
+            'completed': self.completed,
+            'failed': self.failed,
+            'cancelled': self.cancelled
+        }
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the pools, dropping work that has not started."""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        if self._threads is not self._executor:
+            self._threads.shutdown(wait=wait, cancel_futures=True)
+
+
+class ClientDisconnected(Exception):
+    """The HTTP client went away before the result was ready."""
+
+
+async def cancel_on_disconnect(
+    http_request,
+    awaitable: Awaitable,
+    poll_interval: float = 0.1
+) -> Any:
+    """
+    Await a result, cancelling it if the HTTP client goes away.
+    
+    Routes catch ClientDisconnected and end the request with a plain
+    response; nobody is listening, so it is not an error.
+    
+    Args:
+        http_request: Starlette/FastAPI Request of the call
+        awaitable: Work to wait for (e.g. AsyncDenominationEngine.calculate(...))
+        poll_interval: Seconds between disconnect checks
+    
+    Returns:
+        The awaitable's result
+    
+    Raises:
+        ClientDisconnected: If the client disconnected first (the work
+            is cancelled)
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                logger.info("Client disconnected, cancelling engine call")
+                task.cancel()
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
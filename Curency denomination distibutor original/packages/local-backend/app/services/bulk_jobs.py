@@ -0,0 +1,584 @@
+"""
+Background Bulk Jobs
+
+Runs bulk uploads outside the HTTP request, on a durable SQLite queue.
+
+Submitting a job stores the uploaded file in the bulk_jobs table and returns
+its id. Every backend process pointed at the same database runs a few
+worker loops that pull work from that table:
+- A queued job is claimed under a lease, its file parsed (CSV or OCR) and
+  split into BULK_BATCH_SIZE chunks in bulk_job_chunks
+- Chunks are claimed one at a time under a lease that a heartbeat keeps
+  extending while the chunk is computed
+- A finished chunk's results, history rows and progress counters are
+  written in the same transaction that marks it done, so finished chunks
+  are checkpoints and a chunk is never stored twice
+
+When a process dies its leases expire and the work is picked up by any
+other process, or by the same one after a restart. Cancellation is a
+status change on the job row; workers stop at the next chunk boundary.
+"""
+
+import asyncio
+import json
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+from sqlalchemy import exists, func, insert, or_, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.database import BulkJob, BulkJobChunk, BulkJobResult, insert_calculations
+from app.services.bulk_processor import BulkProcessor, bulk_history_rows
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """SQLite returns naive datetimes; they are stored as UTC."""
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def job_progress(job: BulkJob) -> Dict[str, Any]:
+    """
+    Status and progress of a job.
+    
+    Returns:
+        Dict with the job fields plus rows_per_second and eta_seconds
+        (None until there is enough progress to estimate)
+    """
+    started_at = _as_utc(job.started_at)
+    finished_at = _as_utc(job.finished_at)
+    
+    rows_per_second = None
+    eta_seconds = None
+    if started_at and job.processed_rows:
+        elapsed = ((finished_at or datetime.now(timezone.utc)) - started_at).total_seconds()
+        if elapsed > 0:
+            rows_per_second = round(job.processed_rows / elapsed, 1)
+            if job.status == "running" and job.total_rows is not None:
+                eta_seconds = round((job.total_rows - job.processed_rows) / rows_per_second, 1)
+    
+    return {
+        'job_id': job.id,
+        'filename': job.filename,
+        'status': job.status,
+        'save_to_history': job.save_to_history,
+        'total_rows': job.total_rows,
+        'processed_rows': job.processed_rows,
+        'successful': job.successful,
+        'failed': job.failed,
+        'unique_rows': job.unique_rows,
+        'rows_per_second': rows_per_second,
+        'eta_seconds': eta_seconds,
+        'cancel_requested': job.cancel_requested,
+        'error': job.error,
+        'created_at': _as_utc(job.created_at),
+        'started_at': started_at,
+        'finished_at': finished_at
+    }
+
+
+class BulkJobManager:
+    """
+    Submits bulk jobs and runs this process's share of the job queue.
+    
+    Database work runs on worker threads with sessions from session_factory;
+    row computation goes through the BulkProcessor pool.
+    """
+    
+    def __init__(
+        self,
+        processor: BulkProcessor,
+        session_factory: Callable,
+        load_rows: Callable[[bytes, str], Awaitable[List[Dict[str, Any]]]],
+        batch_size: int = 1000,
+        max_rows: int = 100000,
+        workers: int = 2,
+        lease_seconds: float = 30,
+        poll_interval_ms: int = 500,
+        max_attempts: int = 3
+    ):
+        """
+        Initialize the manager.
+        
+        Args:
+            processor: Bulk processor used to compute chunks
+            session_factory: Callable returning a new database session
+            load_rows: Coroutine function (file bytes, filename) -> parsed rows
+            batch_size: Rows per chunk (and per transaction)
+            max_rows: Largest accepted job
+            workers: Worker loops in this process (0 = submit only, never
+                process). Each idle loop polls the database, and the chunks
+                themselves run on the processor's pool, so one or two are
+                enough
+            lease_seconds: How long a claim lasts without a heartbeat
+            poll_interval_ms: Idle wait between queue polls
+            max_attempts: Claims of the same file or chunk before the job fails
+        """
+        self.processor = processor
+        self.session_factory = session_factory
+        self.load_rows = load_rows
+        self.batch_size = batch_size
+        self.max_rows = max_rows
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval_ms / 1000
+        self.max_attempts = max_attempts
+        
+        # Identifies this process's leases in the shared database
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._loops: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+    
+    async def submit(self, payload: bytes, filename: str, save_to_history: bool = True) -> str:
+        """
+        Queue a job; any worker on the database will process it.
+        
+        Args:
+            payload: Uploaded file
+            filename: Uploaded file name (its extension selects the parser)
+            save_to_history: Also write successful rows to history
+        
+        Returns:
+            Job id
+        """
+        job_id = uuid.uuid4().hex
+        await asyncio.to_thread(self._create, job_id, payload, filename, save_to_history)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        
+        logger.info(f"Bulk job {job_id} queued ({filename})")
+        return job_id
+    
+    async def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job; chunks being computed still finish and are stored.
+        
+        Returns:
+            False if the job does not exist or has already finished
+        """
+        return await asyncio.to_thread(self._cancel, job_id)
+    
+    async def start(self) -> None:
+        """Start this process's worker loops (call from the lifespan hook)."""
+        if self._loops or self.workers <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._loops = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        logger.info(f"Bulk job workers started ({self.workers} as {self.owner})")
+    
+    async def shutdown(self) -> None:
+        """Stop the worker loops and hand their leases back to the queue."""
+        for task in self._loops:
+            task.cancel()
+        await asyncio.gather(*self._loops, return_exceptions=True)
+        self._loops = []
+        await asyncio.to_thread(self._release_leases)
+    
+    # Worker loop
+    
+    async def _work(self) -> None:
+        """Process chunks (then queued files) until cancelled."""
+        while True:
+            try:
+                busy = await self._process_chunk() or await self._load_job()
+            except asyncio.CancelledError:
+                raise
+            except OperationalError as e:
+                # Usually another process holding the write lock; try again
+                logger.debug(f"Bulk job queue busy: {str(e)}")
+                busy = False
+            except Exception as e:
+                logger.error(f"Bulk job worker error: {str(e)}", exc_info=True)
+                busy = False
+            
+            if not busy:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+    
+    async def _heartbeat(self, model, item_id) -> None:
+        """Keep extending a lease while its work runs."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await asyncio.to_thread(self._extend_lease, model, item_id)
+    
+    async def _leased(self, model, item_id, work: Awaitable) -> Any:
+        """Await work while heartbeating its lease."""
+        heartbeat = asyncio.create_task(self._heartbeat(model, item_id))
+        try:
+            return await work
+        finally:
+            heartbeat.cancel()
+    
+    async def _process_chunk(self) -> bool:
+        """Claim, compute and checkpoint one chunk. False if none was available."""
+        chunk = await asyncio.to_thread(self._claim_chunk)
+        if chunk is None:
+            return False
+        
+        job_id = chunk['job_id']
+        if chunk['attempts'] > self.max_attempts:
+            await asyncio.to_thread(
+                self._finish, job_id, "failed",
+                f"Rows from {chunk['position'] + 1} failed {chunk['attempts'] - 1} times"
+            )
+            return True
+        
+        rows = json.loads(chunk['rows'])
+        save_to_history = chunk['save_to_history']
+        computed, dedup = await self._leased(
+            BulkJobChunk, chunk['id'],
+            self.processor.process(rows, include_result=save_to_history, offload=True)
+        )
+        
+        stored = await asyncio.to_thread(
+            self._write_chunk, chunk['id'], job_id, chunk['position'],
+            computed, dedup['unique_rows'], save_to_history
+        )
+        if not stored:
+            logger.warning(f"Bulk job {job_id}: lost lease on rows from {chunk['position'] + 1}")
+        return True
+    
+    async def _load_job(self) -> bool:
+        """Claim a queued job and split its file into chunks. False if none was queued."""
+        job = await asyncio.to_thread(self._claim_job)
+        if job is None:
+            return False
+        
+        job_id = job['id']
+        if job['attempts'] > self.max_attempts:
+            await asyncio.to_thread(
+                self._finish, job_id, "failed",
+                f"File could not be read after {job['attempts'] - 1} attempts", True
+            )
+            return True
+        
+        try:
+            rows = await self._leased(BulkJob, job_id, self.load_rows(job['payload'], job['filename']))
+            if not rows:
+                raise ValueError("No data rows found in file")
+            if len(rows) > self.max_rows:
+                raise ValueError(f"Too many rows: {len(rows)} (maximum {self.max_rows})")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Bulk job {job_id} failed: {str(e)}", exc_info=True)
+            if not await asyncio.to_thread(self._finish, job_id, "failed", str(e), True):
+                logger.warning(f"Bulk job {job_id}: lost lease before recording the failure")
+            return True
+        
+        if await asyncio.to_thread(self._write_chunks, job_id, rows):
+            logger.info(f"Bulk job {job_id}: {len(rows)} rows in {-(-len(rows) // self.batch_size)} chunks")
+        return True
+    
+    # Blocking database helpers (run on worker threads)
+    
+    def _create(self, job_id: str, payload: bytes, filename: str, save_to_history: bool) -> None:
+        db = self.session_factory()
+        try:
+            db.add(BulkJob(
+                id=job_id,
+                filename=filename,
+                status="queued",
+                save_to_history=save_to_history,
+                payload=payload
+            ))
+            db.commit()
+        finally:
+            db.close()
+    
+    def _claim(self, statement) -> Optional[Dict[str, Any]]:
+        """Run a claiming UPDATE ... RETURNING; the claimed row or None."""
+        db = self.session_factory()
+        try:
+            claimed = db.execute(statement).mappings().first()
+            db.commit()
+            return dict(claimed) if claimed else None
+        finally:
+            db.close()
+    
+    def _lease_free(self, model, now: float):
+        """Condition: nobody holds a live lease on the row."""
+        return or_(model.lease_owner.is_(None), model.lease_expires < now)
+    
+    def _claim_job(self) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        candidate = (
+            select(BulkJob.id)
+            .where(BulkJob.status == "queued", self._lease_free(BulkJob, now))
+            .order_by(BulkJob.created_at)
+            .limit(1)
+            .scalar_subquery()
+        )
+        # The lease condition is repeated so a concurrent claim of the same
+        # candidate updates nothing
+        return self._claim(
+            update(BulkJob)
+            .where(BulkJob.id == candidate, BulkJob.status == "queued", self._lease_free(BulkJob, now))
+            .values(
+                lease_owner=self.owner,
+                lease_expires=now + self.lease_seconds,
+                attempts=BulkJob.attempts + 1,
+                # A re-claim after a lost lease keeps the original start, so
+                # rows_per_second and the ETA cover the whole job
+                started_at=func.coalesce(BulkJob.started_at, datetime.now(timezone.utc))
+            )
+            .returning(BulkJob.id, BulkJob.filename, BulkJob.payload, BulkJob.attempts)
+        )
+    
+    def _claim_chunk(self) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        candidate = (
+            select(BulkJobChunk.id)
+            .join(BulkJob, BulkJob.id == BulkJobChunk.job_id)
+            .where(
+                BulkJob.status == "running",
+                BulkJobChunk.status == "pending",
+                self._lease_free(BulkJobChunk, now)
+            )
+            .order_by(BulkJob.created_at, BulkJobChunk.position)
+            .limit(1)
+            .scalar_subquery()
+        )
+        chunk = self._claim(
+            update(BulkJobChunk)
+            .where(
+                BulkJobChunk.id == candidate,
+                BulkJobChunk.status == "pending",
+                self._lease_free(BulkJobChunk, now)
+            )
+            .values(
+                lease_owner=self.owner,
+                lease_expires=now + self.lease_seconds,
+                attempts=BulkJobChunk.attempts + 1
+            )
+            .returning(
+                BulkJobChunk.id, BulkJobChunk.job_id, BulkJobChunk.position,
+                BulkJobChunk.rows, BulkJobChunk.attempts
+            )
+        )
+        if chunk is None:
+            return None
+        
+        db = self.session_factory()
+        try:
+            chunk['save_to_history'] = bool(
+                db.query(BulkJob.save_to_history).filter(BulkJob.id == chunk['job_id']).scalar()
+            )
+        finally:
+            db.close()
+        return chunk
+    
+    def _extend_lease(self, model, item_id) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(model)
+                .where(model.id == item_id, model.lease_owner == self.owner)
+                .values(lease_expires=time.time() + self.lease_seconds)
+            )
+            db.commit()
+        finally:
+            db.close()
+    
+    def _release_leases(self) -> None:
+        db = self.session_factory()
+        try:
+            for model in (BulkJob, BulkJobChunk):
+                db.execute(
+                    update(model)
+                    .where(model.lease_owner == self.owner)
+                    .values(lease_owner=None, lease_expires=None)
+                )
+            db.commit()
+        finally:
+            db.close()
+    
+    def _finish(
+        self,
+        job_id: str,
+        status: str,
+        error: Optional[str] = None,
+        leased: bool = False
+    ) -> bool:
+        """
+        Mark a job finished.
+        
+        With leased, only a queued job whose lease this worker still holds
+        is updated, so a job re-claimed by another worker (or cancelled)
+        is left alone. The input of its unclaimed chunks is dropped in the
+        same transaction.
+        
+        Returns:
+            False if nothing was updated
+        """
+        db = self.session_factory()
+        try:
+            query = db.query(BulkJob).filter(BulkJob.id == job_id)
+            if leased:
+                query = query.filter(BulkJob.status == "queued", BulkJob.lease_owner == self.owner)
+            updated = query.update({
+                BulkJob.status: status,
+                BulkJob.error: error,
+                BulkJob.payload: None,
+                BulkJob.lease_owner: None,
+                BulkJob.lease_expires: None,
+                BulkJob.finished_at: datetime.now(timezone.utc)
+            })
+            if updated:
+                self._clear_pending_rows(db, job_id)
+            db.commit()
+            return updated > 0
+        finally:
+            db.close()
+    
+    def _cancel(self, job_id: str) -> bool:
+        db = self.session_factory()
+        try:
+            updated = db.query(BulkJob).filter(
+                BulkJob.id == job_id,
+                BulkJob.status.in_(ACTIVE_STATUSES)
+            ).update({
+                BulkJob.status: "cancelled",
+                BulkJob.cancel_requested: True,
+                BulkJob.payload: None,
+                BulkJob.finished_at: datetime.now(timezone.utc)
+            })
+            if updated:
+                self._clear_pending_rows(db, job_id)
+            db.commit()
+            return updated > 0
+        finally:
+            db.close()
+    
+    def _clear_pending_rows(self, db: Session, job_id: str) -> None:
+        """Drop the input of a stopped job's pending chunks (caller commits)."""
+        # Unclaimed input is never read again; a chunk being computed
+        # already holds its rows in memory
+        db.query(BulkJobChunk).filter(
+            BulkJobChunk.job_id == job_id,
+            BulkJobChunk.status == "pending"
+        ).update({BulkJobChunk.rows: None})
+    
+    def _write_chunks(self, job_id: str, rows: List[Dict[str, Any]]) -> bool:
+        """Store a parsed job's chunks and start it, if this worker still holds it."""
+        db = self.session_factory()
+        try:
+            started = db.execute(
+                update(BulkJob)
+                .where(BulkJob.id == job_id, BulkJob.status == "queued", BulkJob.lease_owner == self.owner)
+                .values(status="running", total_rows=len(rows), payload=None, lease_owner=None, lease_expires=None)
+            ).rowcount
+            if not started:
+                db.rollback()
+                return False
+            
+            db.execute(insert(BulkJobChunk), [
+                {
+                    'job_id': job_id,
+                    'position': position,
+                    'rows': json.dumps(rows[position:position + self.batch_size]),
+                    'status': "pending"
+                }
+                for position in range(0, len(rows), self.batch_size)
+            ])
+            db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    
+    def _write_chunk(
+        self,
+        chunk_id: int,
+        job_id: str,
+        position: int,
+        computed: List[Dict[str, Any]],
+        unique_rows: int,
+        save_to_history: bool
+    ) -> bool:
+        """
+        Checkpoint a chunk: results, history rows and progress in one transaction.
+        
+        Returns:
+            False (and nothing written) if this worker no longer holds the lease
+        """
+        db = self.session_factory()
+        try:
+            # Taking the chunk first also takes SQLite's write lock for the
+            # whole transaction
+            done = db.execute(
+                update(BulkJobChunk)
+                .where(
+                    BulkJobChunk.id == chunk_id,
+                    BulkJobChunk.status == "pending",
+                    BulkJobChunk.lease_owner == self.owner
+                )
+                .values(status="done", rows=None, lease_owner=None, lease_expires=None)
+            ).rowcount
+            if not done:
+                db.rollback()
+                return False
+            
+            ids = iter(())
+            if save_to_history:
+                history_rows = bulk_history_rows(computed)
+                if history_rows:
+                    ids = iter(insert_calculations(db, history_rows, len(history_rows), commit=False))
+            
+            results = []
+            successful = 0
+            for offset, row in enumerate(computed):
+                row.pop('result_json', None)
+                if row['status'] == 'success':
+                    successful += 1
+                    if save_to_history:
+                        row['calculation_id'] = next(ids)
+                results.append({
+                    'job_id': job_id,
+                    'position': position + offset,
+                    'row_number': row['row_number'],
+                    'status': row['status'],
+                    'result': json.dumps(row),
+                    'calculation_id': row.get('calculation_id')
+                })
+            db.execute(insert(BulkJobResult), results)
+            
+            db.query(BulkJob).filter(BulkJob.id == job_id).update({
+                BulkJob.processed_rows: BulkJob.processed_rows + len(computed),
+                BulkJob.successful: BulkJob.successful + successful,
+                BulkJob.failed: BulkJob.failed + len(computed) - successful,
+                BulkJob.unique_rows: BulkJob.unique_rows + unique_rows
+            })
+            
+            # Last chunk completes the job
+            remaining = exists().where(BulkJobChunk.job_id == job_id, BulkJobChunk.status != "done")
+            db.execute(
+                update(BulkJob)
+                .where(BulkJob.id == job_id, BulkJob.status == "running", ~remaining)
+                .values(status="completed", finished_at=datetime.now(timezone.utc))
+            )
+            db.commit()
+            return True
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
@@ -0,0 +1,584 @@
+"""
+Bulk Row Processor
+
+Computes bulk-upload rows in parallel.
+
+Rows are validated and reduced by `normalize_row` to their distinct
+(amount, currency, mode) keys, since real files repeat rows (payroll runs
+with identical salaries). The keys are split into BULK_BATCH_SIZE chunks
+and sent to a process pool whose workers each hold a pre-warmed
+DenominationEngine; each chunk is one DenominationEngine.calculate_bulk
+call, which batch-solves the keys per currency and mode. Results are
+fanned back out in row order. A bad row only ever produces an error row,
+never a failed upload.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+# Add core-engine to path (process pool workers import this module fresh)
+core_engine_path = Path(__file__).parent.parent.parent.parent / "core-engine"
+if str(core_engine_path) not in sys.path:
+    sys.path.insert(0, str(core_engine_path))
+
+from engine import DenominationEngine
+from models import BulkCalculationRequest, CalculationRequest, CalculationResult, OptimizationMode
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+VALID_MODES = ['greedy', 'balanced', 'minimize_large', 'minimize_small', 'exact']
+
+
+def parse_amount(amount_str: str) -> Decimal:
+    """
+    Parse a bulk amount field (thousands separators and scientific notation allowed).
+    
+    Raises:
+        ValueError: If the amount is not a positive number
+    """
+    try:
+        clean_amount = amount_str.replace(' ', '').replace(',', '')
+        
+        if 'E' in clean_amount.upper():
+            # Scientific notation: convert via float
+            amount_decimal = Decimal(str(float(clean_amount)))
+        else:
+            amount_decimal = Decimal(clean_amount)
+        
+        if amount_decimal <= 0:
+            raise ValueError("Amount must be positive")
+    
+    except (ValueError, InvalidOperation):
+        raise ValueError(f"Invalid amount: {amount_str}")
+    
+    return amount_decimal
+
+
+def normalize_row(
+    row_data: Dict[str, Any],
+    row_num: int
+) -> Tuple[Tuple[str, str, str], str]:
+    """
+    Validate a bulk row and reduce it to its calculation key.
+    
+    Rows with the same key have identical results, whatever their spelling
+    (case, separators, exponent notation, trailing zeros): 100, 100.00 and
+    1e2 all become the key amount "100". The key is only used to share the
+    calculation; each row still reports and saves its own amount.
+    
+    Returns:
+        Tuple of ((amount, currency, optimization_mode) key with a canonical
+        decimal amount, the row's parsed amount as str(Decimal))
+    
+    Raises:
+        ValueError: If a field is missing or invalid
+    """
+    amount_str = row_data.get('amount', '').strip()
+    currency_raw = row_data.get('currency', '').strip()
+    optimization_raw = row_data.get('optimization_mode', '').strip()
+    
+    if not amount_str:
+        raise ValueError("Amount is required")
+    if not currency_raw:
+        raise ValueError("Currency is required")
+    
+    # Validate and normalize currency
+    currency = currency_raw.upper()
+    if len(currency) != 3:
+        raise ValueError(f"Invalid currency code: {currency_raw} (must be 3 letters)")
+    
+    # Validate and normalize optimization mode
+    optimization_mode = optimization_raw.lower() if optimization_raw else 'greedy'
+    if optimization_mode not in VALID_MODES:
+        logger.warning(f"[ROW {row_num}] Invalid mode '{optimization_raw}', using 'greedy'")
+        optimization_mode = 'greedy'
+    
+    amount = parse_amount(amount_str)
+    return (canonical_amount(amount), currency, optimization_mode), str(amount)
+
+
+def canonical_amount(amount: Decimal) -> str:
+    """
+    Plain decimal string of an amount without trailing fractional zeros.
+    
+    Exact for any number of digits (unlike Decimal.normalize, which rounds
+    to the context precision).
+    """
+    text = format(amount, 'f')
+    if '.' in text:
+        text = text.rstrip('0').rstrip('.')
+    return text
+
+
+def _success_result(
+    calculation_result: CalculationResult,
+    optimization_mode: str,
+    include_result: bool
+) -> Dict[str, Any]:
+    """Result fields of a successful BulkCalculationRow."""
+    result = {
+        'status': 'success',
+        'amount': str(calculation_result.original_amount),
+        'currency': calculation_result.currency,
+        'optimization_mode': optimization_mode,
+        'total_notes': calculation_result.total_notes,
+        'total_coins': calculation_result.total_coins,
+        'total_denominations': calculation_result.total_denominations,
+        'breakdowns': [
+            {
+                "denomination": str(b.denomination),
+                "count": b.count,
+                "total_value": str(b.total_value),
+                "is_note": b.is_note
+            }
+            for b in calculation_result.breakdowns
+        ]
+    }
+    if include_result:
+        result['result_json'] = json.dumps(calculation_result.to_dict())
+    return result
+
+
+def compute_keys(
+    engine: DenominationEngine,
+    keys: List[Tuple[str, str, str]],
+    include_result: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Calculate normalized keys with one DenominationEngine.calculate_bulk call.
+    
+    Never raises: a key that fails becomes an error result. The engine
+    groups the keys by currency and mode and batch-solves each group.
+    """
+    if not keys:
+        return []
+    
+    try:
+        bulk = engine.calculate_bulk(BulkCalculationRequest(
+            calculations=[
+                CalculationRequest(
+                    amount=Decimal(amount),
+                    currency=currency,
+                    optimization_mode=OptimizationMode(optimization_mode)
+                )
+                for amount, currency, optimization_mode in keys
+            ],
+            generate_summary=False,
+            generate_analytics=False
+        ))
+    except Exception as e:
+        logger.error(f"Bulk calculation failed: {str(e)}", exc_info=True)
+        return [{'status': 'error', 'error': f"Processing error: {str(e)}"} for _ in keys]
+    
+    errors = {error['index']: error['error'] for error in bulk.errors}
+    results = iter(bulk.results)
+    computed = []
+    for index, (amount, currency, optimization_mode) in enumerate(keys):
+        if index in errors:
+            logger.warning(f"[{amount} {currency}] ✗ Validation error: {errors[index]}")
+            computed.append({'status': 'error', 'error': errors[index]})
+        else:
+            computed.append(_success_result(next(results), optimization_mode, include_result))
+    return computed
+
+
+def _error_row(row_data: Dict[str, Any], row_num: int, error: str) -> Dict[str, Any]:
+    """Error row echoing the raw input fields."""
+    return {
+        'row_number': row_num,
+        'status': 'error',
+        'amount': row_data.get('amount', ''),
+        'currency': row_data.get('currency', ''),
+        'optimization_mode': row_data.get('optimization_mode', ''),
+        'error': error
+    }
+
+
+def _with_amount(result: Dict[str, Any], amount: str) -> Dict[str, Any]:
+    """A success result relabelled with another spelling of its amount."""
+    result = {**result, 'amount': amount}
+    if 'result_json' in result:
+        data = json.loads(result['result_json'])
+        data['original_amount'] = amount
+        result['result_json'] = json.dumps(data)
+    return result
+
+
+def bulk_history_rows(
+    computed: List[Dict[str, Any]],
+    source: str = "bulk_upload"
+) -> List[Dict[str, Any]]:
+    """Calculation column values for the successful rows of a bulk result."""
+    return [
+        {
+            'amount': row['amount'],
+            'currency': row['currency'],
+            'source_currency': None,
+            'exchange_rate': None,
+            'optimization_mode': row['optimization_mode'],
+            'result': row['result_json'],
+            'total_notes': str(row['total_notes']),
+            'total_coins': str(row['total_coins']),
+            'total_denominations': str(row['total_denominations']),
+            'source': source,
+            'synced': False
+        }
+        for row in computed if row['status'] == 'success'
+    ]
+
+
+# Status codes of the columnar format
+STATUS_CODES = {'success': 0, 'error': 1}
+
+
+def columnar_results(computed: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Columnar form of bulk results.
+    
+    Instead of one object per row with its own breakdown list, the result
+    has a denomination header for the whole upload, one list per field
+    and a dense count matrix whose columns follow the header. Errors are
+    listed sparsely by row index.
+    
+    Args:
+        computed: Result dicts from BulkProcessor.process
+    
+    Returns:
+        Dict with 'denominations', 'columns' and 'errors'
+    """
+    header: Dict[Tuple[str, str, bool], int] = {}
+    denominations: List[Dict[str, Any]] = []
+    
+    # Duplicate rows share their breakdown list, so each distinct
+    # breakdown is mapped to header columns once
+    sparse: Dict[int, List[Tuple[int, int]]] = {}
+    row_entries: List[List[Tuple[int, int]]] = []
+    errors: List[Dict[str, Any]] = []
+    
+    for index, row in enumerate(computed):
+        breakdowns = row.get('breakdowns')
+        if row['status'] != 'success' or not breakdowns:
+            if row['status'] != 'success':
+                errors.append({'index': index, 'row_number': row['row_number'], 'error': row.get('error')})
+            row_entries.append([])
+            continue
+        
+        entry = sparse.get(id(breakdowns))
+        if entry is None:
+            entry = []
+            for b in breakdowns:
+                key = (row['currency'], b['denomination'], b['is_note'])
+                column = header.get(key)
+                if column is None:
+                    column = header[key] = len(denominations)
+                    denominations.append({
+                        'currency': row['currency'],
+                        'denomination': b['denomination'],
+                        'is_note': b['is_note']
+                    })
+                entry.append((column, b['count']))
+            sparse[id(breakdowns)] = entry
+        row_entries.append(entry)
+    
+    width = len(denominations)
+    counts = []
+    for entry in row_entries:
+        vector = [0] * width
+        for column, count in entry:
+            vector[column] = count
+        counts.append(vector)
+    
+    return {
+        'denominations': denominations,
+        'columns': {
+            'row_number': [row['row_number'] for row in computed],
+            'status': [STATUS_CODES[row['status']] for row in computed],
+            'amount': [row.get('amount') for row in computed],
+            'currency': [row.get('currency') for row in computed],
+            'optimization_mode': [row.get('optimization_mode') for row in computed],
+            'total_notes': [row.get('total_notes') for row in computed],
+            'total_coins': [row.get('total_coins') for row in computed],
+            'total_denominations': [row.get('total_denominations') for row in computed],
+            'calculation_id': [row.get('calculation_id') for row in computed],
+            'counts': counts
+        },
+        'errors': errors
+    }
+
+
+def summarize_results(computed: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aggregates of bulk results, without any per-row data.
+    
+    Returns:
+        Dict with per-currency totals ('currencies') and the total count of
+        every denomination handed out ('denomination_totals')
+    """
+    currencies: Dict[str, Dict[str, Any]] = {}
+    breakdown_uses: Dict[int, List] = {}
+    
+    for row in computed:
+        if row['status'] != 'success':
+            continue
+        totals = currencies.get(row['currency'])
+        if totals is None:
+            totals = currencies[row['currency']] = {
+                'rows': 0, 'amount': Decimal(0), 'total_notes': 0, 'total_coins': 0
+            }
+        totals['rows'] += 1
+        totals['amount'] += Decimal(row['amount'])
+        totals['total_notes'] += row['total_notes']
+        totals['total_coins'] += row['total_coins']
+        
+        # Count each distinct breakdown list once, with its multiplicity
+        use = breakdown_uses.get(id(row['breakdowns']))
+        if use is None:
+            breakdown_uses[id(row['breakdowns'])] = [row['currency'], row['breakdowns'], 1]
+        else:
+            use[2] += 1
+    
+    denomination_totals: Dict[Tuple[str, str, bool], int] = {}
+    for currency, breakdowns, uses in breakdown_uses.values():
+        for b in breakdowns:
+            key = (currency, b['denomination'], b['is_note'])
+            denomination_totals[key] = denomination_totals.get(key, 0) + b['count'] * uses
+    
+    for totals in currencies.values():
+        totals['amount'] = str(totals['amount'])
+    
+    return {
+        'currencies': currencies,
+        'denomination_totals': [
+            {'currency': currency, 'denomination': denomination, 'is_note': is_note, 'count': count}
+            for (currency, denomination, is_note), count in denomination_totals.items()
+        ]
+    }
+
+
+# Per-process engine for the process pool
+_worker_engine: Optional[DenominationEngine] = None
+
+
+def _init_worker(config_path: str, cache_size: int, lookup_dir: Optional[str]) -> None:
+    """Process pool initializer: build and warm this worker's engine."""
+    global _worker_engine
+    _worker_engine = DenominationEngine(
+        config_path,
+        cache_size=cache_size,
+        lookup_dir=lookup_dir
+    )
+    
+    # One tiny calculation per currency and mode runs each first-call path
+    # before a real chunk arrives. Amount 1 is answered greedily, so EXACT
+    # DP tables and lookup-table pages still fill in as amounts need them
+    for currency in _worker_engine.get_supported_currencies():
+        for mode in VALID_MODES:
+            try:
+                _worker_engine.calculate(CalculationRequest(
+                    amount=Decimal(1),
+                    currency=currency,
+                    optimization_mode=OptimizationMode(mode)
+                ))
+            except ValueError:
+                pass
+
+
+def _compute_chunk(keys: List[Tuple[str, str, str]], include_result: bool) -> List[Dict[str, Any]]:
+    """Process pool task: compute one chunk of keys with this worker's engine."""
+    return compute_keys(_worker_engine, keys, include_result)
+
+
+class BulkProcessor:
+    """
+    Chunked, process-parallel bulk row computation.
+    
+    The pool is started on first use, so importing the API module does not
+    fork. Uploads that fit in a single chunk are computed on a thread with
+    the local engine instead, since a pool round trip would only add latency.
+    """
+    
+    def __init__(
+        self,
+        engine: DenominationEngine,
+        batch_size: int = 1000,
+        max_workers: Optional[int] = None
+    ):
+        """
+        Initialize the processor.
+        
+        Args:
+            engine: Local engine; its configuration is replicated in workers
+            batch_size: Rows per chunk sent to a worker
+            max_workers: Pool size (default: CPU count)
+        
+        Raises:
+            ValueError: If batch_size is not positive
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        
+        self.engine = engine
+        self.batch_size = batch_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Start the worker pool if it is not running yet."""
+        if self._pool is None:
+            engine = self.engine
+            cache_size = engine._result_cache.max_size if engine._result_cache else 0
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(
+                    str(engine.config_path),
+                    cache_size,
+                    str(engine.lookup_dir) if engine.lookup_dir else None
+                )
+            )
+            logger.info(f"Started bulk worker pool ({self.max_workers} processes)")
+        return self._pool
+    
+    async def process(
+        self,
+        rows: List[Dict[str, Any]],
+        include_result: bool = False,
+        offload: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Compute all rows, each distinct calculation once, in parallel chunks.
+        
+        Rows are normalized first (see normalize_row); every distinct
+        (amount, currency, mode) is calculated once and its result is
+        copied to all rows that share it.
+        
+        Args:
+            rows: Parsed rows (amount, currency, optional optimization_mode)
+            include_result: Also return each full result as JSON
+            offload: Use the process pool even for a single chunk (callers
+                that run several chunks concurrently)
+        
+        Returns:
+            Tuple of (one result dict per row in input order, dedup stats)
+        """
+        # Group rows by calculation key; invalid rows are answered directly
+        keys: Dict[Tuple[str, str, str], int] = {}
+        row_keys: List[Optional[int]] = []
+        row_amounts: List[Optional[str]] = []
+        errors: Dict[int, Dict[str, Any]] = {}
+        
+        for index, row_data in enumerate(rows, start=1):
+            row_num = row_data.get('row_number', index)
+            try:
+                key, amount = normalize_row(row_data, row_num)
+            except ValueError as e:
+                logger.warning(f"[ROW {row_num}] ✗ Validation error: {str(e)}")
+                errors[index - 1] = _error_row(row_data, row_num, str(e))
+                row_keys.append(None)
+                row_amounts.append(None)
+                continue
+            row_keys.append(keys.setdefault(key, len(keys)))
+            row_amounts.append(amount)
+        
+        unique = list(keys)
+        computed = await self._compute(unique, include_result, offload)
+        
+        # Fan results back out to their rows, each with its own spelling of
+        # the amount (100.00 stays 100.00 in the result and the history)
+        results = []
+        relabelled: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        for index, (row_data, slot, amount) in enumerate(zip(rows, row_keys, row_amounts)):
+            if slot is None:
+                results.append(errors[index])
+                continue
+            row_num = row_data.get('row_number', index + 1)
+            result = computed[slot]
+            if result['status'] == 'success':
+                if result['amount'] != amount:
+                    spelled = relabelled.get((slot, amount))
+                    if spelled is None:
+                        spelled = relabelled[(slot, amount)] = _with_amount(result, amount)
+                    result = spelled
+                results.append({'row_number': row_num, **result})
+            else:
+                results.append(_error_row(row_data, row_num, result['error']))
+        
+        stats = {
+            'unique_rows': len(unique),
+            'unique_ratio': round(len(unique) / len(rows), 4) if rows else 0.0
+        }
+        return results, stats
+    
+    async def _compute(
+        self,
+        keys: List[Tuple[str, str, str]],
+        include_result: bool,
+        offload: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Compute keys in BULK_BATCH_SIZE chunks, results in key order."""
+        loop = asyncio.get_running_loop()
+        
+        if not keys:
+            return []
+        if len(keys) <= self.batch_size and not offload:
+            return await loop.run_in_executor(
+                None, compute_keys, self.engine, keys, include_result
+            )
+        
+        pool = self._get_pool()
+        tasks = [
+            asyncio.ensure_future(
+                self._compute_on_pool(pool, keys[start:start + self.batch_size], include_result)
+            )
+            for start in range(0, len(keys), self.batch_size)
+        ]
+        try:
+            chunks = await asyncio.gather(*tasks)
+        except BaseException:
+            # Drop chunks that have not started
+            for task in tasks:
+                task.cancel()
+            raise
+        
+        return [result for chunk in chunks for result in chunk]
+    
+    async def _compute_on_pool(
+        self,
+        pool: ProcessPoolExecutor,
+        keys: List[Tuple[str, str, str]],
+        include_result: bool
+    ) -> List[Dict[str, Any]]:
+        """One chunk on the worker pool, computed in-process if the pool breaks."""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(pool, _compute_chunk, keys, include_result)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory) and took the pool with
+            # it; later chunks get a fresh pool, this one is computed here
+            self._discard_pool(pool)
+            logger.warning(f"Bulk worker pool broke; computing {len(keys)} keys in-process")
+            return await loop.run_in_executor(
+                None, compute_keys, self.engine, keys, include_result
+            )
+    
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Forget a broken pool so the next chunk starts a new one."""
+        if self._pool is pool:
+            self._pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool, dropping chunks that have not started."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
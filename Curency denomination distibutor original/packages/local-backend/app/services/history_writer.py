@@ -0,0 +1,205 @@
+"""
+Write-Behind History Queue
+
+Takes history inserts off the /calculate response path.
+
+With HISTORY_WRITE_BEHIND enabled, a calculation's history row is queued in
+memory and the response carries a provisional id instead of waiting for a
+SQLite commit. A background task writes queued rows in batched
+transactions (database.insert_calculations) when the queue reaches
+HISTORY_FLUSH_ROWS or HISTORY_FLUSH_INTERVAL_MS has passed, whichever comes
+first. The lifespan hook stops the task and flushes whatever is left before
+the process exits.
+
+The provisional id is only a receipt for the response: it is not stored,
+so it cannot be resolved to the history row's id later. Clients that need
+the real id should leave write-behind off (the response then carries id).
+
+The queue holds at most HISTORY_MAX_QUEUED rows. While it is full (e.g. the
+database stays unwritable and failed flushes keep requeueing), enqueue()
+refuses new rows and /calculate falls back to a synchronous insert, so
+memory stays bounded and no row is silently lost.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+from app.database import insert_calculations
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class HistoryWriteBehind:
+    """
+    In-memory queue of Calculation rows with a background flusher.
+    
+    enqueue() is called from the event loop; flushes run the blocking
+    inserts on a worker thread with their own session.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable,
+        flush_rows: int = 500,
+        flush_interval_ms: int = 250,
+        max_queued: int = 10000
+    ):
+        """
+        Initialize the queue.
+        
+        Args:
+            session_factory: Callable returning a new database session
+            flush_rows: Queue length that triggers an immediate flush
+            flush_interval_ms: Longest time a queued row waits
+            max_queued: Queue length above which enqueue() refuses rows
+        """
+        self.session_factory = session_factory
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queued = max_queued
+        
+        self._queue: List[Dict[str, Any]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._stopping = False
+        
+        self.enqueued = 0
+        self.written = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.rejected = 0
+        self.dropped = 0
+    
+    @property
+    def running(self) -> bool:
+        """True while the background flusher is active."""
+        return self._task is not None
+    
+    def enqueue(self, values: Dict[str, Any]) -> Optional[str]:
+        """
+        Queue one Calculation row.
+        
+        created_at is stamped now, so history order reflects when the
+        calculation happened rather than when it was flushed.
+        
+        Args:
+            values: Calculation column values
+        
+        Returns:
+            Provisional id of the queued row (never stored, so it cannot be
+            looked up), or None if the queue is full (the caller should
+            insert the row itself)
+        """
+        if len(self._queue) >= self.max_queued:
+            if not self.rejected % 1000:
+                logger.warning(
+                    f"History write-behind queue full ({len(self._queue)} rows), "
+                    f"{self.rejected + 1} rows refused so far"
+                )
+            self.rejected += 1
+            return None
+        
+        provisional_id = uuid.uuid4().hex
+        row = dict(values)
+        row.setdefault('created_at', datetime.now(timezone.utc))
+        self._queue.append(row)
+        self.enqueued += 1
+        
+        if len(self._queue) >= self.flush_rows and self._wakeup is not None:
+            self._wakeup.set()
+        return provisional_id
+    
+    async def start(self) -> None:
+        """Start the background flusher (call from the lifespan hook)."""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        logger.info("History write-behind queue started")
+    
+    async def stop(self) -> None:
+        """
+        Stop the flusher and write everything still queued.
+        
+        The flusher is asked to exit rather than cancelled, so a flush in
+        progress finishes (or requeues its rows) before the final one.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        
+        await self.flush()
+        if self._queue:
+            self.dropped += len(self._queue)
+            logger.error(f"History write-behind: {len(self._queue)} rows could not be written and were dropped")
+            self._queue = []
+        logger.info("History write-behind queue stopped")
+    
+    async def flush(self) -> int:
+        """
+        Write all queued rows now.
+        
+        On failure the rows go back to the front of the queue for the next
+        attempt.
+        
+        Returns:
+            Number of rows written
+        """
+        async with self._lock:
+            if not self._queue:
+                return 0
+            
+            rows, self._queue = self._queue, []
+            try:
+                await asyncio.to_thread(self._write, rows)
+            except Exception as e:
+                logger.error(f"History write-behind flush failed: {str(e)}", exc_info=True)
+                self._queue[:0] = rows
+                self.failed_flushes += 1
+                return 0
+            
+            self.written += len(rows)
+            self.flushes += 1
+            return len(rows)
+    
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        """Insert rows in one transaction (runs on a worker thread)."""
+        db = self.session_factory()
+        try:
+            insert_calculations(db, rows, batch_size=len(rows))
+        finally:
+            db.close()
+    
+    async def _run(self) -> None:
+        """Flush on a full queue or after the flush interval, until stopped."""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+    
+    def metrics(self) -> Dict[str, Any]:
+        """Queue length and write counters."""
+        return {
+            'enabled': self.running,
+            'queued': len(self._queue),
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'flushes': self.flushes,
+            'failed_flushes': self.failed_flushes,
+            'max_queued': self.max_queued,
+            'rejected': self.rejected,
+            'dropped': self.dropped
+        }
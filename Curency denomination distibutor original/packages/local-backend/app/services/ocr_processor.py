@@ -398,7 +398,7 @@ class OCRProcessor:
         text_lower = text.lower().strip()
         
         # Valid modes
-        valid_modes = ['greedy', 'balanced', 'minimize_large', 'minimize_small']
+        valid_modes = ['greedy', 'balanced', 'minimize_large', 'minimize_small', 'exact']
         
         # Direct match
         if text_lower in valid_modes:
@@ -413,6 +413,8 @@ class OCRProcessor:
             return 'minimize_small'
         if 'greed' in text_lower or 'fast' in text_lower or 'quick' in text_lower:
             return 'greedy'
+        if 'exact' in text_lower or 'optimal' in text_lower or 'fewest' in text_lower:
+            return 'exact'
         
         return ''  # No mode found, will use default
     